@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Adaptive Questionnaire
+Picks the unanswered interest question whose answer is expected to move the
+top-k careers the most, and says when the rankings have settled
+"""
+
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+from profile_features import N_SUBJECTS, N_QUESTIONS, INTEREST_MAPPING, INTEREST_QUESTIONS
+
+# Share of "yes" answers to questions outside a student's core interests (as in the generator)
+YES_PRIOR = 0.25
+# Sampled answers to the still-open questions used for the expectation
+N_COMPLETIONS = 8
+# Expected top-k movement below which the ranking is considered stable
+STABLE_CHANGE = 0.02
+
+MAX_CACHED_ROWS = 20000
+MAX_CACHED_STEPS = 2000
+
+def new_cache():
+    """Per-process caches for scored rows and finished steps"""
+    return {'rows': OrderedDict(), 'steps': OrderedDict()}
+
+def _remember(store, key, value, limit):
+    store[key] = value
+    store.move_to_end(key)
+    while len(store) > limit:
+        store.popitem(last=False)
+
+def _cached_scores(score_bits, rows, cache):
+    """Probabilities for each row, scoring only rows not seen before in one batch"""
+
+    keys = [np.packbits(row).tobytes() for row in rows]
+    store = cache['rows']
+    missing = {key: row for key, row in zip(keys, rows) if key not in store}
+    if missing:
+        probabilities = score_bits(np.array(list(missing.values())))
+        for key, probability in zip(missing, probabilities):
+            _remember(store, key, probability, MAX_CACHED_ROWS)
+    return np.array([store[key] for key in keys])
+
+def _completions(subject_bits):
+    """Fixed random answers for every question, seeded by the subjects
+
+    Using the same draws at every step means the rows scored for "yes"/"no"
+    on one step are exactly the base rows of the next, so they hit the cache.
+    """
+    seed = int.from_bytes(hashlib.sha1(np.packbits(subject_bits).tobytes()).digest()[:8], 'little')
+    rng = np.random.default_rng(seed)
+    return rng.random((N_COMPLETIONS, N_QUESTIONS)) < YES_PRIOR
+
+def _top_k_change(reference, probabilities, k):
+    """Half L1 distance restricted to the careers in either top-k"""
+    careers = np.union1d(np.argsort(reference)[-k:], np.argsort(probabilities)[-k:])
+    return 0.5 * np.abs(probabilities[careers] - reference[careers]).sum()
+
+def next_question(score_bits, subject_bits, answers, cache, k=5):
+    """Most informative next question given the answers so far
+
+    answers maps question id to True/False. Open questions are filled with
+    seeded draws so the returned distributions are expectations over them.
+    Raises ValueError for ids that aren't interest questions.
+    """
+
+    answers = {int(q): bool(a) for q, a in answers.items()}
+    unknown = sorted(q for q in answers if q not in INTEREST_MAPPING)
+    if unknown:
+        raise ValueError(f"Unknown question: {', '.join(map(str, unknown))}")
+    step_key = (np.packbits(subject_bits).tobytes(), tuple(sorted(answers.items())))
+    if step_key in cache['steps']:
+        return cache['steps'][step_key]
+
+    open_questions = [q for q in range(1, N_QUESTIONS + 1) if q not in answers]
+    completions = _completions(subject_bits)
+    for q, answer in answers.items():
+        completions[:, q - 1] = answer
+
+    base = np.zeros((N_COMPLETIONS, N_SUBJECTS + N_QUESTIONS), dtype=bool)
+    base[:, :N_SUBJECTS] = subject_bits[:N_SUBJECTS]
+    base[:, N_SUBJECTS:] = completions
+
+    # Base rows, then every open question forced to yes and to no
+    blocks = [base]
+    for q in open_questions:
+        for answer in (True, False):
+            variant = base.copy()
+            variant[:, N_SUBJECTS + q - 1] = answer
+            blocks.append(variant)
+
+    probabilities = _cached_scores(score_bits, np.vstack(blocks), cache)
+    probabilities = probabilities.reshape(len(blocks), N_COMPLETIONS, -1).mean(axis=1)
+    expected = probabilities[0]
+
+    candidates = []
+    for i, q in enumerate(open_questions):
+        if_yes, if_no = probabilities[1 + 2 * i], probabilities[2 + 2 * i]
+        change = YES_PRIOR * _top_k_change(expected, if_yes, k) + (1 - YES_PRIOR) * _top_k_change(expected, if_no, k)
+        candidates.append({'id': q, 'text': INTEREST_QUESTIONS[q], 'expected_change': float(change)})
+    candidates.sort(key=lambda c: c['expected_change'], reverse=True)
+
+    done = not candidates or candidates[0]['expected_change'] < STABLE_CHANGE
+    result = {
+        'done': done,
+        'question': None if done else candidates[0],
+        'candidates': candidates[:3],
+        'probabilities': expected,
+        'answered': len(answers),
+        'remaining': len(open_questions)
+    }
+    _remember(cache['steps'], step_key, result, MAX_CACHED_STEPS)
+    return result
@@ -8,28 +8,102 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import pickle
 import numpy as np
+import hmac
 import os
+import threading
+import time
 from datetime import datetime
+from cascade import new_stats, cascade_predict, cascade_metrics
+from model_utils import (
+    MODEL_FILE, MODEL_REGISTRY_DIR, serving_artifact, model_fingerprint, model_features, score_profile_bits,
+    top_k_indices, uses_profile_features
+)
+import outcome_log
+import whatif
+from optimizer import optimize_subjects
+import adaptive
+import subject_table
+from career_similarity import similarity_for, similar_careers
+import profile_index
+import reachability
+import explain
+from profile_features import (
+    SUBJECTS, INTEREST_MAPPING, profile_bits, bits_to_profile, single_toggle_variants, input_labels
+)
 
 app = Flask(__name__)
 CORS(app)
 
 # Global model data
 model_data = None
+loaded_model_path = None
+loaded_model_mtime = None
+
+# Without MODEL_PATH, the newer of the registry's LATEST artifact and MODEL_FILE is served and re-checked this often
+MODEL_POLL_SECONDS = float(os.environ.get('MODEL_POLL_SECONDS', '30'))
+last_model_poll = time.monotonic()
+model_reload_lock = threading.Lock()
+
+# Admin endpoints (retraining) require this token in X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# /outcome feeds incremental retraining, so only trusted callers (the front end's
+# server side) may report outcomes, with this token in X-Outcome-Token; unset disables it
+OUTCOME_TOKEN = os.environ.get('OUTCOME_TOKEN')
+
+# Optional two-tier predictor: cheap first stage, forest on escalation
+CASCADE_ENABLED = os.environ.get('CASCADE_ENABLED', '0') == '1'
+CASCADE_AUDIT_RATE = float(os.environ.get('CASCADE_AUDIT_RATE', '0.05'))
+cascade_stats = new_stats()
+
+# Flattened trees and live sessions for incremental what-if re-scoring
+whatif_trees = None
+whatif_sessions = whatif.new_session_store()
+
+# Scored partial profiles and steps for the adaptive questionnaire
+adaptive_cache = adaptive.new_cache()
+
+# Precomputed top careers for subject-only profiles (None until built for this model)
+SUBJECT_TABLE_DIR = subject_table.TABLE_DIR
+subject_lookup_table = None
+
+# Career x career similarity, shipped in the artifact or computed at load
+career_similarity = None
+
+# Per-leaf subject requirements for subject -> career reachability bounds
+reachability_index = None
+
+# Per-node contribution deltas and the column -> input grouping for /predict/explain
+explain_trees = None
+explain_attribution = None
+
+# Bit-packed profiles for "students like you" (None until built for this model)
+PROFILE_INDEX_DIR = profile_index.INDEX_DIR
+students_index = None
 
 def load_model():
-    """Load the final working model"""
-    global model_data
+    """Load the final working model
 
-    # Try to find the model file
+    Everything derived from the artifact is built first and swapped in only
+    once it all succeeded, so a failed reload keeps serving the old model.
+    Sessions, caches and cascade counters from the previous model are dropped.
+    """
+    global model_data, whatif_trees, subject_lookup_table, career_similarity, students_index, reachability_index
+    global explain_trees, explain_attribution, loaded_model_path, loaded_model_mtime
+    global whatif_sessions, adaptive_cache, cascade_stats
+
+    # Try to find the model file (MODEL_PATH picks e.g. a distilled artifact,
+    # otherwise the newer of the registry's LATEST and the main artifact wins)
     model_paths = [
-        "improved_quick_career_model.pkl",
+        serving_artifact(MODEL_REGISTRY_DIR, MODEL_FILE),
         "final_career_model.pkl"
     ]
+    if os.environ.get('MODEL_PATH'):
+        model_paths.insert(0, os.environ['MODEL_PATH'])
     
     model_file = None
     for path in model_paths:
-        if os.path.exists(path):
+        if path and os.path.exists(path):
             model_file = path
             break
 
@@ -38,120 +112,134 @@ def load_model():
         return False
 
     try:
+        model_mtime = os.path.getmtime(model_file)
         with open(model_file, 'rb') as f:
-            model_data = pickle.load(f)
-        
-        print("✅ Model loaded successfully!")
-        print(f"📊 Careers: {len(model_data['career_names'])}")
-        print(f"📊 Version: {model_data.get('model_version', 'unknown')}")
-        print(f"📊 Accuracy: {model_data['performance']['test_accuracy']:.1%}")
-        return True
-        
+            new_model_data = pickle.load(f)
     except Exception as e:
         print(f"❌ Failed to load model: {e}")
         return False
 
-def create_features(subjects, interests):
-    """Create comprehensive features that match the improved quick model exactly"""
-
-    # All 32 Cameroon GCE subjects
-    all_subjects = [
-        "English", "French", "General Paper", "Religious Studies",
-        "Philosophy", "Logic", "Mathematics", "Further Mathematics",
-        "Physics", "Chemistry", "Biology", "Computer Science",
-        "Ict", "Geology", "Technical Drawing", "Food Science",
-        "Nutrition", "Agricultural Science", "Physical Education", "Environmental Management",
-        "History", "Geography", "Literature", "Education",
-        "Art", "Music", "Economics", "Accounting",
-        "Business Mathematics", "Management", "Law", "Commerce"
-    ]
+    # Optional indexes: a failure only disables the endpoint that needs it
+    new_whatif_trees = None
+    new_similarity = None
+    new_reachability = None
+    new_explain_trees = None
+    new_attribution = None
+    is_forest = hasattr(new_model_data['model'], 'estimators_')
+    profile_columns = uses_profile_features(new_model_data)
+    if is_forest and not profile_columns:
+        print("⚠️ Model columns don't match the profile featurizer - what-if, reachability and explain disabled")
+    if is_forest:
+        new_similarity = build_optional('Career similarity', lambda: similarity_for(new_model_data))
+    if is_forest and profile_columns:
+        new_whatif_trees = build_optional('What-if trees', lambda: whatif.build_forest_arrays(new_model_data['model']))
+        new_reachability = build_optional('Reachability index', lambda: reachability.build_index(new_model_data))
+        new_explain_trees = build_optional('Explainer', lambda: explain.build_explainer(new_model_data['model']))
+        new_attribution = build_optional(
+            'Explain attribution', lambda: explain.attribution_matrix(new_model_data.get('active_features'))
+        )
+        if new_attribution is None:
+            new_explain_trees = None
+
+    new_subject_table = build_optional(
+        'Subject table', lambda: subject_table.load_table(new_model_data, SUBJECT_TABLE_DIR)
+    )
+    new_students_index = build_optional(
+        'Profile index', lambda: profile_index.load_index(new_model_data, PROFILE_INDEX_DIR)
+    )
 
-    features = {}
-
-    # Subject features (32 features) - exactly like improved model
-    for subject in all_subjects:
-        feature_name = f'subject_{subject.lower().replace(" ", "_")}'
-        features[feature_name] = 1 if subject in subjects else 0
-
-    # Interest categories (comprehensive mapping)
-    interest_categories = [
-        'analytical_thinking', 'problem_solving', 'helping_others', 'healthcare',
-        'teaching', 'mentoring', 'communication', 'business', 'entrepreneurship',
-        'leadership', 'technical_skills', 'engineering', 'creative_arts', 'design',
-        'writing', 'literature', 'travel', 'law', 'justice', 'social_impact',
-        'finance', 'outdoor_work', 'nature', 'management', 'organization',
-        'biology', 'science', 'research', 'discovery', 'economics', 'trade',
-        'technology', 'programming', 'media', 'entertainment', 'security'
-    ]
+    model_data = new_model_data
+    whatif_trees = new_whatif_trees
+    career_similarity = new_similarity
+    reachability_index = new_reachability
+    explain_trees = new_explain_trees
+    explain_attribution = new_attribution
+    subject_lookup_table = new_subject_table
+    students_index = new_students_index
+    whatif_sessions = whatif.new_session_store()
+    adaptive_cache = adaptive.new_cache()
+    cascade_stats = new_stats()
+    loaded_model_path = model_file
+    loaded_model_mtime = model_mtime
+
+    print("✅ Model loaded successfully!")
+    print(f"📊 Careers: {len(model_data['career_names'])}")
+    print(f"📊 Version: {model_data.get('model_version', 'unknown')}")
+    print(f"📊 Accuracy: {model_data['performance']['test_accuracy']:.1%}")
+    if subject_lookup_table is None:
+        print("⚠️ No subject table for this model - run: python subject_table.py")
+    if students_index is None:
+        print("⚠️ No students-like-you index for this model - run: python profile_index.py")
+    return True
+
+def build_optional(name, build):
+    """Result of one optional index builder, or None if it fails for this model"""
+    try:
+        return build()
+    except Exception as e:
+        print(f"⚠️ {name} not available for this model: {e}")
+        return None
+
+@app.before_request
+def pick_up_latest_model():
+    """Reload when a newer artifact is published to the registry or written to MODEL_FILE"""
+    global last_model_poll
 
-    # Interest mapping
-    interest_mapping = {
-        1: "analytical_thinking,problem_solving",
-        2: "helping_others,healthcare",
-        3: "teaching,mentoring,communication",
-        4: "business,entrepreneurship,leadership",
-        5: "technical_skills,engineering",
-        6: "creative_arts,design",
-        7: "writing,communication,literature",
-        8: "travel,cultural_awareness",
-        9: "law,justice,social_impact",
-        10: "finance,analytical_thinking",
-        11: "outdoor_work,nature",
-        12: "social_impact,community_service",
-        13: "management,leadership,organization",
-        14: "healthcare,biology,science",
-        15: "engineering,construction,design",
-        16: "security,law_enforcement",
-        17: "technology,programming",
-        18: "research,science,discovery",
-        19: "economics,business,trade",
-        20: "digital_media,content_creation",
-        21: "animal_care,veterinary",
-        22: "fashion,beauty,personal_care",
-        23: "counseling,psychology,helping_others",
-        24: "mathematics,analytical_thinking",
-        25: "media,entertainment",
-        26: "environmental_science,sustainability",
-        27: "electronics,technology",
-        28: "child_education,teaching",
-        29: "aerospace,aviation,exploration",
-        30: "artificial_intelligence,robotics"
-    }
-
-    # Calculate interest scores
-    interest_scores = {cat: 0 for cat in interest_categories}
-
-    for q_id, answer in interests.items():
-        if answer and int(q_id) in interest_mapping:
-            mapped_interests = interest_mapping[int(q_id)].split(',')
-            for interest in mapped_interests:
-                if interest in interest_scores:
-                    interest_scores[interest] += 1
-
-    # Normalize and add interest features
-    max_score = max(interest_scores.values()) if max(interest_scores.values()) > 0 else 1
-    for interest in interest_categories:
-        feature_name = f'interest_{interest}'
-        features[feature_name] = interest_scores[interest] / max_score
-
-    # Advanced interaction features (key for accuracy)
-    features['stem_analytical'] = (
-        features['subject_mathematics'] + features['subject_physics'] + features['subject_chemistry']
-    ) * features['interest_analytical_thinking']
-
-    features['tech_programming'] = (
-        features['subject_computer_science'] + features['subject_ict']
-    ) * features['interest_technology']
-
-    features['health_helping'] = (
-        features['subject_biology'] + features['subject_chemistry']
-    ) * features['interest_helping_others']
-
-    features['business_leadership'] = (
-        features['subject_economics'] + features['subject_management']
-    ) * features['interest_business']
-
-    return list(features.values())
+    if os.environ.get('MODEL_PATH') or time.monotonic() - last_model_poll < MODEL_POLL_SECONDS:
+        return
+    last_model_poll = time.monotonic()
+
+    try:
+        current = serving_artifact(MODEL_REGISTRY_DIR, MODEL_FILE)
+        if not current or (current, os.path.getmtime(current)) == (loaded_model_path, loaded_model_mtime):
+            return
+    except OSError:  # replaced between the listing and the stat; next poll sees it
+        return
+    if model_reload_lock.acquire(blocking=False):
+        try:
+            print(f"🔄 New model version: {current}")
+            load_model()
+        finally:
+            model_reload_lock.release()
+
+def featurize_scaled(subjects, interests):
+    """Scaled model input for one profile (only the columns the model uses are computed)"""
+    return model_data['scaler'].transform(model_features(model_data, profile_bits(subjects, interests)))
+
+def featurize_row(subjects, interests):
+    """Scaled model input for one profile as a flat vector"""
+    return featurize_scaled(subjects, interests)[0]
+
+def score_bits(bits):
+    """Forest probabilities for a matrix of 62-bit profiles in one batched call"""
+    return score_profile_bits(model_data, bits)
+
+def format_recommendations(probabilities, k=5):
+    """Top-k careers as the JSON records /predict returns"""
+
+    top_indices = top_career_indices(probabilities, k)
+    return format_top_careers(top_indices, probabilities[top_indices])
+
+def top_career_indices(probabilities, k=5):
+    """Indices of the k most probable careers, best first"""
+
+    # Linear-time partial selection; only the k picked careers get sorted
+    top_indices = top_k_indices(probabilities[None, :], k)[0]
+    return top_indices[np.argsort(-probabilities[top_indices], kind='stable')]
+
+def format_top_careers(indices, confidences):
+    """JSON records for already ranked career indices"""
+
+    recommendations = []
+    for idx, confidence in zip(indices, confidences):
+        career_name = model_data['label_encoder'].inverse_transform([idx])[0]
+
+        recommendations.append({
+            'career': career_name,
+            'confidence': float(confidence),
+            'match_percentage': float(confidence * 100)
+        })
+    return recommendations
 
 @app.route('/')
 def home():
@@ -1130,6 +1218,36 @@ def test_interface():
     </html>
     """
 
+@app.route('/test/adaptive/next', methods=['POST'])
+def adaptive_next():
+    """Next most informative interest question for the answers given so far"""
+
+    if not model_data:
+        return jsonify({'success': False, 'error': 'Model not loaded'})
+
+    try:
+        data = request.json
+        started = datetime.now()
+        result = adaptive.next_question(
+            score_bits,
+            profile_bits(data.get('subjects', []), {}),
+            data.get('answers', {}),
+            adaptive_cache
+        )
+        return jsonify({
+            'success': True,
+            'done': result['done'],
+            'question': result['question'],
+            'candidates': result['candidates'],
+            'answered': result['answered'],
+            'remaining': result['remaining'],
+            'recommendations': format_recommendations(result['probabilities']),
+            'elapsed_ms': (datetime.now() - started).total_seconds() * 1000
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/predict', methods=['POST'])
 def predict():
     """Predict career recommendations"""
@@ -1142,28 +1260,32 @@ def predict():
         subjects = data.get('subjects', [])
         interests = data.get('interests', {})
         
-        # Create features
-        features = create_features(subjects, interests)
-        
-        # Scale features
-        features_scaled = model_data['scaler'].transform([features])
-        
-        # Get predictions
-        probabilities = model_data['model'].predict_proba(features_scaled)[0]
-        
-        # Get top 5 recommendations
-        top_indices = np.argsort(probabilities)[-5:][::-1]
-        
-        recommendations = []
-        for idx in top_indices:
-            career_name = model_data['label_encoder'].inverse_transform([idx])[0]
-            confidence = probabilities[idx]
-            
-            recommendations.append({
-                'career': career_name,
-                'confidence': float(confidence),
-                'match_percentage': float(confidence * 100)
-            })
+        # Subject-only profiles come straight from the precomputed table
+        table_hit = None
+        if subject_lookup_table is not None:
+            table_hit = subject_table.lookup(
+                subject_lookup_table, profile_bits(subjects, interests), model_fingerprint(model_data)
+            )
+
+        if table_hit is not None:
+            recommendations = format_top_careers(*table_hit)
+            served_by = 'table'
+        else:
+            # Create and scale features (dropping columns a feature-pruned model doesn't use)
+            features_scaled = featurize_scaled(subjects, interests)
+
+            # Get predictions (through the cascade when enabled)
+            if CASCADE_ENABLED and model_data.get('cascade'):
+                probabilities, served_by = cascade_predict(
+                    model_data['cascade'], model_data['model'], features_scaled,
+                    cascade_stats, CASCADE_AUDIT_RATE
+                )
+            else:
+                probabilities = model_data['model'].predict_proba(features_scaled)[0]
+                served_by = 'forest'
+
+            # Get top 5 recommendations
+            recommendations = format_recommendations(probabilities)
         
         return jsonify({
             'success': True,
@@ -1171,13 +1293,360 @@ def predict():
             'model_info': {
                 'version': model_data.get('model_version', 'unknown'),
                 'accuracy': model_data['performance']['test_accuracy'],
-                'total_careers': len(model_data['career_names'])
+                'total_careers': len(model_data['career_names']),
+                'served_by': served_by
             }
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/predict/explain', methods=['POST'])
+def predict_explain():
+    """Why each top career was recommended, per subject and interest question"""
+
+    if not model_data or explain_trees is None:
+        return jsonify({'success': False, 'error': 'Explanations not available'})
+
+    try:
+        data = request.json
+        subjects, interests = data.get('subjects', []), data.get('interests', {})
+        k = max(1, min(int(data.get('k', 3)), len(model_data['career_names'])))
+        max_inputs = max(1, min(int(data.get('max_inputs', 8)), 62))
+
+        features_scaled = featurize_row(subjects, interests)
+        probabilities = model_data['model'].predict_proba(features_scaled.reshape(1, -1))[0]
+        top_indices = top_career_indices(probabilities, k)
+
+        explanations = explain.explain(
+            explain_trees, explain_attribution, features_scaled,
+            profile_bits(subjects, interests), top_indices, max_inputs
+        )
+        for explanation in explanations:
+            explanation['career'] = str(model_data['label_encoder'].classes_[explanation.pop('class_index')])
+
+        return jsonify({'success': True, 'explanations': explanations})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/predict/sensitivity', methods=['POST'])
+def predict_sensitivity():
+    """Probability change per career for every single subject or interest toggle"""
+
+    if not model_data:
+        return jsonify({'success': False, 'error': 'Model not loaded'})
+
+    try:
+        data = request.json
+        bits = profile_bits(data.get('subjects', []), data.get('interests', {}))
+
+        # Profile plus its 62 toggles, scored in one forest call
+        probabilities = score_bits(single_toggle_variants(bits))
+        deltas = probabilities[1:] - probabilities[0]
+
+        toggles = []
+        for label, was_set in zip(input_labels(), bits):
+            if label['type'] == 'subject':
+                label['action'] = 'remove' if was_set else 'add'
+            else:
+                label['action'] = 'answer_no' if was_set else 'answer_yes'
+            toggles.append(label)
+
+        return jsonify({
+            'success': True,
+            'recommendations': format_recommendations(probabilities[0]),
+            'careers': [str(c) for c in model_data['label_encoder'].classes_],
+            'toggles': toggles,
+            'deltas': np.round(deltas, 4).tolist()
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/optimize', methods=['POST'])
+def optimize():
+    """Subject additions that most raise the probability of a target career"""
+
+    if not model_data:
+        return jsonify({'success': False, 'error': 'Model not loaded'})
+
+    try:
+        data = request.json
+        target = data.get('target_career')
+        if target not in model_data['career_names']:
+            return jsonify({'success': False, 'error': f'Unknown career: {target}'})
+
+        result = optimize_subjects(
+            score_bits,
+            profile_bits(data.get('subjects', []), data.get('interests', {})),
+            int(model_data['label_encoder'].transform([target])[0]),
+            max_additions=min(int(data.get('max_additions', 3)), 5),
+            beam_width=min(int(data.get('beam_width', 8)), 32),
+            max_plans=min(int(data.get('max_plans', 5)), 20),
+            time_budget_ms=min(float(data.get('time_budget_ms', 500)), 5000)
+        )
+        return jsonify({'success': True, 'target_career': target, **result})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/careers/<path:name>/similar')
+def careers_similar(name):
+    """Careers most similar to the given one"""
+
+    if not model_data or career_similarity is None:
+        return jsonify({'success': False, 'error': 'Career similarity not available'})
+
+    if name not in model_data['career_names']:
+        return jsonify({'success': False, 'error': f'Unknown career: {name}'})
+
+    try:
+        k = max(1, min(int(request.args.get('k', 5)), len(model_data['career_names']) - 1))
+        career_index = int(model_data['label_encoder'].transform([name])[0])
+        neighbours, scores = similar_careers(career_similarity, career_index, k)
+
+        return jsonify({
+            'success': True,
+            'career': name,
+            'similar': [
+                {'career': str(model_data['label_encoder'].classes_[i]), 'similarity': float(score)}
+                for i, score in zip(neighbours, scores)
+            ]
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/careers/reachable', methods=['POST'])
+def careers_reachable():
+    """Careers that some set of interest answers could lift above a threshold, given the subjects"""
+
+    if not model_data or reachability_index is None:
+        return jsonify({'success': False, 'error': 'Reachability index not available'})
+
+    try:
+        data = request.json
+        threshold = float(data.get('threshold', 0.1))
+        subjects = data.get('subjects', [])
+        bounds = reachability.reachable_probabilities(reachability_index, profile_bits(subjects, {}))
+
+        reachable, unreachable = [], []
+        for idx in np.argsort(-bounds, kind='stable'):
+            entry = {'career': str(model_data['label_encoder'].classes_[idx]), 'max_probability': float(bounds[idx])}
+            (reachable if bounds[idx] >= threshold else unreachable).append(entry)
+
+        return jsonify({
+            'success': True,
+            'subjects': subjects,
+            'threshold': threshold,
+            'reachable': reachable,
+            'unreachable': unreachable,
+            'note': 'max_probability is an upper bound over all interest answers'
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/students/similar', methods=['POST'])
+def students_similar():
+    """Stored students closest to a profile and the careers recommended to them"""
+
+    if not model_data or students_index is None:
+        return jsonify({'success': False, 'error': 'Student index not available'})
+
+    try:
+        data = request.json
+        k = max(1, min(int(data.get('k', 10)), 100))
+        started = datetime.now()
+        positions, distances = profile_index.nearest(
+            students_index, profile_bits(data.get('subjects', []), data.get('interests', {})), k
+        )
+
+        students = []
+        career_counts = {}
+        for position, distance, bits in zip(positions, distances, profile_index.unpack_profiles(students_index['profiles'][positions])):
+            subjects, interests = bits_to_profile(bits)
+            career = str(model_data['label_encoder'].classes_[students_index['careers'][position]])
+            career_counts[career] = career_counts.get(career, 0) + 1
+            students.append({
+                'distance': int(distance),
+                'subjects': subjects,
+                'interests': [q for q, answer in interests.items() if answer],
+                'career': career
+            })
+
+        return jsonify({
+            'success': True,
+            'students': students,
+            'career_counts': career_counts,
+            'indexed_profiles': int(students_index['meta']['profiles']),
+            'elapsed_ms': (datetime.now() - started).total_seconds() * 1000
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/whatif/session', methods=['POST'])
+def whatif_start():
+    """Start a what-if session for one profile"""
+
+    if not model_data or whatif_trees is None:
+        return jsonify({'success': False, 'error': 'What-if scoring not available'})
+
+    try:
+        data = request.json
+        session_id, probabilities = whatif.start_session(
+            whatif_sessions, whatif_trees, featurize_row,
+            data.get('subjects', []), data.get('interests', {})
+        )
+        return jsonify({
+            'success': True,
+            'session_id': session_id,
+            'recommendations': format_recommendations(probabilities)
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/whatif/<session_id>/toggle', methods=['POST'])
+def whatif_toggle(session_id):
+    """Flip one subject or interest answer and re-score only the affected trees
+
+    Clients send the current subjects and interests with each toggle, so a
+    worker that doesn't hold the session rebuilds it instead of failing.
+    """
+
+    if not model_data or whatif_trees is None:
+        return jsonify({'success': False, 'error': 'What-if scoring not available'})
+
+    try:
+        data = request.json
+        subject = data.get('subject')
+        question = data.get('question')
+        if subject is None and question is None:
+            return jsonify({'success': False, 'error': 'Provide a subject or question to toggle'})
+        if subject is not None and subject not in SUBJECTS:
+            return jsonify({'success': False, 'error': f'Unknown subject: {subject}'})
+        if question is not None and int(question) not in INTEREST_MAPPING:
+            return jsonify({'success': False, 'error': f'Unknown question: {question}'})
+        profile = None
+        if 'subjects' in data or 'interests' in data:
+            profile = (data.get('subjects', []), data.get('interests', {}))
+
+        started = datetime.now()
+        try:
+            probabilities, rewalked = whatif.toggle(
+                whatif_sessions, whatif_trees, featurize_row,
+                session_id, subject=subject, question=question, profile=profile
+            )
+        except whatif.SessionNotFound:
+            return jsonify({'success': False, 'error': 'Unknown or expired session'})
+        session = whatif_sessions[session_id]
+        return jsonify({
+            'success': True,
+            'recommendations': format_recommendations(probabilities),
+            'subjects': sorted(session['subjects']),
+            'interests': session['interests'],
+            'trees_rewalked': rewalked,
+            'total_trees': len(whatif_trees),
+            'elapsed_ms': (datetime.now() - started).total_seconds() * 1000
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/outcome', methods=['POST'])
+def record_outcome():
+    """Log the career a student actually chose, for incremental retraining"""
+
+    if not OUTCOME_TOKEN:
+        return jsonify({'success': False, 'error': 'Outcome logging disabled (OUTCOME_TOKEN not set)'})
+    if not hmac.compare_digest(request.headers.get('X-Outcome-Token', '').encode(), OUTCOME_TOKEN.encode()):
+        return jsonify({'success': False, 'error': 'Invalid outcome token'})
+
+    if not model_data:
+        return jsonify({'success': False, 'error': 'Model not loaded'})
+
+    try:
+        data = request.json
+        career = data.get('career')
+        if career not in model_data['career_names']:
+            return jsonify({'success': False, 'error': f'Unknown career: {career}'})
+
+        outcome_log.append_outcome(
+            profile_bits(data.get('subjects', []), data.get('interests', {})), career, outcome_log.OUTCOME_LOG
+        )
+        return jsonify({'success': True})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+def admin_error():
+    """Error response unless the request carries the admin token"""
+    if not ADMIN_TOKEN:
+        return jsonify({'success': False, 'error': 'Admin endpoints disabled (ADMIN_TOKEN not set)'})
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), ADMIN_TOKEN.encode()):
+        return jsonify({'success': False, 'error': 'Invalid admin token'})
+    return None
+
+@app.route('/admin/retrain', methods=['POST'])
+def start_retraining():
+    """Start a background retraining job; it is promoted only if it beats the live model"""
+
+    denied = admin_error()
+    if denied:
+        return denied
+
+    # Imported here so serving workers don't load the training stack until an admin needs it
+    from career_training import retrain
+
+    try:
+        data = request.json or {}
+        config = {key: int(data[key]) for key in ('careers', 'samples_per_career', 'seed') if key in data}
+        live_model = os.environ.get('MODEL_PATH') or loaded_model_path
+        status = retrain.start_job(config, live_model=live_model)
+        return jsonify({'success': True, 'job': status})
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/admin/retrain/<job_id>')
+def retraining_status(job_id):
+    """Stage, progress and (when finished) the promotion comparison of one job"""
+
+    denied = admin_error()
+    if denied:
+        return denied
+
+    from career_training import retrain
+    status = retrain.job_status(job_id)
+    if status is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'})
+    return jsonify({'success': True, 'job': status})
+
+@app.route('/admin/retrain')
+def retraining_jobs():
+    """All retraining jobs, newest first"""
+
+    denied = admin_error()
+    if denied:
+        return denied
+
+    from career_training import retrain
+    return jsonify({'success': True, 'jobs': retrain.list_jobs()})
+
+@app.route('/cascade/stats')
+def cascade_status():
+    """Cascade escalation and agreement metrics for this worker"""
+
+    if not model_data or not model_data.get('cascade'):
+        return jsonify({'enabled': False, 'available': False})
+
+    metrics = cascade_metrics(model_data['cascade'], cascade_stats)
+    metrics.update({'enabled': CASCADE_ENABLED, 'available': True})
+    return jsonify(metrics)
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
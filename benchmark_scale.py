@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Catalog Scale Benchmark
+Trains the flat forest and the hierarchical career-family model on synthetic
+catalogs of increasing size, plus the flat forest converted to sparse leaf
+storage, and compares accuracy, stored class values, serialized size, load
+time, inference latency and top-k selection cost
+"""
+
+import argparse
+import json
+import pickle
+import time
+import warnings
+from datetime import datetime
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from career_training import build_forest, create_synthetic_catalog, generate_training_data
+from hierarchical_model import HierarchicalCareerModel, family_index
+from sparse_forest import SparseLeafForest
+from model_utils import measure_latency, top_k_accuracy, top_k_indices
+
+warnings.filterwarnings('ignore')
+
+def stored_values(model):
+    """Class-probability entries a model keeps in memory"""
+    if hasattr(model, 'node_values'):
+        return model.node_values()
+    if hasattr(model, 'stored_values'):
+        return model.stored_values()
+    return sum(e.tree_.value.size for e in model.estimators_)
+
+def top_k_cost_ms(probabilities, k=5, repeats=5):
+    """Milliseconds to rank the top k careers of a batch: full sort vs partial selection"""
+
+    timings = {}
+    for name, select in [
+        ('argsort', lambda p: np.argsort(-p, axis=1)[:, :k]),
+        ('argpartition', lambda p: top_k_indices(p, k))
+    ]:
+        started = time.perf_counter()
+        for _ in range(repeats):
+            select(probabilities)
+        timings[f'top_k_{name}_ms'] = (time.perf_counter() - started) * 1000 / repeats
+    return timings
+
+def benchmark_model(name, model, X_test, y_test, train_seconds):
+    """Quality, size, load time and latency numbers for one fitted model"""
+
+    probabilities = model.predict_proba(X_test)
+    serialized = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    started = time.perf_counter()
+    pickle.loads(serialized)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        'model': name,
+        'train_seconds': train_seconds,
+        'top_1_accuracy': top_k_accuracy(probabilities, y_test, 1),
+        'top_5_accuracy': top_k_accuracy(probabilities, y_test, 5),
+        'stored_values': int(stored_values(model)),
+        'size_mb': len(serialized) / (1024*1024),
+        'load_ms': load_ms,
+        **measure_latency(model, X_test, single_row_repeats=100),
+        **top_k_cost_ms(probabilities)
+    }
+
+def fitted(model, X_train, y_train):
+    """Fit a model and return it with its training time in seconds"""
+    started = datetime.now()
+    model.fit(X_train, y_train)
+    return model, (datetime.now() - started).total_seconds()
+
+def benchmark_catalog(n_careers, samples_per_career, n_trees, seed):
+    """Flat vs hierarchical results for one catalog size"""
+
+    np.random.seed(seed)
+    catalog = create_synthetic_catalog(n_careers, seed)
+    X, y, _ = generate_training_data(samples_per_career=samples_per_career, verbose=False, catalog=catalog)
+
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_encoded, test_size=0.25, random_state=seed, stratify=y_encoded
+    )
+    scaler = StandardScaler().fit(X_train)
+    X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+    forest_params = {**build_forest().get_params(), 'n_estimators': n_trees}
+    family_of, family_names = family_index(
+        label_encoder.classes_, {career: spec['family'] for career, spec in catalog.items()}
+    )
+
+    flat, flat_seconds = fitted(build_forest().set_params(n_estimators=n_trees), X_train, y_train)
+    hierarchical, hierarchical_seconds = fitted(
+        HierarchicalCareerModel(family_of, family_names, forest_params), X_train, y_train
+    )
+    started = datetime.now()
+    sparse = SparseLeafForest(flat)
+    sparse_seconds = flat_seconds + (datetime.now() - started).total_seconds()
+
+    results = []
+    for name, model, train_seconds in [
+        ('flat', flat, flat_seconds),
+        ('hierarchical', hierarchical, hierarchical_seconds),
+        ('sparse', sparse, sparse_seconds)
+    ]:
+        result = benchmark_model(name, model, X_test, y_test, train_seconds)
+        result.update({'careers': n_careers, 'families': len(family_names), 'training_samples': len(X)})
+        results.append(result)
+        print(f"   {n_careers:>5} careers  {name:<12} top-1 {result['top_1_accuracy']:.1%}  "
+              f"top-5 {result['top_5_accuracy']:.1%}  {result['stored_values']/1e6:7.2f}M values  "
+              f"{result['size_mb']:7.1f}MB  load {result['load_ms']:6.1f}ms  "
+              f"{result['single_row_ms']:6.2f}ms/row  {result['batch_per_row_ms']:.3f}ms/row batched  "
+              f"top-5 select {result['top_k_argsort_ms']:.1f} -> {result['top_k_argpartition_ms']:.1f}ms")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark flat, hierarchical and sparse models at several catalog sizes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[38, 350, 1000], help='Catalog sizes')
+    parser.add_argument('--samples-per-career', type=int, default=20)
+    parser.add_argument('--trees', type=int, default=30, help='Trees per forest (flat forests grow with catalog size)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help='Optional JSON file for the results')
+    args = parser.parse_args()
+
+    print("📏 Catalog Scale Benchmark")
+    print("=" * 60)
+
+    results = []
+    for n_careers in args.sizes:
+        results.extend(benchmark_catalog(n_careers, args.samples_per_career, args.trees, args.seed))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Career Similarity
+Cosine similarity between careers' per-leaf probability profiles across the
+forest, with neighbours pre-ranked so similar-career queries are lookups
+"""
+
+import numpy as np
+
+from model_utils import model_fingerprint
+
+def leaf_class_profiles(forest):
+    """Stacked leaf class distributions of all trees, weighted by leaf size (leaves x classes)"""
+
+    blocks = []
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        leaves = tree.children_left == -1
+        value = tree.value[leaves, 0, :]
+        totals = value.sum(axis=1, keepdims=True)
+        distributions = value / np.where(totals == 0, 1, totals)
+        blocks.append(distributions * tree.weighted_n_node_samples[leaves, None])
+    return np.vstack(blocks)
+
+def compute_similarity(model_data):
+    """Career x career similarity matrix and neighbour ranking for a model"""
+
+    profiles = leaf_class_profiles(model_data['model'])
+    norms = np.linalg.norm(profiles, axis=0)
+    unit = profiles / np.where(norms == 0, 1, norms)
+    matrix = (unit.T @ unit).astype(np.float32)
+
+    # Most similar first, excluding the career itself
+    ranking = np.argsort(-matrix, axis=1, kind='stable')
+    ranking = np.array([row[row != i] for i, row in enumerate(ranking)], dtype=np.int16)
+
+    return {
+        'matrix': matrix,
+        'ranking': ranking,
+        'fingerprint': model_fingerprint(model_data)
+    }
+
+def similarity_for(model_data):
+    """The artifact's shipped matrix if it belongs to this model, else a fresh one"""
+
+    shipped = model_data.get('career_similarity')
+    if shipped and shipped.get('fingerprint') == model_fingerprint(model_data):
+        return shipped
+    return compute_similarity(model_data)
+
+def similar_careers(similarity, career_index, k=5):
+    """Indices and scores of the k careers most similar to one career"""
+    neighbours = similarity['ranking'][career_index, :k]
+    return neighbours, similarity['matrix'][career_index, neighbours]
@@ -0,0 +1,19 @@
+"""
+Career Training
+Importable pieces of the improved quick model pipeline: synthetic data,
+training and the parallel configuration runner
+"""
+
+from career_training.data import (
+    core_careers, subjects, interest_mapping,
+    CAREER_SUBJECTS, CAREER_INTERESTS, CAREER_FAMILIES, FAMILY_OF_CAREER,
+    create_synthetic_catalog, create_comprehensive_features, create_realistic_profile,
+    generate_training_data, career_templates, iter_profile_bits, generate_training_data_vectorized,
+    GENERATOR_VERSION
+)
+from career_training.train import (
+    FOREST_PARAMS, EARLY_STOPPING, BACKENDS, build_forest, fit_forest_in_chunks, grow_forest_oob, split_and_scale,
+    serving_costs, assemble_model_data, fit_model_data, print_test_prediction, train_config, run_configs
+)
+from career_training.cache import DATASET_CACHE_DIR, dataset_key, cached_dataset, load_training_data
+from career_training.bitset_trees import fit_bitset_forest
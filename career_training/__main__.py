@@ -0,0 +1,3 @@
+from career_training.cli import main
+
+main()
@@ -0,0 +1,382 @@
+"""
+Bitset Tree Trainer
+Experimental forest backend specialised for this project's feature layout. Every
+column is coded to a handful of small integers once per forest and each
+"code > cut" test is packed into a 64-bit bitset over the training rows,
+grouped by class. Trees grow a whole depth level at a time: near the root
+each node is a packed sample mask and split class counts are popcounts of
+(node mask & cut mask) per class; once nodes get small, rows are listed per
+node and counted from their packed cut bits or, for wide columns, class
+histograms. Trees are written straight into sklearn's Tree structure, so the
+result is an ordinary fitted RandomForestClassifier for every serving path
+
+sklearn stays the default backend. Measured single-core with 20 trees
+(benchmark_backends.py), bitset is slower up to about a million training
+rows: 3.5s vs 1.4s at 85.5k rows and 14.4s vs 12.5s at 570k. It only pulls
+ahead beyond that, about 1.3x at 1.71M rows (13.6s vs 17.9s). The default
+training sets are far below the crossover.
+"""
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.tree._tree import Tree, NODE_DTYPE
+
+from model_utils import popcount
+
+# Columns with more distinct values than this are cut at quantiles instead
+MAX_BINS = 255
+
+# Columns with up to this many cuts are counted by popcount, one packed mask per cut;
+# wider ones use class histograms
+POPCOUNT_MAX_CUTS = 8
+
+# Levels are counted on whole-sample node masks while they have at most this many
+# nodes; past that, masks cost more than listing each node's rows
+MASK_LEVEL_MAX_NODES = 8
+
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+class FeatureLayout:
+    """Per-column split candidates and packed cut masks shared by all trees of a forest
+
+    Training rows are stored grouped by class, each class padded to whole
+    64-row words ("slots"), so per-class counts are sums over word ranges.
+    Each column is coded by the cut points between its distinct values (or
+    quantiles), so code <= i is exactly x <= cuts[i] for the float32 x
+    sklearn compares.
+    """
+
+    def __init__(self, X, y, n_classes):
+        self.n_rows, self.n_features = X.shape
+
+        class_sizes = np.bincount(y, minlength=n_classes)
+        class_words = (class_sizes + 63) // 64
+        self.class_word_start = np.concatenate([[0], np.cumsum(class_words)[:-1]])
+        self.present_classes = np.nonzero(class_sizes)[0]
+        self.n_words = int(class_words.sum())
+        first_slot = np.repeat(64 * self.class_word_start - (np.cumsum(class_sizes) - class_sizes), class_sizes)
+        by_class = np.argsort(y, kind='stable')
+        self.slot_of_row = np.empty(self.n_rows, dtype=np.int64)
+        self.slot_of_row[by_class] = first_slot + np.arange(self.n_rows)
+        self.labels = np.zeros(64 * self.n_words, dtype=y.dtype)
+        self.labels[self.slot_of_row] = y
+
+        self.cuts = {}
+        self.codes = np.zeros((self.n_features, 64 * self.n_words), dtype=np.uint8)
+        for column in range(self.n_features):
+            # Column by column, so the float32 copy sklearn compares never exists whole
+            x = np.asarray(X[:, column], dtype=np.float32)
+            values = np.unique(x)
+            if len(values) < 2:
+                continue
+            if len(values) <= MAX_BINS + 1:
+                cuts = values[:-1] / 2.0 + values[1:] / 2.0
+            else:
+                cuts = np.unique(np.quantile(x, np.linspace(0, 1, MAX_BINS + 2)[1:-1]))
+            self.cuts[column] = cuts.astype(np.float64)
+            self.codes[column, self.slot_of_row] = np.searchsorted(cuts, x, side='left')
+
+        # Constant columns can never split, so they are never sampled
+        self.candidates = np.array(sorted(self.cuts), dtype=np.int64)
+
+        # "code > cut" of every narrow column and cut as one bitset row each
+        self.mask_offset = {}
+        cut_masks = []
+        for column in self.candidates:
+            if len(self.cuts[column]) > POPCOUNT_MAX_CUTS:
+                continue
+            self.mask_offset[column] = len(cut_masks)
+            for cut in range(len(self.cuts[column])):
+                cut_masks.append(_pack(self.codes[column] > cut))
+        self.cut_masks = np.array(cut_masks).reshape(len(cut_masks), self.n_words)
+
+def _pack(bits):
+    """Boolean array of whole 64-bit words as uint64, bit i of word w is element 64 w + i"""
+    return np.packbits(bits, bitorder='little').view(np.uint64)
+
+def _weighted_gini(left_counts, left_total, right_counts, right_total, total):
+    """Size-weighted gini impurity of the two children of each candidate split"""
+    left_purity = np.einsum('...k,...k->...', left_counts, left_counts) / np.maximum(left_total, 1)
+    right_purity = np.einsum('...k,...k->...', right_counts, right_counts) / np.maximum(right_total, 1)
+    return 1.0 - (left_purity + right_purity) / total
+
+def _segment_popcounts(bits, bounds):
+    """Set bits between consecutive bounds of a boolean array, via packed 64-bit words"""
+
+    packed = np.packbits(bits, bitorder='little')
+    words = np.zeros(len(packed) // 8 + 2, dtype=np.uint64)
+    words.view(np.uint8)[:len(packed)] = packed
+    before = np.concatenate([[0], np.cumsum(popcount(words), dtype=np.int64)])
+
+    # Whole words before each bound plus the low bits of the word it falls in
+    word, bit = bounds >> 6, (bounds & 63).astype(np.uint64)
+    partial = popcount(words[word] & ((np.uint64(1) << bit) - np.uint64(1)))
+    return np.diff(before[word] + partial)
+
+def _node_ranges(starts, lengths):
+    """Positions of the concatenated ranges [start, start + length)"""
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+
+def _mask_split_counts(layout, column, node_masks, plane_weights, node_counts):
+    """Left class counts (nodes x cuts x classes) from popcounts of node masks and cut masks
+
+    node_masks holds one bitset per multiplicity bit plane (nodes x planes x words).
+    """
+
+    offset = layout.mask_offset[column]
+    cut_masks = layout.cut_masks[offset:offset + len(layout.cuts[column])]
+    ones = popcount(node_masks[:, None, :, :] & cut_masks[None, :, None, :])
+    per_class = np.add.reduceat(ones, layout.class_word_start[layout.present_classes], axis=-1, dtype=np.int64)
+    right = np.zeros(node_counts.shape[:1] + cut_masks.shape[:1] + node_counts.shape[1:], dtype=np.int64)
+    right[:, :, layout.present_classes] = np.einsum('ncpk,p->nck', per_class, plane_weights)
+    return node_counts[:, None, :] - right
+
+def _split_counts(layout, column, rows, labels, nodes, node_start, node_counts):
+    """Left class counts (nodes x cuts x classes) of one column for the nodes that sampled it"""
+
+    n_classes = node_counts.shape[1]
+    counts = node_counts[nodes]
+    sizes = counts.sum(axis=1)
+    positions = _node_ranges(node_start[nodes], sizes)
+    values = layout.codes[column][rows[positions]]
+    n_cuts = len(layout.cuts[column])
+
+    if n_cuts <= POPCOUNT_MAX_CUTS:
+        # Rows are grouped by (node, class), so each class run is a contiguous bit range
+        # and the rows right of a cut are one packed mask per cut; empty runs are skipped
+        runs = counts.ravel()
+        present = np.nonzero(runs)[0]
+        bounds = np.concatenate([[0], np.cumsum(runs[present])])
+        right = np.zeros((len(runs), n_cuts), dtype=np.int64)
+        for cut in range(n_cuts):
+            right[present, cut] = _segment_popcounts(values > cut, bounds)
+        return counts[:, None, :] - right.reshape(len(nodes), n_classes, n_cuts).transpose(0, 2, 1)
+
+    n_bins = n_cuts + 1
+    local = np.repeat(np.arange(len(nodes)) * n_bins, sizes)
+    histogram = np.bincount(
+        (local + values) * n_classes + labels[positions], minlength=len(nodes) * n_bins * n_classes
+    ).reshape(len(nodes), n_bins, n_classes)
+
+    # Left side of cut i holds bins 0..i; the last bin is never a cut
+    return np.cumsum(histogram, axis=1)[:, :-1]
+
+def _list_rows(layout, multiplicity, routes):
+    """Rows (slots repeated by multiplicity) grouped by (node, class) after the mask levels"""
+
+    slots = np.nonzero(multiplicity)[0]
+    node = np.zeros(len(slots), dtype=np.int64)
+    for best_column, best_cut, child_rank in routes:
+        child = child_rank[node]
+        slots, node, child = slots[child >= 0], node[child >= 0], child[child >= 0]
+        goes_right = layout.codes.ravel()[best_column[node] * layout.codes.shape[1] + slots] > best_cut[node]
+        node = 2 * child + goes_right
+
+    counts = multiplicity[slots]
+    rows, node = np.repeat(slots, counts), np.repeat(node, counts)
+    return rows[np.argsort(node.astype(np.uint16 if node.max(initial=0) < 65536 else np.int64), kind='stable')]
+
+def grow_tree(layout, n_classes, multiplicity, params, rng):
+    """One tree on the given row multiplicities as sklearn Tree state arrays, built level by level"""
+
+    max_depth = params['max_depth'] if params['max_depth'] is not None else np.iinfo(np.int32).max
+    min_leaf = params['min_samples_leaf']
+
+    # Bootstrap multiplicities as bit planes, so weighted counts are sums of popcounts
+    n_planes = max(1, int(multiplicity.max()).bit_length())
+    plane_weights = 1 << np.arange(n_planes)
+    node_masks = np.stack([_pack((multiplicity >> plane) & 1 == 1) for plane in range(n_planes)])[None]
+    node_counts = np.bincount(layout.labels, weights=multiplicity, minlength=n_classes).astype(np.int64)[None, :]
+    use_masks = len(layout.mask_offset) == len(layout.candidates)
+    if not use_masks:
+        rows = _list_rows(layout, multiplicity, [])
+    routes = []
+    depth = 0
+
+    lefts, rights, features, thresholds, impurities, samples, values = [], [], [], [], [], [], []
+    n_nodes = 1
+    while len(node_counts):
+        n_level = len(node_counts)
+        sizes = node_counts.sum(axis=1)
+        impurity = 1.0 - np.einsum('nk,nk->n', node_counts, node_counts) / sizes ** 2
+        impurities.append(impurity)
+        samples.append(sizes)
+        values.append(node_counts / sizes[:, None])
+
+        splittable = ((depth < max_depth) & (sizes >= params['min_samples_split'])
+                      & (sizes >= 2 * min_leaf) & (impurity > 0))
+        best_impurity = np.where(splittable, impurity, -np.inf)
+        best_column = np.full(n_level, -1)
+        best_cut = np.zeros(n_level, dtype=np.int64)
+        best_left = np.zeros_like(node_counts)
+
+        if splittable.any():
+            if not use_masks:
+                node_start = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+                labels = layout.labels[rows]
+
+            # max_features columns per node without replacement, like RandomForestClassifier
+            open_nodes = np.nonzero(splittable)[0]
+            order = rng.random((len(open_nodes), len(layout.candidates))).argsort(axis=1)
+            sampled = np.zeros((n_level, len(layout.candidates)), dtype=bool)
+            sampled[open_nodes[:, None], order[:, :params['max_features']]] = True
+
+            for slot, column in enumerate(layout.candidates):
+                nodes = np.nonzero(sampled[:, slot])[0]
+                if not len(nodes):
+                    continue
+                if use_masks:
+                    left_counts = _mask_split_counts(layout, column, node_masks[nodes], plane_weights, node_counts[nodes])
+                else:
+                    left_counts = _split_counts(layout, column, rows, labels, nodes, node_start, node_counts)
+                right_counts = node_counts[nodes][:, None, :] - left_counts
+                left_total = left_counts.sum(axis=2)
+                right_total = sizes[nodes][:, None] - left_total
+                child = _weighted_gini(left_counts, left_total, right_counts, right_total, sizes[nodes][:, None])
+                child[(left_total < min_leaf) | (right_total < min_leaf)] = np.inf
+
+                cut = child.argmin(axis=1)
+                score = child[np.arange(len(nodes)), cut]
+                better = score < best_impurity[nodes] - 1e-12
+                best_impurity[nodes[better]] = score[better]
+                best_column[nodes[better]] = column
+                best_cut[nodes[better]] = cut[better]
+                best_left[nodes[better]] = left_counts[better, cut[better]]
+
+        split = np.nonzero(best_column >= 0)[0]
+        feature = np.full(n_level, TREE_UNDEFINED)
+        threshold = np.full(n_level, float(TREE_UNDEFINED))
+        left = np.full(n_level, TREE_LEAF)
+        feature[split] = best_column[split]
+        threshold[split] = [layout.cuts[c][i] for c, i in zip(best_column[split], best_cut[split])]
+        left[split] = n_nodes + 2 * np.arange(len(split))
+        n_nodes += 2 * len(split)
+        lefts.append(left)
+        rights.append(np.where(left == TREE_LEAF, TREE_LEAF, left + 1))
+        features.append(feature)
+        thresholds.append(threshold)
+        depth += 1
+
+        # Children of split nodes become the next level, left and right interleaved
+        child_rank = np.full(n_level, -1)
+        child_rank[split] = np.arange(len(split))
+        next_counts = np.empty((2 * len(split), n_classes), dtype=np.int64)
+        next_counts[0::2] = best_left[split]
+        next_counts[1::2] = node_counts[split] - best_left[split]
+
+        if use_masks:
+            routes.append((best_column, best_cut, child_rank))
+            cut_masks = layout.cut_masks[[layout.mask_offset[c] + i for c, i in zip(best_column[split], best_cut[split])]]
+            parent_masks = node_masks[split]
+            node_masks = np.empty((2 * len(split),) + parent_masks.shape[1:], dtype=np.uint64)
+            node_masks[0::2] = parent_masks & ~cut_masks[:, None, :]
+            node_masks[1::2] = parent_masks & cut_masks[:, None, :]
+            if len(node_masks) > MASK_LEVEL_MAX_NODES:
+                rows = _list_rows(layout, multiplicity, routes)
+                use_masks = False
+        else:
+            # Rows of new leaves drop out; a stable sort keeps each child's rows grouped by class
+            node_of_row = np.repeat(np.arange(n_level), sizes)
+            keep = child_rank[node_of_row] >= 0
+            rows, node_of_row = rows[keep], node_of_row[keep]
+            column_offset = best_column.astype(np.int64) * layout.codes.shape[1]
+            goes_right = layout.codes.ravel()[column_offset[node_of_row] + rows] > best_cut[node_of_row]
+            child_of_row = 2 * child_rank[node_of_row] + goes_right
+            rows = rows[np.argsort(child_of_row.astype(np.uint16 if len(split) < 32768 else np.int64), kind='stable')]
+        node_counts = next_counts
+
+    node_array = np.zeros(n_nodes, dtype=NODE_DTYPE)
+    node_array['left_child'] = np.concatenate(lefts)
+    node_array['right_child'] = np.concatenate(rights)
+    node_array['feature'] = np.concatenate(features)
+    node_array['threshold'] = np.concatenate(thresholds)
+    node_array['impurity'] = np.concatenate(impurities)
+    node_array['n_node_samples'] = np.concatenate(samples)
+    node_array['weighted_n_node_samples'] = np.concatenate(samples)
+    return node_array, np.concatenate(values)[:, None, :], depth - 1
+
+def _as_estimator(node_array, values, depth, n_features, n_classes, params, seed):
+    """Wrap tree arrays in a fitted DecisionTreeClassifier"""
+
+    tree = Tree(n_features, np.array([n_classes], dtype=np.intp), 1)
+    tree.__setstate__({
+        'max_depth': depth,
+        'node_count': len(node_array),
+        'nodes': node_array,
+        'values': np.ascontiguousarray(values)
+    })
+
+    estimator = DecisionTreeClassifier(
+        max_depth=params['max_depth'], min_samples_split=params['min_samples_split'],
+        min_samples_leaf=params['min_samples_leaf'], max_features=params['max_features'], random_state=seed
+    )
+    estimator.tree_ = tree
+    estimator.n_features_in_ = n_features
+    estimator.n_outputs_ = 1
+    estimator.classes_ = np.arange(n_classes)
+    estimator.n_classes_ = n_classes
+    estimator.max_features_ = params['max_features']
+    return estimator
+
+def _fit_tree(layout, n_classes, params, seed):
+    rng = np.random.default_rng(seed)
+    multiplicity = np.zeros(64 * layout.n_words, dtype=np.int64)
+    if params['bootstrap']:
+        draws = np.bincount(rng.integers(0, layout.n_rows, size=layout.n_rows), minlength=layout.n_rows)
+        multiplicity[layout.slot_of_row] = draws
+    else:
+        multiplicity[layout.slot_of_row] = 1
+    node_array, values, depth = grow_tree(layout, n_classes, multiplicity, params, rng)
+    return _as_estimator(node_array, values, depth, layout.n_features, n_classes, params, seed)
+
+def _resolve_max_features(max_features, n_features):
+    if max_features == 'sqrt':
+        return max(1, int(np.sqrt(n_features)))
+    if max_features == 'log2':
+        return max(1, int(np.log2(n_features)))
+    if max_features is None:
+        return n_features
+    if isinstance(max_features, float):
+        return max(1, int(max_features * n_features))
+    return int(max_features)
+
+def fit_bitset_forest(X_train, y_train, forest_params):
+    """Train a RandomForestClassifier-compatible forest with the bitset backend
+
+    y_train must be encoded 0..n_classes-1, as fit_model_data provides.
+    Splits are gini on the depth, leaf-size and max_features settings of
+    forest_params; other criteria are rejected.
+    """
+
+    forest = RandomForestClassifier(**forest_params)
+    if forest.criterion != 'gini':
+        raise ValueError('The bitset backend only supports the gini criterion')
+
+    # 16-bit labels keep the per-level sorts on numpy's radix path
+    n_classes = int(np.max(y_train)) + 1
+    y_train = np.asarray(y_train).astype(np.uint16 if n_classes < 65536 else np.int32)
+    params = {
+        'max_depth': forest.max_depth,
+        'min_samples_split': max(2, forest.min_samples_split),
+        'min_samples_leaf': forest.min_samples_leaf,
+        'max_features': _resolve_max_features(forest.max_features, X_train.shape[1]),
+        'bootstrap': forest.bootstrap
+    }
+
+    layout = FeatureLayout(X_train, y_train, n_classes)
+    seeds = np.random.default_rng(forest.random_state).integers(0, 2**31 - 1, size=forest.n_estimators)
+    estimators = Parallel(n_jobs=forest.n_jobs, prefer='threads')(
+        delayed(_fit_tree)(layout, n_classes, params, int(seed)) for seed in seeds
+    )
+
+    forest.estimators_ = estimators
+    forest.estimator_ = DecisionTreeClassifier()
+    forest.classes_ = np.arange(n_classes)
+    forest.n_classes_ = n_classes
+    forest.n_outputs_ = 1
+    forest.n_features_in_ = X_train.shape[1]
+    return forest
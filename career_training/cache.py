@@ -0,0 +1,106 @@
+"""
+Dataset Cache
+Generated datasets stored on disk under a hash of the generator config and
+seed. Profiles are kept as bit-packed 62-input rows (8 bytes each) plus a
+uint16 career label, memory-mapped on reuse; the float features are
+recomputed from the bits when loaded
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+
+from profile_features import N_INPUTS, FEATURE_NAMES, features_from_bits
+from career_training.data import (
+    GENERATOR_VERSION, GENERATION_CHUNK_ROWS, iter_profile_bits, generate_training_data_vectorized
+)
+
+DATASET_CACHE_DIR = os.environ.get('CAREER_DATASET_CACHE', 'dataset_cache')
+
+def dataset_key(catalog, samples_per_career, seed):
+    """Content address of a generated dataset"""
+    config = {
+        'generator_version': GENERATOR_VERSION,
+        'catalog': catalog,
+        'samples_per_career': samples_per_career,
+        'seed': seed
+    }
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:20]
+
+def _write_dataset(path, catalog, samples_per_career, seed):
+    """Generate chunk by chunk straight into memory-mapped files, then publish the directory"""
+
+    n_rows = len(catalog) * samples_per_career
+    staging = f"{path}.tmp{os.getpid()}"
+    os.makedirs(staging, exist_ok=True)
+
+    packed = np.lib.format.open_memmap(
+        os.path.join(staging, 'profiles.npy'), mode='w+', dtype=np.uint8, shape=(n_rows, (N_INPUTS + 7) // 8)
+    )
+    labels = np.lib.format.open_memmap(
+        os.path.join(staging, 'labels.npy'), mode='w+', dtype=np.uint16, shape=(n_rows,)
+    )
+    row = 0
+    for bits, chunk_labels in iter_profile_bits(catalog, samples_per_career, seed):
+        packed[row:row + len(bits)] = np.packbits(bits, axis=1)
+        labels[row:row + len(bits)] = chunk_labels
+        row += len(bits)
+    packed.flush()
+    labels.flush()
+    del packed, labels
+
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump({
+            'careers': list(catalog),
+            'samples_per_career': samples_per_career,
+            'seed': seed,
+            'rows': n_rows,
+            'generator_version': GENERATOR_VERSION
+        }, f, indent=2)
+
+    # Another process may have published the same dataset meanwhile; either copy is identical
+    try:
+        os.rename(staging, path)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+
+def cached_dataset(catalog, samples_per_career, seed, cache_dir=DATASET_CACHE_DIR):
+    """Memory-mapped (packed profiles, labels, meta, cache hit) for a seeded dataset"""
+
+    if seed is None:
+        raise ValueError('Only seeded datasets can be cached')
+
+    path = os.path.join(cache_dir, dataset_key(catalog, samples_per_career, seed))
+    hit = os.path.exists(os.path.join(path, 'meta.json'))
+    if not hit:
+        os.makedirs(cache_dir, exist_ok=True)
+        _write_dataset(path, catalog, samples_per_career, seed)
+
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    packed = np.load(os.path.join(path, 'profiles.npy'), mmap_mode='r')
+    labels = np.load(os.path.join(path, 'labels.npy'), mmap_mode='r')
+    return packed, labels, meta, hit
+
+def unpack_bits(packed):
+    """Boolean 62-input rows from packed profile bytes"""
+    return np.unpackbits(packed, axis=1, count=N_INPUTS).astype(bool)
+
+def load_training_data(catalog, samples_per_career=30, seed=None, cache_dir=DATASET_CACHE_DIR, dtype=np.float64):
+    """Cached equivalent of generate_training_data_vectorized: (X, y, feature_names)
+
+    Unseeded requests can't be reproduced, so they are generated without
+    touching the cache.
+    """
+
+    if seed is None or cache_dir is None:
+        return generate_training_data_vectorized(catalog, samples_per_career, seed, dtype)
+
+    packed, labels, meta, _ = cached_dataset(catalog, samples_per_career, seed, cache_dir)
+    careers = np.array(meta['careers'])
+    X = np.empty((len(packed), len(FEATURE_NAMES)), dtype=dtype)
+    for start in range(0, len(packed), GENERATION_CHUNK_ROWS):
+        X[start:start + GENERATION_CHUNK_ROWS] = features_from_bits(unpack_bits(packed[start:start + GENERATION_CHUNK_ROWS]))
+    return X, careers[labels], list(FEATURE_NAMES)
@@ -0,0 +1,170 @@
+"""
+Training Command Line
+python -m career_training (or improved_quick_model.py) trains one model, or
+several seeds/configurations in parallel worker processes
+"""
+
+import argparse
+import itertools
+import json
+import os
+import warnings
+from datetime import datetime
+
+from model_utils import MODEL_FILE, load_artifact
+from subject_table import build_table
+from profile_index import rebuild_index
+from career_training.data import core_careers
+from career_training.cache import DATASET_CACHE_DIR
+from career_training.train import FOREST_PARAMS, EARLY_STOPPING, BACKENDS, train_config, run_configs, print_test_prediction
+
+def parse_max_features(value):
+    """'sqrt', 'log2', a fraction or a column count"""
+    if value in ('sqrt', 'log2'):
+        return value
+    return float(value) if '.' in value else int(value)
+
+def build_configs(args):
+    """One config per combination of the seeds and forest parameters given"""
+
+    # Early stopping picks the tree count itself
+    trees = args.trees[:1] if args.early_stopping else args.trees
+    grid = list(itertools.product(args.seeds, trees, args.max_depth, args.min_samples_leaf))
+    stem, extension = os.path.splitext(args.output)
+
+    configs = []
+    for seed, trees, depth, leaf in grid:
+        label = f"seed{seed}_t{trees}_d{depth}_l{leaf}"
+        configs.append({
+            'output': args.output if len(grid) == 1 else f"{stem}_{label}{extension}",
+            'careers': args.careers,
+            'samples_per_career': args.samples_per_career,
+            'seed': seed,
+            'hierarchical': args.hierarchical,
+            'backend': args.backend,
+            'cache_dir': None if args.no_cache else args.cache_dir,
+            'early_stopping': {
+                'chunk': args.tree_chunk,
+                'max_trees': args.max_trees,
+                'patience': args.oob_patience,
+                'min_gain': args.oob_min_gain
+            } if args.early_stopping else None,
+            'forest': {
+                'n_estimators': trees,
+                'max_depth': depth,
+                'min_samples_leaf': leaf,
+                'min_samples_split': args.min_samples_split,
+                'max_features': parse_max_features(args.max_features)
+            },
+            'quiet': len(grid) > 1
+        })
+    return configs
+
+def report_single(summary):
+    """The original post-training printout for a single model"""
+
+    model_data = load_artifact(summary['output'])
+
+    # Subject-only lookups and the students-like-you index are tied to this exact model
+    if summary['output'] == MODEL_FILE:
+        print("📋 Rebuilding subject-only recommendation table...")
+        build_table(model_data, verbose=False)
+        print("👥 Rebuilding students-like-you index...")
+        meta = rebuild_index(model_data)
+        print(f"   {meta['profiles']:,} profiles indexed")
+
+    print(f"💾 Model saved: {summary['output']} ({summary['size_mb']:.1f}MB)")
+    print(f"\n🧪 Testing improved model...")
+
+    print("\n🎯 Technology Student:")
+    print_test_prediction(model_data, ['Computer Science', 'Mathematics', 'Physics'],
+                          {'1': True, '17': True, '24': True, '30': True})
+
+    print("\n🎯 Healthcare Student:")
+    print_test_prediction(model_data, ['Biology', 'Chemistry', 'Mathematics'],
+                          {'2': True, '14': True, '18': True, '23': True})
+
+    print("\n🎯 Business Student:")
+    print_test_prediction(model_data, ['Economics', 'Management', 'Accounting'],
+                          {'4': True, '10': True, '13': True, '19': True})
+
+    test_score = summary['test_accuracy']
+    print(f"\n🎉 Improved Quick Model Complete!")
+    print(f"📊 Final Results:")
+    print(f"   Test Accuracy: {test_score:.3f} ({test_score*100:.1f}%)")
+    print(f"   Careers: {summary['careers']}")
+    print(f"   Features: {model_data['performance']['feature_count']}")
+    print(f"   File Size: {summary['size_mb']:.1f}MB")
+
+    if test_score >= 0.6:
+        print("🏆 EXCELLENT: Much better than previous models!")
+    elif test_score >= 0.4:
+        print("✅ GOOD: Significant improvement!")
+    elif test_score >= 0.25:
+        print("✅ FAIR: Better than before!")
+
+    print(f"\n🚀 Use: {summary['output']}")
+
+def report_many(summaries, elapsed, summary_path):
+    """One line per configuration, best test accuracy first"""
+
+    print(f"\n📊 {len(summaries)} configurations trained in {elapsed:.1f}s "
+          f"(sum of per-run times {sum(s['seconds'] for s in summaries):.1f}s)")
+    for summary in sorted(summaries, key=lambda s: -s['test_accuracy']):
+        params = summary['forest_params']
+        print(f"   {summary['test_accuracy']:.1%} test  {summary['train_accuracy']:.1%} train  "
+              f"seed {summary['seed']}  trees {params['n_estimators']}  depth {params['max_depth']}  "
+              f"leaf {params['min_samples_leaf']}  {summary['size_mb']:.1f}MB  -> {summary['output']}")
+
+    if summary_path:
+        with open(summary_path, 'w') as f:
+            json.dump(summaries, f, indent=2)
+        print(f"💾 Summary saved: {summary_path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train the improved quick career model')
+    parser.add_argument('--careers', type=int, default=len(core_careers),
+                        help='Catalog size; beyond the core careers, synthetic specializations are added')
+    parser.add_argument('--samples-per-career', type=int, default=30)
+    parser.add_argument('--seeds', '--seed', type=int, nargs='+', default=[FOREST_PARAMS['random_state']],
+                        help='Generator/forest seeds; several seeds train several models')
+    parser.add_argument('--trees', type=int, nargs='+', default=[FOREST_PARAMS['n_estimators']])
+    parser.add_argument('--max-depth', type=int, nargs='+', default=[FOREST_PARAMS['max_depth']])
+    parser.add_argument('--min-samples-leaf', type=int, nargs='+', default=[FOREST_PARAMS['min_samples_leaf']])
+    parser.add_argument('--min-samples-split', type=int, default=FOREST_PARAMS['min_samples_split'])
+    parser.add_argument('--max-features', default=FOREST_PARAMS['max_features'])
+    parser.add_argument('--hierarchical', action='store_true',
+                        help='Train a career-family model followed by per-family career models')
+    parser.add_argument('--backend', choices=BACKENDS, default='sklearn',
+                        help='Tree builder for flat forests; bitset is experimental and only faster beyond ~1M training rows')
+    parser.add_argument('--early-stopping', action='store_true',
+                        help='Grow trees in chunks until out-of-bag top-k accuracy plateaus (ignores --trees)')
+    parser.add_argument('--tree-chunk', type=int, default=EARLY_STOPPING['chunk'])
+    parser.add_argument('--max-trees', type=int, default=EARLY_STOPPING['max_trees'])
+    parser.add_argument('--oob-patience', type=int, default=EARLY_STOPPING['patience'])
+    parser.add_argument('--oob-min-gain', type=float, default=EARLY_STOPPING['min_gain'])
+    parser.add_argument('--output', default=MODEL_FILE,
+                        help='Artifact path; with several configurations each gets a suffix')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel training processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=DATASET_CACHE_DIR, help='Generated dataset cache')
+    parser.add_argument('--no-cache', action='store_true', help='Always regenerate training data')
+    parser.add_argument('--summary', default=None, help='Optional JSON file with the metrics of every configuration')
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("🚀 Improved Quick Model Training")
+    print("=" * 60)
+
+    configs = build_configs(args)
+    started = datetime.now()
+    if len(configs) == 1:
+        summary = train_config(configs[0])
+        report_single(summary)
+        summaries = [summary]
+        if args.summary:
+            report_many(summaries, (datetime.now() - started).total_seconds(), args.summary)
+    else:
+        print(f"⚙️ Training {len(configs)} configurations...")
+        summaries = run_configs(configs, args.workers)
+        report_many(summaries, (datetime.now() - started).total_seconds(), args.summary)
+    return summaries
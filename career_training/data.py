@@ -0,0 +1,266 @@
+"""
+Synthetic Training Data
+Career catalog, student profile generator and the feature layout of the
+improved quick model
+"""
+
+import numpy as np
+
+from profile_features import (
+    SUBJECTS, INTEREST_MAPPING, FEATURE_NAMES, features_from_bits,
+    create_profile_features as create_comprehensive_features
+)
+
+# Use the exact same 38 careers that worked well
+core_careers = [
+    'AI Engineer', 'Accountant', 'Agricultural Engineer', 'Architect', 'Business Analyst',
+    'Chemical Engineer', 'Civil Engineer', 'Curriculum Developer', 'Cybersecurity Specialist',
+    'Data Scientist', 'Dentist', 'Educational Psychologist', 'Electrical Engineer',
+    'Environmental Engineer', 'Environmental Scientist', 'Farm Manager', 'Financial Analyst',
+    'Food Safety Inspector', 'Food Scientist', 'Graphic Designer', 'Journalist', 'Judge',
+    'Laboratory Technician', 'Lawyer', 'Legal Assistant', 'Marketing Manager',
+    'Mechanical Engineer', 'Medical Doctor', 'Musician', 'Nurse', 'Pharmacist',
+    'Project Manager', 'Research Scientist', 'School Principal', 'Software Developer',
+    'Teacher', 'Veterinarian', 'Web Developer'
+]
+
+# Subjects and interest questions are defined once, next to the featurizer
+subjects = SUBJECTS
+interest_mapping = INTEREST_MAPPING
+
+# Define career-subject mappings
+CAREER_SUBJECTS = {
+    'Software Developer': ['Computer Science', 'Mathematics', 'Physics'],
+    'Web Developer': ['Computer Science', 'Mathematics', 'Art'],
+    'Data Scientist': ['Mathematics', 'Computer Science', 'Further Mathematics'],
+    'AI Engineer': ['Computer Science', 'Mathematics', 'Physics'],
+    'Medical Doctor': ['Biology', 'Chemistry', 'Mathematics', 'Physics'],
+    'Nurse': ['Biology', 'Chemistry', 'Mathematics'],
+    'Pharmacist': ['Chemistry', 'Biology', 'Mathematics'],
+    'Dentist': ['Biology', 'Chemistry', 'Mathematics'],
+    'Teacher': ['Education', 'English', 'General Paper'],
+    'Accountant': ['Accounting', 'Mathematics', 'Economics'],
+    'Business Analyst': ['Economics', 'Mathematics', 'Management'],
+    'Marketing Manager': ['Economics', 'Management', 'English'],
+    'Civil Engineer': ['Mathematics', 'Physics', 'Technical Drawing'],
+    'Mechanical Engineer': ['Mathematics', 'Physics', 'Technical Drawing'],
+    'Electrical Engineer': ['Mathematics', 'Physics', 'Further Mathematics'],
+    'Chemical Engineer': ['Chemistry', 'Mathematics', 'Physics'],
+    'Lawyer': ['Law', 'English', 'General Paper'],
+    'Judge': ['Law', 'English', 'General Paper'],
+    'Journalist': ['English', 'Literature', 'General Paper'],
+    'Graphic Designer': ['Art', 'Computer Science', 'English'],
+    'Architect': ['Art', 'Mathematics', 'Technical Drawing'],
+    'Veterinarian': ['Biology', 'Chemistry', 'Mathematics']
+}
+DEFAULT_SUBJECTS = ['English', 'Mathematics']
+
+# Define career-interest mappings
+CAREER_INTERESTS = {
+    'Software Developer': [1, 17, 24, 30],
+    'Web Developer': [1, 17, 20, 6],
+    'Data Scientist': [1, 18, 24, 17],
+    'Medical Doctor': [2, 14, 18, 12],
+    'Teacher': [3, 28, 12, 23],
+    'Accountant': [10, 24, 1, 19],
+    'Business Analyst': [1, 4, 13, 19],
+    'Lawyer': [9, 7, 1, 12],
+    'Graphic Designer': [6, 20, 25, 22]
+}
+DEFAULT_INTERESTS = [1, 2, 3]
+
+# Career families for the hierarchical model
+CAREER_FAMILIES = {
+    'Engineering': ['Agricultural Engineer', 'Architect', 'Chemical Engineer', 'Civil Engineer',
+                    'Electrical Engineer', 'Environmental Engineer', 'Mechanical Engineer'],
+    'Technology': ['AI Engineer', 'Cybersecurity Specialist', 'Data Scientist',
+                   'Software Developer', 'Web Developer'],
+    'Health': ['Dentist', 'Laboratory Technician', 'Medical Doctor', 'Nurse',
+               'Pharmacist', 'Veterinarian'],
+    'Science & Agriculture': ['Environmental Scientist', 'Farm Manager', 'Food Safety Inspector',
+                              'Food Scientist', 'Research Scientist'],
+    'Law': ['Judge', 'Lawyer', 'Legal Assistant'],
+    'Business': ['Accountant', 'Business Analyst', 'Financial Analyst',
+                 'Marketing Manager', 'Project Manager'],
+    'Education': ['Curriculum Developer', 'Educational Psychologist', 'School Principal', 'Teacher'],
+    'Arts & Media': ['Graphic Designer', 'Journalist', 'Musician']
+}
+FAMILY_OF_CAREER = {career: family for family, careers in CAREER_FAMILIES.items() for career in careers}
+
+def create_synthetic_catalog(n_careers=len(core_careers), seed=0):
+    """Career catalog of any size: the core careers, then seeded variants of them
+
+    Each variant keeps its parent's family and swaps one base subject and one
+    strong interest for others already used in that family, so larger
+    catalogs have many similar careers, like a real national catalog.
+    Returns {career: {'family', 'subjects', 'interests'}}.
+    """
+
+    rng = np.random.default_rng(seed)
+    catalog = {}
+    for career in core_careers[:n_careers]:
+        catalog[career] = {
+            'family': FAMILY_OF_CAREER[career],
+            'subjects': CAREER_SUBJECTS.get(career, DEFAULT_SUBJECTS),
+            'interests': CAREER_INTERESTS.get(career, DEFAULT_INTERESTS)
+        }
+
+    family_subjects = {
+        family: sorted({s for c in careers for s in CAREER_SUBJECTS.get(c, DEFAULT_SUBJECTS)})
+        for family, careers in CAREER_FAMILIES.items()
+    }
+    # Each family also borrows a few random questions so small families have room to vary
+    family_interests = {
+        family: sorted(
+            {q for c in careers for q in CAREER_INTERESTS.get(c, DEFAULT_INTERESTS)} |
+            {int(q) + 1 for q in rng.choice(30, 3, replace=False)}
+        )
+        for family, careers in CAREER_FAMILIES.items()
+    }
+
+    variant = 0
+    while len(catalog) < n_careers:
+        variant += 1
+        parent = core_careers[rng.integers(len(core_careers))]
+        family = FAMILY_OF_CAREER[parent]
+        base_subjects = list(catalog[parent]['subjects'])
+        base_subjects[rng.integers(len(base_subjects))] = str(rng.choice(
+            [s for s in family_subjects[family] if s not in base_subjects] or
+            [s for s in subjects if s not in base_subjects]
+        ))
+        strong_interests = list(catalog[parent]['interests'])
+        strong_interests[rng.integers(len(strong_interests))] = int(rng.choice(
+            [q for q in family_interests[family] if q not in strong_interests] or
+            [q for q in interest_mapping if q not in strong_interests]
+        ))
+        catalog[f'{parent} (Specialization {variant})'] = {
+            'family': family,
+            'subjects': base_subjects,
+            'interests': strong_interests
+        }
+    return catalog
+
+def create_realistic_profile(career_name, catalog=None):
+    """Create realistic student profile for a specific career"""
+
+    # Get base subjects and interests for career
+    if catalog and career_name in catalog:
+        base_subjects = catalog[career_name]['subjects']
+        strong_interests = catalog[career_name]['interests']
+    else:
+        base_subjects = CAREER_SUBJECTS.get(career_name, DEFAULT_SUBJECTS)
+        strong_interests = CAREER_INTERESTS.get(career_name, DEFAULT_INTERESTS)
+
+    # Add some random additional subjects
+    available_subjects = [s for s in subjects if s not in base_subjects]
+    additional_count = np.random.randint(1, 4)
+    if available_subjects:
+        additional = np.random.choice(
+            available_subjects,
+            size=min(additional_count, len(available_subjects)),
+            replace=False
+        )
+        student_subjects = base_subjects + list(additional)
+    else:
+        student_subjects = base_subjects
+
+    # Create interest answers based on career
+    interest_answers = {}
+
+    for q_id in range(1, 31):
+        if q_id in strong_interests:
+            # High probability for aligned interests
+            interest_answers[str(q_id)] = np.random.random() < 0.85
+        else:
+            # Lower probability for non-aligned interests
+            interest_answers[str(q_id)] = np.random.random() < 0.25
+
+    return student_subjects, interest_answers
+
+def generate_training_data(careers=None, samples_per_career=30, verbose=True, catalog=None):
+    """Generate labelled synthetic profiles, returning (X, y, feature_names)
+
+    With a catalog from create_synthetic_catalog, its careers and their
+    subject/interest definitions are used instead of the core careers.
+    """
+
+    careers = careers or (list(catalog) if catalog else core_careers)
+    features_list = []
+    labels = []
+    feature_names = None
+
+    for idx, career in enumerate(careers):
+        if verbose and idx % 10 == 0:
+            print(f"   Progress: {idx}/{len(careers)} ({idx/len(careers)*100:.1f}%)")
+
+        for sample_idx in range(samples_per_career):
+            # Create realistic student profile
+            student_subjects, interest_answers = create_realistic_profile(career, catalog)
+
+            # Create comprehensive features
+            features, feature_names = create_comprehensive_features(student_subjects, interest_answers)
+
+            features_list.append(features)
+            labels.append(career)
+
+    return np.array(features_list), np.array(labels), feature_names
+
+# Rows generated per step by the vectorized generator (bounds its working memory)
+GENERATION_CHUNK_ROWS = 1_000_000
+
+# Bump whenever iter_profile_bits draws differently, so cached datasets are not reused
+GENERATOR_VERSION = 1
+
+def career_templates(catalog):
+    """Per-career base-subject masks (careers x 32) and yes-probabilities per question (careers x 30)"""
+
+    base_subjects = np.zeros((len(catalog), len(subjects)), dtype=bool)
+    yes_probabilities = np.full((len(catalog), len(interest_mapping)), 0.25, dtype=np.float32)
+    for i, spec in enumerate(catalog.values()):
+        base_subjects[i, [subjects.index(s) for s in spec['subjects']]] = True
+        yes_probabilities[i, [q - 1 for q in spec['interests']]] = 0.85
+    return base_subjects, yes_probabilities
+
+def iter_profile_bits(catalog, samples_per_career=30, seed=None, chunk_rows=GENERATION_CHUNK_ROWS):
+    """Yield (bits, labels) chunks of synthetic profiles, drawn like create_realistic_profile
+
+    bits are the 62 raw inputs (32 subjects then 30 answers) and labels index
+    the catalog's careers. Each chunk is drawn with a handful of array-level
+    RNG calls, so memory is bounded by chunk_rows rather than the total.
+    """
+
+    rng = np.random.default_rng(seed)
+    base_subjects, yes_probabilities = career_templates(catalog)
+    total_rows = len(catalog) * samples_per_career
+
+    for start in range(0, total_rows, chunk_rows):
+        labels = np.arange(start, min(start + chunk_rows, total_rows)) // samples_per_career
+        base = base_subjects[labels]
+
+        # 1-3 extra subjects outside the base: the k smallest random keys among the
+        # remaining subjects (one 32-wide row sort, no per-row choice() calls)
+        keys = rng.random(base.shape, dtype=np.float32)
+        keys[base] = np.inf
+        extra_count = rng.integers(1, 4, size=len(labels))
+        cutoff = np.sort(keys, axis=1)[np.arange(len(labels)), extra_count - 1]
+        extra = keys <= cutoff[:, None]
+
+        bits = np.empty((len(labels), len(subjects) + len(interest_mapping)), dtype=bool)
+        bits[:, :len(subjects)] = base | extra
+        bits[:, len(subjects):] = rng.random((len(labels), len(interest_mapping)), dtype=np.float32) < yes_probabilities[labels]
+        yield bits, labels
+
+def generate_training_data_vectorized(catalog=None, samples_per_career=30, seed=None, dtype=np.float64):
+    """Vectorized generate_training_data: (X, y, feature_names) from iter_profile_bits chunks"""
+
+    catalog = catalog or create_synthetic_catalog()
+    careers = np.array(list(catalog))
+    X = np.empty((len(catalog) * samples_per_career, len(FEATURE_NAMES)), dtype=dtype)
+    y = np.empty(len(X), dtype=careers.dtype)
+
+    row = 0
+    for bits, labels in iter_profile_bits(catalog, samples_per_career, seed):
+        X[row:row + len(bits)] = features_from_bits(bits)
+        y[row:row + len(bits)] = careers[labels]
+        row += len(bits)
+    return X, y, list(FEATURE_NAMES)
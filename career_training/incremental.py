@@ -0,0 +1,302 @@
+"""
+Incremental Retraining
+Updates the served forest from the outcome log without revisiting history:
+each new chunk of outcomes trains a few trees that join the forest, the
+oldest trees are retired to keep its size fixed, and, unless it does worse
+on held-out outcomes, the result is published as the next versioned
+artifact in the model registry
+
+    python -m career_training.incremental --chunk-rows 50000 --trees-per-chunk 10
+"""
+
+import argparse
+import copy
+import warnings
+from datetime import datetime
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree._tree import Tree
+
+from cascade import calibrate_cascade
+from career_similarity import compute_similarity
+from model_utils import MODEL_FILE, MODEL_REGISTRY_DIR, load_artifact, serving_artifact, model_features
+from outcome_log import OUTCOME_LOG, OUTCOME_CHUNK_ROWS, PROFILE_BYTES, read_outcome_chunks
+from career_training.promotion import outcome_holdout_set, evaluate_model, compare_models, publish_model
+from career_training.train import build_forest
+from career_training.shards import remap_classes
+
+TREES_PER_CHUNK = 10
+
+# A shorter tail of the log waits for more outcomes
+MIN_CHUNK_ROWS = 1_000
+
+# Share of each chunk held out to evaluate updates, and how many recent held-out rows are kept
+HOLDOUT_FRACTION = 0.1
+HOLDOUT_MAX_ROWS = 20_000
+
+def _scaled(model_data, bits):
+    return model_data['scaler'].transform(model_features(model_data, bits))
+
+def _initial_state(model_data):
+    trees = len(model_data['model'].estimators_)
+    return {
+        'base_version': model_data.get('model_version', 'unknown'),
+        'log_offset': 0,
+        'max_trees': trees,
+        'tree_sources': ['base'] * trees,
+        'chunks': 0,
+        'rows': 0,
+        'unknown_career_rows': 0,
+        'updates': 0,
+        'holdout_profiles': np.zeros((0, PROFILE_BYTES), dtype=np.uint8),
+        'holdout_labels': np.zeros(0, dtype=np.uint16)
+    }
+
+def train_chunk_trees(model_data, X, y, n_trees, seed):
+    """Trees fitted on one chunk, with leaf values over the model's full career list"""
+
+    n_classes = len(model_data['career_names'])
+    forest_params = {
+        **model_data['performance'].get('forest_params', {}),
+        'n_estimators': n_trees, 'random_state': seed, 'warm_start': False, 'oob_score': False
+    }
+    forest = build_forest(**forest_params).fit(X, y)
+
+    # A chunk rarely covers every career
+    columns = forest.classes_.astype(np.intp)
+    if np.array_equal(columns, np.arange(n_classes)):
+        return forest.estimators_
+    return [remap_classes(estimator, columns, n_classes) for estimator in forest.estimators_]
+
+def _forest_with(model, estimators):
+    """A fitted copy of model's forest made of the given trees"""
+
+    forest = build_forest(**{**model.get_params(), 'n_estimators': len(estimators)})
+    forest.estimators_ = estimators
+    forest.estimator_ = model.estimator_
+    forest.classes_ = model.classes_
+    forest.n_classes_ = model.n_classes_
+    forest.n_outputs_ = 1
+    forest.n_features_in_ = model.n_features_in_
+    return forest
+
+def rebase_thresholds(estimator, old_scaler, new_scaler):
+    """Re-express a fitted tree's split thresholds from one StandardScaler's units in another's"""
+
+    state = estimator.tree_.__getstate__()
+    nodes = state['nodes'].copy()
+    split = nodes['feature'] >= 0
+    feature = nodes['feature'][split]
+    raw = nodes['threshold'][split] * old_scaler.scale_[feature] + old_scaler.mean_[feature]
+    nodes['threshold'][split] = (raw - new_scaler.mean_[feature]) / new_scaler.scale_[feature]
+
+    tree = Tree(estimator.n_features_in_, np.asarray(estimator.tree_.n_classes, dtype=np.intp), 1)
+    tree.__setstate__({**state, 'nodes': nodes})
+    estimator.tree_ = tree
+    return estimator
+
+def _active_features(model_data):
+    active = model_data.get('active_features')
+    return None if active is None else np.asarray(active).tolist()
+
+def carry_forward(live_data, candidate_data):
+    """The candidate with the live model's outcome trees and incremental state
+
+    A retrained candidate has only seen synthetic data; promoting it as is
+    would drop the trees learned from real outcomes and replay the outcome
+    log from the start. The outcome trees are rebased onto the candidate's
+    scaler and career order and replace its oldest trees, as in an update.
+    Raises ValueError when they can't be carried over.
+    """
+
+    state = live_data.get('incremental')
+    if not state:
+        return candidate_data
+    model = candidate_data['model']
+    if not isinstance(model, RandomForestClassifier) or not isinstance(live_data['model'], RandomForestClassifier):
+        raise ValueError('Outcome trees can only be carried between flat RandomForestClassifier artifacts')
+    if _active_features(live_data) != _active_features(candidate_data) or \
+            live_data['scaler'].n_features_in_ != candidate_data['scaler'].n_features_in_:
+        raise ValueError('Outcome trees were trained on different features than the candidate')
+
+    career_index = {career: i for i, career in enumerate(candidate_data['career_names'])}
+    missing = [career for career in live_data['career_names'] if career not in career_index]
+    if missing:
+        raise ValueError(f"Candidate lacks careers the outcome trees predict: {', '.join(missing[:5])}")
+    columns = np.array([career_index[career] for career in live_data['career_names']], dtype=np.intp)
+    n_classes = len(candidate_data['career_names'])
+
+    max_trees = len(model.estimators_)
+    outcome = [(estimator, source) for estimator, source in zip(live_data['model'].estimators_, state['tree_sources'])
+               if source != 'base'][-max_trees:]
+    trees = []
+    for estimator, _ in outcome:
+        estimator = rebase_thresholds(copy.deepcopy(estimator), live_data['scaler'], candidate_data['scaler'])
+        if not np.array_equal(columns, np.arange(n_classes)):
+            estimator = remap_classes(estimator, columns, n_classes)
+        trees.append(estimator)
+    base = list(model.estimators_)[len(trees):]
+    forest = _forest_with(model, base + trees)
+
+    carried = {
+        **state,
+        'base_version': candidate_data.get('model_version', 'unknown'),
+        'max_trees': max_trees,
+        'tree_sources': ['base'] * len(base) + [source for _, source in outcome],
+        'holdout_labels': columns[state['holdout_labels']].astype(np.uint16),
+        'parent': live_data.get('model_version', 'unknown')
+    }
+    candidate_data = {**candidate_data, 'model': forest, 'incremental': carried}
+
+    # The cascade threshold and similarities follow the combined forest
+    holdout_set = outcome_holdout_set(candidate_data)
+    if candidate_data.get('cascade') and holdout_set is not None:
+        cascade = candidate_data['cascade']
+        bits = holdout_set[0]
+        candidate_data['cascade'] = calibrate_cascade(cascade['model'], forest, _scaled(candidate_data, bits),
+                                                      cascade['target_agreement'])
+    if 'career_similarity' in candidate_data:
+        candidate_data['career_similarity'] = compute_similarity(candidate_data)
+    print(f"🌱 Carried {len(trees)} outcome trees and log offset {carried['log_offset']:,} into the candidate")
+    return candidate_data
+
+def update_from_outcomes(log_path=OUTCOME_LOG, registry_dir=MODEL_REGISTRY_DIR, base_model=MODEL_FILE,
+                         chunk_rows=OUTCOME_CHUNK_ROWS, trees_per_chunk=TREES_PER_CHUNK, max_trees=None,
+                         min_chunk_rows=MIN_CHUNK_ROWS, seed=0, gate=None):
+    """Consume new outcome chunks and publish the updated model; returns its path or None
+
+    Starts from the served artifact (the newer of the registry's LATEST and
+    base_model) and the log offset it recorded. Only one chunk of outcomes
+    is in memory at a time and the forest never exceeds max_trees (default:
+    the base forest's size), so memory stays flat as the log grows. The
+    update is published only if it passes the promotion gate on the
+    held-out outcomes; a rejected update is retried, with whatever new
+    outcomes arrived, on the next run.
+    """
+
+    source = serving_artifact(registry_dir, base_model) or base_model
+    model_data = load_artifact(source)
+    model = model_data['model']
+    if not isinstance(model, RandomForestClassifier):
+        raise ValueError('Incremental updates need a flat RandomForestClassifier artifact')
+
+    state = dict(model_data.get('incremental') or _initial_state(model_data))
+    if max_trees is not None:
+        state['max_trees'] = max_trees
+    if trees_per_chunk > state['max_trees']:
+        raise ValueError('trees_per_chunk exceeds the forest size limit')
+
+    print(f"📂 Updating {source} from {log_path} (offset {state['log_offset']:,})")
+    career_index = {career: i for i, career in enumerate(model_data['career_names'])}
+    rng = np.random.default_rng([seed, state['updates']])
+    estimators, sources = list(model.estimators_), list(state['tree_sources'])
+    holdout_profiles, holdout_labels = state['holdout_profiles'], state['holdout_labels']
+    chunks = 0
+
+    for bits, careers, end_offset in read_outcome_chunks(log_path, state['log_offset'], chunk_rows):
+        if len(bits) < min(min_chunk_rows, chunk_rows):
+            break
+
+        # Careers the model doesn't know can't be learned by adding trees
+        known = np.array([career in career_index for career in careers], dtype=bool)
+        labels = np.array([career_index[career] for career in careers[known]], dtype=np.uint16)
+        bits = bits[known]
+        held = rng.random(len(bits)) < HOLDOUT_FRACTION
+        holdout_profiles = np.concatenate([holdout_profiles, np.packbits(bits[held], axis=1)])[-HOLDOUT_MAX_ROWS:]
+        holdout_labels = np.concatenate([holdout_labels, labels[held]])[-HOLDOUT_MAX_ROWS:]
+
+        added = retired = 0
+        if (~held).any():
+            trees = train_chunk_trees(model_data, _scaled(model_data, bits[~held]), labels[~held],
+                                      trees_per_chunk, int(rng.integers(2**31 - 1)))
+            estimators += trees
+            sources += [f"chunk{state['chunks']}"] * len(trees)
+            added = len(trees)
+            retired = max(0, len(estimators) - state['max_trees'])
+            del estimators[:retired], sources[:retired]
+
+        print(f"🌱 Chunk {state['chunks']}: {len(bits):,} outcomes, +{added} trees, -{retired} retired")
+        state['chunks'] += 1
+        state['rows'] += len(bits)
+        state['unknown_career_rows'] += int((~known).sum())
+        state['log_offset'] = end_offset
+        chunks += 1
+
+    if not chunks:
+        print(f"💤 Fewer than {min_chunk_rows:,} new outcomes; nothing to update")
+        return None
+
+    updated = _forest_with(model, estimators)
+
+    state.update({
+        'updates': state['updates'] + 1,
+        'tree_sources': sources,
+        'parent': source,
+        'holdout_profiles': holdout_profiles,
+        'holdout_labels': holdout_labels
+    })
+    previous = model_data
+    model_data = {
+        **model_data,
+        'model': updated,
+        'training_date': datetime.now().isoformat(),
+        'model_version': f"{state['base_version']}+outcomes.{state['updates']}",
+        'performance': dict(model_data['performance']),
+        'incremental': state
+    }
+
+    # Before/after on held-out real outcomes: an update that makes them worse is not published
+    holdout_set = outcome_holdout_set(model_data)
+    if holdout_set is None:
+        print("🚫 Not published: no held-out outcomes to check the update against")
+        return None
+    bits, careers = holdout_set
+    before, after = evaluate_model(previous, bits, careers), evaluate_model(model_data, bits, careers)
+    comparison = compare_models(after, before, gate)
+    model_data['performance']['outcome_holdout'] = {
+        'rows': int(len(bits)),
+        'top_1': after['top_1'],
+        'top_5': after['top_5'],
+        'previous_top_1': before['top_1'],
+        'previous_top_5': before['top_5'],
+        'latency_ratio': comparison['latency_ratio']
+    }
+    print(f"📊 Outcome holdout top-1: {before['top_1']:.1%} -> {after['top_1']:.1%}, "
+          f"top-5: {before['top_5']:.1%} -> {after['top_5']:.1%} ({len(bits):,} rows)")
+    if not comparison['passed']:
+        print(f"🚫 Not published: {'; '.join(comparison['reasons'])}")
+        return None
+
+    # The cascade threshold follows the new forest
+    if model_data.get('cascade'):
+        cascade = model_data['cascade']
+        model_data['cascade'] = calibrate_cascade(cascade['model'], updated, _scaled(model_data, bits),
+                                                  cascade['target_agreement'])
+    if 'career_similarity' in model_data:
+        model_data['career_similarity'] = compute_similarity(model_data)
+
+    path, size_mb = publish_model(model_data, registry_dir)
+    base_trees = sources.count('base')
+    print(f"💾 Published {path} ({size_mb:.1f}MB): {len(estimators)} trees, {base_trees} from the base model")
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Update the served model from the outcome log')
+    parser.add_argument('--log', default=OUTCOME_LOG, help='Append-only outcome log (JSON lines)')
+    parser.add_argument('--registry', default=MODEL_REGISTRY_DIR, help='Versioned artifacts and the LATEST pointer')
+    parser.add_argument('--base-model', default=MODEL_FILE, help='Main artifact; used when newer than the registry\'s LATEST')
+    parser.add_argument('--chunk-rows', type=int, default=OUTCOME_CHUNK_ROWS)
+    parser.add_argument('--trees-per-chunk', type=int, default=TREES_PER_CHUNK)
+    parser.add_argument('--max-trees', type=int, default=None, help='Forest size limit (default: keep the current size)')
+    parser.add_argument('--min-chunk-rows', type=int, default=MIN_CHUNK_ROWS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("🔄 Incremental Retraining")
+    print("=" * 60)
+    return update_from_outcomes(args.log, args.registry, args.base_model, args.chunk_rows, args.trees_per_chunk,
+                                args.max_trees, args.min_chunk_rows, args.seed)
+
+if __name__ == '__main__':
+    main()
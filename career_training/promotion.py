@@ -0,0 +1,97 @@
+"""
+Model Promotion
+The holdout comparison a new model must pass before it replaces the served
+one, shared by background retraining and incremental updates, and
+publishing that builds the model's subject table and profile index before
+the registry's LATEST pointer moves to it
+"""
+
+import numpy as np
+
+import profile_index
+import subject_table
+from model_utils import (
+    MODEL_REGISTRY_DIR, publish_version, score_profile_bits, model_features, measure_latency,
+    top_k_accuracy
+)
+from profile_features import N_INPUTS
+from career_training.data import create_synthetic_catalog, iter_profile_bits
+
+# Holdout drawn with its own seed, so neither model has trained on it
+EVAL_SEED = 9001
+EVAL_SAMPLES_PER_CAREER = 50
+
+# A candidate is promoted only within these margins of the live model
+PROMOTION_GATE = {
+    'max_top_1_drop': 0.005,
+    'max_top_5_drop': 0.005,
+    'max_latency_ratio': 1.25   # candidate / live median single-row latency
+}
+
+def evaluation_set(n_careers, samples_per_career=EVAL_SAMPLES_PER_CAREER, seed=EVAL_SEED):
+    """(bits, career names) of a synthetic holdout over the first n_careers of the catalog"""
+
+    catalog = create_synthetic_catalog(n_careers)
+    bits, labels = zip(*iter_profile_bits(catalog, samples_per_career, seed))
+    return np.concatenate(bits), np.array(list(catalog))[np.concatenate(labels)]
+
+def outcome_holdout_set(model_data):
+    """(bits, career names) of the real outcomes held out by incremental updates, or None"""
+
+    state = model_data.get('incremental')
+    if not state or not len(state['holdout_labels']):
+        return None
+    bits = np.unpackbits(state['holdout_profiles'], axis=1, count=N_INPUTS).astype(bool)
+    return bits, np.array(model_data['career_names'])[state['holdout_labels']]
+
+def evaluate_model(model_data, bits, careers):
+    """Top-1/top-5 accuracy and single-row latency of one artifact on a holdout
+
+    Careers the model doesn't know count as misses.
+    """
+
+    career_index = {career: i for i, career in enumerate(model_data['career_names'])}
+    y = np.array([career_index.get(career, -1) for career in careers])
+    probabilities = score_profile_bits(model_data, bits)
+    X_scaled = model_data['scaler'].transform(model_features(model_data, bits))
+    return {
+        'model_version': model_data.get('model_version', 'unknown'),
+        'top_1': top_k_accuracy(probabilities, y, 1),
+        'top_5': top_k_accuracy(probabilities, y, 5),
+        **measure_latency(model_data['model'], X_scaled)
+    }
+
+def compare_models(candidate, live, gate=None):
+    """Whether candidate may replace live, with the reasons it may not"""
+
+    gate = {**PROMOTION_GATE, **(gate or {})}
+    reasons = []
+    for k in (1, 5):
+        drop = live[f'top_{k}'] - candidate[f'top_{k}']
+        if drop > gate[f'max_top_{k}_drop']:
+            reasons.append(f"top-{k} accuracy {candidate[f'top_{k}']:.1%} vs live {live[f'top_{k}']:.1%}")
+    latency_ratio = candidate['single_row_ms'] / max(live['single_row_ms'], 1e-9)
+    if latency_ratio > gate['max_latency_ratio']:
+        reasons.append(f"single-row latency {candidate['single_row_ms']:.2f}ms vs live {live['single_row_ms']:.2f}ms")
+    return {'passed': not reasons, 'reasons': reasons, 'latency_ratio': float(latency_ratio)}
+
+def same_predictions(candidate_data, live_data, bits):
+    """Whether two artifacts give the same career probabilities on a holdout"""
+
+    if list(candidate_data['career_names']) != list(live_data['career_names']):
+        return False
+    return np.allclose(score_profile_bits(candidate_data, bits), score_profile_bits(live_data, bits), atol=1e-9)
+
+def publish_model(model_data, registry_dir=MODEL_REGISTRY_DIR, table_dir=subject_table.TABLE_DIR,
+                  index_dir=profile_index.INDEX_DIR):
+    """Build model_data's subject table and profile index, then publish it as the next version
+
+    Workers reload as soon as LATEST moves, so the lookups are in place
+    first. Returns (path, size in MB) like publish_version.
+    """
+
+    subject_table.build_table(model_data, table_dir, verbose=False)
+    print(f"📋 Subject table built in {table_dir}")
+    meta = profile_index.rebuild_index(model_data, index_dir)
+    print(f"👥 Profile index built in {index_dir} ({meta['profiles']:,} profiles)")
+    return publish_version(model_data, registry_dir)
@@ -0,0 +1,237 @@
+"""
+Background Retraining
+Admin-triggered retraining jobs. Each job runs in its own niced process,
+trains a candidate into a staging path, carries over the trees and log
+position the live model learned from real outcomes, compares it with the
+live model on a fresh synthetic holdout and the held-out outcomes and, only
+if accuracy and latency pass the gate, is published with its subject table
+and profile index to the model registry, where serving picks it up. A job's
+progress is a status.json in its directory, so any server worker can
+report it
+
+    python -m career_training.retrain start --samples-per-career 30
+    python -m career_training.retrain status [job_id]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import warnings
+from datetime import datetime
+
+from model_utils import MODEL_FILE, MODEL_REGISTRY_DIR, load_artifact, serving_artifact
+from career_training.data import core_careers
+from career_training.cache import DATASET_CACHE_DIR
+from career_training.incremental import carry_forward
+from career_training.promotion import (
+    evaluation_set, outcome_holdout_set, evaluate_model, compare_models, same_predictions, publish_model
+)
+from career_training.train import FOREST_PARAMS, train_config
+
+RETRAIN_JOBS_DIR = os.environ.get('RETRAIN_JOBS_DIR', 'retrain_jobs')
+
+# Lowest scheduling priority, and forest threads capped so serving keeps some cores outright
+RETRAIN_NICENESS = 19
+RETRAIN_N_JOBS = max(1, (os.cpu_count() or 2) // 2)
+
+ACTIVE_STATES = ('queued', 'running')
+
+def _job_dir(job_id, jobs_dir):
+    return os.path.join(jobs_dir, job_id)
+
+def _read_status(job_dir):
+    with open(os.path.join(job_dir, 'status.json')) as f:
+        return json.load(f)
+
+def _write_status(job_dir, **updates):
+    """Merge updates into the job's status file, replacing it atomically"""
+
+    path = os.path.join(job_dir, 'status.json')
+    status = _read_status(job_dir) if os.path.exists(path) else {}
+    status.update(updates, updated=datetime.now().isoformat())
+    with open(f"{path}.tmp{os.getpid()}", 'w') as f:
+        json.dump(status, f, indent=2)
+    os.replace(f"{path}.tmp{os.getpid()}", path)
+    return status
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def job_status(job_id, jobs_dir=RETRAIN_JOBS_DIR):
+    """The job's status dictionary, or None for an unknown job
+
+    A job still marked active whose process is gone died without reporting
+    (killed, out of memory) and is marked failed.
+    """
+
+    job_dir = _job_dir(os.path.basename(job_id), jobs_dir)
+    if not os.path.exists(os.path.join(job_dir, 'status.json')):
+        return None
+
+    status = _read_status(job_dir)
+    if status['state'] in ACTIVE_STATES and status.get('pid') and not _pid_alive(status['pid']):
+        # The child may have finished between the read and the liveness check
+        status = _read_status(job_dir)
+        if status['state'] in ACTIVE_STATES:
+            status = _write_status(job_dir, state='failed', error='Retraining process exited unexpectedly')
+    return status
+
+def list_jobs(jobs_dir=RETRAIN_JOBS_DIR):
+    """Status of every job, newest first"""
+
+    if not os.path.isdir(jobs_dir):
+        return []
+    statuses = [job_status(job_id, jobs_dir) for job_id in os.listdir(jobs_dir) if not job_id.startswith('.')]
+    return sorted((s for s in statuses if s), key=lambda s: s['created'], reverse=True)
+
+def start_job(config=None, jobs_dir=RETRAIN_JOBS_DIR, registry_dir=MODEL_REGISTRY_DIR, live_model=None):
+    """Launch a retraining job in a detached low-priority process and return its status
+
+    config holds train_config keys (careers, samples_per_career, seed,
+    forest, ...). live_model is the artifact to beat; by default the one
+    being served (the newer of the registry's LATEST and MODEL_FILE). Only
+    one job runs at a time.
+    """
+
+    # Server workers may all receive a start request; the lock makes check-and-create atomic
+    os.makedirs(jobs_dir, exist_ok=True)
+    with open(os.path.join(jobs_dir, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        running = [s for s in list_jobs(jobs_dir) if s['state'] in ACTIVE_STATES]
+        if running:
+            raise RuntimeError(f"Retraining job {running[0]['job_id']} is already {running[0]['state']}")
+
+        job_id = f"{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(3)}"
+        job_dir = _job_dir(job_id, jobs_dir)
+        os.makedirs(job_dir)
+        _write_status(
+            job_dir, job_id=job_id, state='queued', stage=None, progress=0.0, created=datetime.now().isoformat(),
+            config=config or {}, registry_dir=registry_dir,
+            live_model=live_model or serving_artifact(registry_dir, MODEL_FILE) or MODEL_FILE,
+            staging_path=os.path.join(job_dir, 'candidate.pkl')
+        )
+
+    with open(os.path.join(job_dir, 'training.log'), 'w') as log:
+        # nice(1) rather than a preexec_fn: running Python between fork and exec is unsafe in threaded servers
+        process = subprocess.Popen(
+            ['nice', '-n', str(RETRAIN_NICENESS), sys.executable, '-m', 'career_training.retrain', 'run',
+             '--job-dir', job_dir],
+            stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, start_new_session=True
+        )
+    # Reap the child when it exits, or a crashed job would linger as a live-looking zombie
+    threading.Thread(target=process.wait, daemon=True).start()
+    return _write_status(job_dir, pid=process.pid)
+
+def run_job(job_dir):
+    """Body of the job process: train, compare and promote, reporting each stage
+
+    A candidate that predicts exactly like the live model (the same
+    settings retrained) is rejected rather than republished.
+    """
+
+    status = _write_status(job_dir, state='running', stage='starting', progress=0.0,
+                           started=datetime.now().isoformat())
+    try:
+        config = {
+            'careers': len(core_careers), 'samples_per_career': 30, 'seed': FOREST_PARAMS['random_state'],
+            'cache_dir': DATASET_CACHE_DIR, **status['config'], 'output': status['staging_path']
+        }
+        config['forest'] = {'n_jobs': RETRAIN_N_JOBS, **config.get('forest', {})}
+
+        # Training spans progress 0.1-0.65, reported as each chunk of trees is fitted
+        _write_status(job_dir, stage='generating data', progress=0.05)
+
+        def report_trees(fraction):
+            _write_status(job_dir, stage='training', progress=round(0.1 + 0.55 * fraction, 3))
+        summary = train_config(config, progress=report_trees)
+        _write_status(job_dir, stage='evaluating', progress=0.7, training=summary)
+
+        live_data = load_artifact(status['live_model'])
+        candidate_data = carry_forward(live_data, load_artifact(status['staging_path']))
+        gate = status['config'].get('gate')
+        bits, careers = evaluation_set(len(candidate_data['career_names']))
+        candidate = evaluate_model(candidate_data, bits, careers)
+        live = evaluate_model(live_data, bits, careers)
+        comparison = {'candidate': candidate, 'live': live, 'rows': int(len(bits)),
+                      **compare_models(candidate, live, gate)}
+        print(f"📊 Candidate top-1 {candidate['top_1']:.1%}, live {live['top_1']:.1%}; "
+              f"latency x{comparison['latency_ratio']:.2f}")
+
+        # Real outcomes held out by incremental updates must not get worse either
+        holdout_set = outcome_holdout_set(live_data)
+        if holdout_set is not None:
+            candidate_outcomes = evaluate_model(candidate_data, *holdout_set)
+            live_outcomes = evaluate_model(live_data, *holdout_set)
+            outcome_comparison = compare_models(candidate_outcomes, live_outcomes, gate)
+            comparison['outcome_holdout'] = {'candidate': candidate_outcomes, 'live': live_outcomes,
+                                             'rows': int(len(holdout_set[0])), **outcome_comparison}
+            comparison['passed'] = comparison['passed'] and outcome_comparison['passed']
+            comparison['reasons'] += [f"outcome holdout {reason}" for reason in outcome_comparison['reasons']]
+            print(f"📊 Outcome holdout top-1: candidate {candidate_outcomes['top_1']:.1%}, "
+                  f"live {live_outcomes['top_1']:.1%}")
+
+        # Retraining with the live model's settings rebuilds the same forest; republishing it changes nothing
+        if same_predictions(candidate_data, live_data, bits):
+            comparison['passed'] = False
+            comparison['reasons'].append('candidate makes the same predictions as the live model '
+                                         '(change careers, samples_per_career or seed)')
+
+        if not comparison['passed']:
+            print(f"🚫 Not promoted: {'; '.join(comparison['reasons'])}")
+            return _write_status(job_dir, state='rejected', stage=None, progress=1.0, comparison=comparison,
+                                 finished=datetime.now().isoformat())
+
+        _write_status(job_dir, stage='promoting', progress=0.9, comparison=comparison)
+        path, size_mb = publish_model(candidate_data, status['registry_dir'])
+        print(f"🚀 Promoted {path} ({size_mb:.1f}MB)")
+        return _write_status(job_dir, state='promoted', stage=None, progress=1.0, promoted_path=path,
+                             finished=datetime.now().isoformat())
+
+    except Exception as e:
+        print(f"❌ Retraining failed: {e}")
+        return _write_status(job_dir, state='failed', stage=None, error=str(e), finished=datetime.now().isoformat())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Background retraining jobs')
+    parser.add_argument('--jobs-dir', default=RETRAIN_JOBS_DIR)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    start = commands.add_parser('start', help='Launch a retraining job and return immediately')
+    start.add_argument('--registry', default=MODEL_REGISTRY_DIR)
+    start.add_argument('--live-model', default=None, help='Artifact to beat (default: the one being served)')
+    start.add_argument('--careers', type=int, default=len(core_careers))
+    start.add_argument('--samples-per-career', type=int, default=30)
+    start.add_argument('--seed', type=int, default=FOREST_PARAMS['random_state'])
+
+    status = commands.add_parser('status', help='Show one job, or all jobs')
+    status.add_argument('job_id', nargs='?')
+
+    run = commands.add_parser('run', help='Job process entry point (used by start)')
+    run.add_argument('--job-dir', required=True)
+
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    if args.command == 'run':
+        return run_job(args.job_dir)
+    if args.command == 'start':
+        config = {'careers': args.careers, 'samples_per_career': args.samples_per_career, 'seed': args.seed}
+        result = start_job(config, args.jobs_dir, args.registry, args.live_model)
+    else:
+        result = job_status(args.job_id, args.jobs_dir) if args.job_id else list_jobs(args.jobs_dir)
+    print(json.dumps(result, indent=2))
+    return result
+
+if __name__ == '__main__':
+    main()
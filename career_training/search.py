@@ -0,0 +1,179 @@
+"""
+Hyperparameter Search
+Trains a grid of forest configurations in parallel on one cached dataset,
+measures validation accuracy, size, load time and latency for each, and
+reports the accuracy/latency/size Pareto front. The chosen configuration is
+retrained as a full artifact with its serving costs in performance['latency'];
+its test split is never seen during the search
+
+python -m career_training.search --trees 25 50 100 --max-depth 8 12 16
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from sklearn.model_selection import train_test_split
+
+from model_utils import top_k_accuracy
+from career_training.data import core_careers, create_synthetic_catalog
+from career_training.cache import DATASET_CACHE_DIR, cached_dataset, load_training_data
+from career_training.train import FOREST_PARAMS, build_forest, split_and_scale, serving_costs, train_config
+
+SEARCH_MODEL_FILE = 'search_best_career_model.pkl'
+
+# Maximized and minimized objectives of the Pareto front
+MAXIMIZE = ('top_1_accuracy', 'top_5_accuracy')
+MINIMIZE = ('single_row_ms', 'size_mb')
+
+# Share of the training portion held out to rank configurations
+VALIDATION_FRACTION = 0.2
+
+@functools.lru_cache(maxsize=2)
+def _split_data(careers, samples_per_career, seed, cache_dir):
+    """Scaled train/validation split of the cached dataset, loaded once per worker process
+
+    The validation rows come out of the training portion of the same
+    split_and_scale split train_config uses, so the test accuracy reported
+    for the chosen artifact is not biased by the selection.
+    """
+    catalog = create_synthetic_catalog(careers)
+    X, y, _ = load_training_data(catalog, samples_per_career, seed, cache_dir)
+    _, _, X_train, _, y_train, _ = split_and_scale(X, y)
+    X_fit, X_validation, y_fit, y_validation = train_test_split(
+        X_train, y_train, test_size=VALIDATION_FRACTION, random_state=seed, stratify=y_train
+    )
+    return X_fit, X_validation, y_fit, y_validation
+
+def evaluate_params(params, data):
+    """Fit one forest configuration and measure it on the validation rows"""
+
+    warnings.filterwarnings('ignore')
+    X_fit, X_validation, y_fit, y_validation = _split_data(*data)
+
+    # Same forest seed as the final train_config run
+    started = datetime.now()
+    forest = build_forest(**{'random_state': data[2], **params}, n_jobs=1).fit(X_fit, y_fit)
+    train_seconds = (datetime.now() - started).total_seconds()
+
+    probabilities = forest.predict_proba(X_validation)
+    return {
+        'params': params,
+        'train_seconds': train_seconds,
+        'top_1_accuracy': top_k_accuracy(probabilities, y_validation, 1),
+        'top_5_accuracy': top_k_accuracy(probabilities, y_validation, 5),
+        **serving_costs(forest, X_validation)
+    }
+
+def dominates(a, b):
+    """a is at least as good as b on every objective and better on one"""
+    no_worse = all(a[m] >= b[m] for m in MAXIMIZE) and all(a[m] <= b[m] for m in MINIMIZE)
+    better = any(a[m] > b[m] for m in MAXIMIZE) or any(a[m] < b[m] for m in MINIMIZE)
+    return no_worse and better
+
+def pareto_front(results):
+    """Results not dominated by any other, best top-1 first"""
+    front = [r for r in results if not any(dominates(other, r) for other in results)]
+    return sorted(front, key=lambda r: -r['top_1_accuracy'])
+
+def choose(front, max_latency_ms=None, max_size_mb=None):
+    """Most accurate front member within the latency and size budgets (or None)"""
+    for result in front:
+        if max_latency_ms is not None and result['single_row_ms'] > max_latency_ms:
+            continue
+        if max_size_mb is not None and result['size_mb'] > max_size_mb:
+            continue
+        return result
+    return None
+
+def run_search(grid, data, workers=None):
+    """Evaluate every parameter set, in parallel when workers > 1
+
+    Latencies are measured inside the workers, so keep workers at or below
+    the idle core count; the chosen model is re-measured on its own anyway.
+    """
+
+    workers = min(workers or os.cpu_count() or 1, len(grid))
+    evaluate = functools.partial(evaluate_params, data=data)
+    if workers <= 1:
+        return [evaluate(params) for params in grid]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(evaluate, grid))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Parallel forest hyperparameter search with a Pareto front')
+    parser.add_argument('--careers', type=int, default=len(core_careers))
+    parser.add_argument('--samples-per-career', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=FOREST_PARAMS['random_state'])
+    parser.add_argument('--trees', type=int, nargs='+', default=[25, 50, 100])
+    parser.add_argument('--max-depth', type=int, nargs='+', default=[8, 12, 16])
+    parser.add_argument('--min-samples-leaf', type=int, nargs='+', default=[2, 4, 8])
+    parser.add_argument('--max-features', nargs='+', default=['sqrt'])
+    parser.add_argument('--max-latency-ms', type=float, default=None, help='Single-row latency budget for the choice')
+    parser.add_argument('--max-size-mb', type=float, default=None, help='Model size budget for the choice')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=DATASET_CACHE_DIR)
+    parser.add_argument('--report', default='hyperparameter_search.json', help='JSON report of every configuration')
+    parser.add_argument('--output', default=SEARCH_MODEL_FILE, help='Artifact for the chosen configuration')
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("🔎 Hyperparameter Search")
+    print("=" * 60)
+
+    # Generate (or find) the dataset once, before workers race to build it
+    data = (args.careers, args.samples_per_career, args.seed, args.cache_dir)
+    _, _, _, hit = cached_dataset(create_synthetic_catalog(args.careers), args.samples_per_career, args.seed, args.cache_dir)
+    print(f"📦 Dataset {'reused from' if hit else 'written to'} {args.cache_dir}")
+
+    max_features = [v if v in ('sqrt', 'log2') else float(v) for v in args.max_features]
+    grid = [
+        {'n_estimators': trees, 'max_depth': depth, 'min_samples_leaf': leaf, 'max_features': features}
+        for trees, depth, leaf, features in itertools.product(args.trees, args.max_depth, args.min_samples_leaf, max_features)
+    ]
+    print(f"⚙️ Evaluating {len(grid)} configurations...")
+    started = datetime.now()
+    results = run_search(grid, data, args.workers)
+    print(f"✅ Done in {(datetime.now() - started).total_seconds():.1f}s")
+
+    front = pareto_front(results)
+    print(f"\n📊 Pareto front ({len(front)} of {len(results)}):")
+    for result in front:
+        params = result['params']
+        print(f"   validation top-1 {result['top_1_accuracy']:.1%}  top-5 {result['top_5_accuracy']:.1%}  "
+              f"{result['single_row_ms']:.2f}ms/row  {result['size_mb']:.1f}MB  "
+              f"trees {params['n_estimators']}  depth {params['max_depth']}  leaf {params['min_samples_leaf']}  "
+              f"features {params['max_features']}")
+
+    chosen = choose(front, args.max_latency_ms, args.max_size_mb)
+    report = {'dataset': dict(zip(('careers', 'samples_per_career', 'seed'), data)), 'results': results,
+              'pareto_front': front, 'chosen': chosen}
+
+    if chosen is None:
+        print("⚠️ No configuration fits the budgets; nothing retrained")
+    else:
+        print(f"\n🏆 Chosen: {chosen['params']}")
+        summary = train_config({
+            'output': args.output,
+            'careers': args.careers,
+            'samples_per_career': args.samples_per_career,
+            'seed': args.seed,
+            'cache_dir': args.cache_dir,
+            'forest': chosen['params'],
+            'record_latency': True,
+            'quiet': True
+        })
+        report['artifact'] = summary
+        print(f"💾 Model saved: {args.output} (test accuracy {summary['test_accuracy']:.1%}, "
+              f"{summary['latency']['single_row_ms']:.2f}ms/row recorded in performance['latency'])")
+
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved: {args.report}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+"""
+Sharded Training
+Splits a cached dataset into shards, trains an independent sub-forest on each
+(in a local process pool, or one `train` call per node over a shared
+directory) and merges the trees into a single forest artifact with one
+LabelEncoder and classes_
+
+    python -m career_training.shards run --shards 4 --samples-per-career 30000
+    python -m career_training.shards plan --shard-dir /shared/run1 --shards 8 ...
+    python -m career_training.shards train --shard-dir /shared/run1 --shard 3
+    python -m career_training.shards merge --shard-dir /shared/run1 --output model.pkl
+"""
+
+import argparse
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.tree._tree import Tree
+
+from model_utils import MODEL_FILE, load_artifact, save_artifact
+from profile_features import FEATURE_NAMES, features_from_bits
+from subject_table import build_table
+from career_training.data import create_synthetic_catalog, core_careers
+from career_training.cache import DATASET_CACHE_DIR, dataset_key, cached_dataset, unpack_bits
+from career_training.train import FOREST_PARAMS, BACKENDS, build_forest, assemble_model_data
+from career_training.bitset_trees import fit_bitset_forest
+from career_training.cli import parse_max_features
+
+SHARD_DIR = 'training_shards'
+
+# Rows featurized at once; bounds the float buffers while scaling and scoring
+FEATURE_CHUNK_ROWS = 250_000
+
+# The merged model is evaluated on at most this many holdout (and training) rows
+EVAL_MAX_ROWS = 200_000
+
+def _path(shard_dir, name):
+    return os.path.join(shard_dir, name)
+
+def _load_plan(shard_dir):
+    with open(_path(shard_dir, 'plan.json')) as f:
+        return json.load(f)
+
+def _plan_dataset(plan):
+    """The plan's cached dataset, regenerated identically if this node lacks it"""
+
+    catalog = create_synthetic_catalog(plan['careers'])
+    if dataset_key(catalog, plan['samples_per_career'], plan['seed']) != plan['dataset_key']:
+        raise ValueError('This checkout generates a different dataset than the one the plan was made from')
+    packed, labels, meta, _ = cached_dataset(catalog, plan['samples_per_career'], plan['seed'], plan['cache_dir'])
+    return packed, labels, np.array(meta['careers'])
+
+def scaled_features(packed, rows, scaler, dtype=np.float32):
+    """Scaled feature matrix for the given dataset rows, built chunk by chunk"""
+
+    X = np.empty((len(rows), len(FEATURE_NAMES)), dtype=dtype)
+    for start in range(0, len(rows), FEATURE_CHUNK_ROWS):
+        chunk = rows[start:start + FEATURE_CHUNK_ROWS]
+        X[start:start + len(chunk)] = scaler.transform(features_from_bits(unpack_bits(packed[chunk])))
+    return X
+
+def plan_shards(shard_dir, careers=len(core_careers), samples_per_career=30, seed=42, shards=4,
+                forest_params=None, backend='sklearn', cache_dir=DATASET_CACHE_DIR, split_seed=42):
+    """Split a cached dataset into a holdout and training shards and fit the shared scaler
+
+    Writes plan.json, scaler.pkl, holdout_rows.npy and shard_<i>_rows.npy
+    into shard_dir; every later step reads only that directory and the
+    dataset cache.
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    forest_params = {**FOREST_PARAMS, **(forest_params or {})}
+    if forest_params['n_estimators'] < shards:
+        raise ValueError('Need at least one tree per shard')
+
+    catalog = create_synthetic_catalog(careers)
+    packed, labels, meta, hit = cached_dataset(catalog, samples_per_career, seed, cache_dir)
+    print(f"{'♻️ Cached' if hit else '✅ Generated'} dataset: {meta['rows']:,} profiles for {len(catalog)} careers")
+
+    # Same stratified 25% holdout as split_and_scale, drawn over row indices only
+    train_rows, holdout_rows = train_test_split(
+        np.arange(len(labels)), test_size=0.25, random_state=split_seed, stratify=labels
+    )
+    os.makedirs(shard_dir, exist_ok=True)
+    np.save(_path(shard_dir, 'holdout_rows.npy'), np.sort(holdout_rows))
+
+    # Sorted rows read the memory-mapped cache front to back
+    shard_rows = [np.sort(rows) for rows in np.array_split(train_rows, shards)]
+    for shard, rows in enumerate(shard_rows):
+        np.save(_path(shard_dir, f'shard_{shard}_rows.npy'), rows)
+
+    # One scaler for every shard, so their thresholds live in the same space
+    print("📏 Fitting the shared scaler...")
+    scaler = StandardScaler()
+    ordered = np.sort(train_rows)
+    for start in range(0, len(ordered), FEATURE_CHUNK_ROWS):
+        scaler.partial_fit(features_from_bits(unpack_bits(packed[ordered[start:start + FEATURE_CHUNK_ROWS]])))
+    save_artifact(scaler, _path(shard_dir, 'scaler.pkl'))
+
+    plan = {
+        'careers': careers,
+        'samples_per_career': samples_per_career,
+        'seed': seed,
+        'split_seed': split_seed,
+        'cache_dir': cache_dir,
+        'dataset_key': dataset_key(catalog, samples_per_career, seed),
+        'shards': shards,
+        'shard_rows': [len(rows) for rows in shard_rows],
+        'shard_trees': [len(trees) for trees in np.array_split(np.arange(forest_params['n_estimators']), shards)],
+        'holdout_rows': len(holdout_rows),
+        'forest': forest_params,
+        'backend': backend,
+        'created': datetime.now().isoformat()
+    }
+    with open(_path(shard_dir, 'plan.json'), 'w') as f:
+        json.dump(plan, f, indent=2)
+
+    print(f"🗂️ {shards} shards of ~{len(train_rows) // shards:,} rows, "
+          f"{forest_params['n_estimators']} trees in total, {len(holdout_rows):,} holdout rows -> {shard_dir}")
+    return plan
+
+def train_shard(shard_dir, shard, n_jobs=None):
+    """Train one shard's sub-forest and publish it as shard_<i>.pkl
+
+    Each shard seeds its forest from (plan seed, shard), so no two shards
+    draw the same bootstraps. n_jobs overrides the plan's forest n_jobs.
+    """
+
+    started = time.perf_counter()
+    plan = _load_plan(shard_dir)
+    if not 0 <= shard < plan['shards']:
+        raise ValueError(f"Shard {shard} is not in this plan (0..{plan['shards'] - 1})")
+
+    packed, labels, careers = _plan_dataset(plan)
+    rows = np.load(_path(shard_dir, f'shard_{shard}_rows.npy'))
+    scaler = load_artifact(_path(shard_dir, 'scaler.pkl'))
+    X = scaled_features(packed, rows, scaler)
+
+    # A small shard may miss careers; merge maps its classes onto the union
+    label_encoder = LabelEncoder()
+    y = label_encoder.fit_transform(careers[labels[rows]])
+
+    forest_params = {
+        **plan['forest'],
+        'n_estimators': plan['shard_trees'][shard],
+        'random_state': int(np.random.SeedSequence([plan['seed'], shard]).generate_state(1)[0] >> 1)
+    }
+    if n_jobs is not None:
+        forest_params['n_jobs'] = n_jobs
+
+    print(f"🌲 Shard {shard}: {forest_params['n_estimators']} trees on {len(rows):,} rows ({plan['backend']})")
+    if plan['backend'] == 'bitset':
+        model = fit_bitset_forest(X, y, build_forest(**forest_params).get_params())
+    else:
+        model = build_forest(**forest_params).fit(X, y)
+
+    # Publish atomically so merge never reads a half-written shard
+    output = _path(shard_dir, f'shard_{shard}.pkl')
+    staging = f"{output}.tmp{os.getpid()}"
+    save_artifact({
+        'shard': shard,
+        'model': model,
+        'career_names': list(label_encoder.classes_),
+        'rows': len(rows),
+        'random_state': forest_params['random_state'],
+        'seconds': time.perf_counter() - started
+    }, staging)
+    os.replace(staging, output)
+    print(f"💾 Shard {shard} saved: {output} ({time.perf_counter() - started:.1f}s)")
+    return output
+
+def remap_classes(estimator, columns, n_classes):
+    """Re-express a fitted tree's leaf values over the merged class list"""
+
+    state = estimator.tree_.__getstate__()
+    values = np.zeros((state['node_count'], 1, n_classes), dtype=state['values'].dtype)
+    values[:, :, columns] = state['values']
+
+    tree = Tree(estimator.n_features_in_, np.array([n_classes], dtype=np.intp), 1)
+    tree.__setstate__({**state, 'values': values})
+    estimator.tree_ = tree
+    estimator.classes_ = np.arange(n_classes)
+    estimator.n_classes_ = n_classes
+    return estimator
+
+def merge_shards(shard_dir, output=MODEL_FILE, model_version='4.2_sharded', record_latency=False):
+    """Concatenate the shard forests into one model_data artifact and save it
+
+    Careers are encoded over the union of the shards' careers; trees from
+    shards that saw fewer careers get zero probability for the rest. The
+    merged model is evaluated on (up to EVAL_MAX_ROWS of) the holdout.
+    """
+
+    plan = _load_plan(shard_dir)
+    missing = [shard for shard in range(plan['shards'])
+               if not os.path.exists(_path(shard_dir, f'shard_{shard}.pkl'))]
+    if missing:
+        raise FileNotFoundError(f"Shards not trained yet: {missing}")
+
+    parts = [load_artifact(_path(shard_dir, f'shard_{shard}.pkl')) for shard in range(plan['shards'])]
+    label_encoder = LabelEncoder().fit(sorted(set().union(*(part['career_names'] for part in parts))))
+    n_classes = len(label_encoder.classes_)
+
+    print(f"🔗 Merging {len(parts)} shards over {n_classes} careers...")
+    estimators = []
+    for part in parts:
+        columns = label_encoder.transform(part['career_names'])
+        same_classes = np.array_equal(columns, np.arange(n_classes))
+        for estimator in part['model'].estimators_:
+            estimators.append(estimator if same_classes else remap_classes(estimator, columns, n_classes))
+
+    model = build_forest(**{**plan['forest'], 'n_estimators': len(estimators)})
+    model.estimators_ = estimators
+    model.estimator_ = parts[0]['model'].estimator_
+    model.classes_ = np.arange(n_classes)
+    model.n_classes_ = n_classes
+    model.n_outputs_ = 1
+    model.n_features_in_ = len(FEATURE_NAMES)
+
+    # Evaluate on the holdout and a same-sized sample of training rows
+    packed, labels, careers = _plan_dataset(plan)
+    scaler = load_artifact(_path(shard_dir, 'scaler.pkl'))
+    rng = np.random.default_rng(plan['split_seed'])
+    holdout_rows = np.load(_path(shard_dir, 'holdout_rows.npy'))
+    train_rows = np.concatenate([np.load(_path(shard_dir, f'shard_{shard}_rows.npy')) for shard in range(plan['shards'])])
+    samples = []
+    for rows in (train_rows, holdout_rows):
+        if len(rows) > EVAL_MAX_ROWS:
+            rows = np.sort(rng.choice(rows, EVAL_MAX_ROWS, replace=False))
+        # Careers no shard trained on can't be scored
+        rows = rows[np.isin(careers[labels[rows]], label_encoder.classes_)]
+        samples.append((scaled_features(packed, rows, scaler, np.float64),
+                        label_encoder.transform(careers[labels[rows]])))
+    (X_train_scaled, y_train), (X_test_scaled, y_test) = samples
+
+    model_data = assemble_model_data(
+        model, label_encoder, scaler, X_train_scaled, y_train, X_test_scaled, y_test, list(FEATURE_NAMES),
+        model_version, {**plan['forest'], 'n_estimators': len(estimators)}, sum(plan['shard_rows']) + plan['holdout_rows'], plan['backend'],
+        record_latency
+    )
+    model_data['performance']['shards'] = {
+        'count': plan['shards'],
+        'rows': plan['shard_rows'],
+        'trees': plan['shard_trees'],
+        'seconds': [part['seconds'] for part in parts],
+        'evaluation_rows': len(y_test)
+    }
+
+    size_mb = save_artifact(model_data, output)
+    print(f"💾 Model saved: {output} ({size_mb:.1f}MB)")
+
+    # Subject-only lookups are tied to this exact model
+    if output == MODEL_FILE:
+        print("📋 Rebuilding subject-only recommendation table...")
+        build_table(model_data, verbose=False)
+    return model_data
+
+def _train_shard_job(job):
+    shard_dir, shard, n_jobs = job
+    return train_shard(shard_dir, shard, n_jobs)
+
+def run_local(shard_dir, workers=None, **plan_options):
+    """plan, train every shard in a local process pool, then merge the trees"""
+
+    output = plan_options.pop('output', MODEL_FILE)
+    plan = plan_shards(shard_dir, **plan_options)
+    workers = min(workers or os.cpu_count() or 1, plan['shards'])
+
+    started = time.perf_counter()
+    if workers <= 1:
+        for shard in range(plan['shards']):
+            train_shard(shard_dir, shard)
+    else:
+        # One core per worker; a forest's own thread pool would oversubscribe the machine
+        jobs = [(shard_dir, shard, 1) for shard in range(plan['shards'])]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_train_shard_job, jobs))
+    print(f"⏱️ {plan['shards']} shards trained in {time.perf_counter() - started:.1f}s on {workers} worker(s)")
+    return merge_shards(shard_dir, output)
+
+def _add_plan_arguments(parser):
+    parser.add_argument('--shards', type=int, default=4)
+    parser.add_argument('--careers', type=int, default=len(core_careers))
+    parser.add_argument('--samples-per-career', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=FOREST_PARAMS['random_state'])
+    parser.add_argument('--trees', type=int, default=FOREST_PARAMS['n_estimators'], help='Total trees across all shards')
+    parser.add_argument('--max-depth', type=int, default=FOREST_PARAMS['max_depth'])
+    parser.add_argument('--min-samples-leaf', type=int, default=FOREST_PARAMS['min_samples_leaf'])
+    parser.add_argument('--min-samples-split', type=int, default=FOREST_PARAMS['min_samples_split'])
+    parser.add_argument('--max-features', type=parse_max_features, default=FOREST_PARAMS['max_features'])
+    parser.add_argument('--backend', choices=BACKENDS, default='sklearn',
+                        help='bitset is experimental and only faster beyond ~1M rows per shard')
+    parser.add_argument('--cache-dir', default=DATASET_CACHE_DIR, help='Dataset cache every node can read')
+
+def _plan_options(args):
+    return {
+        'careers': args.careers,
+        'samples_per_career': args.samples_per_career,
+        'seed': args.seed,
+        'shards': args.shards,
+        'backend': args.backend,
+        'cache_dir': args.cache_dir,
+        'forest_params': {
+            'n_estimators': args.trees,
+            'max_depth': args.max_depth,
+            'min_samples_leaf': args.min_samples_leaf,
+            'min_samples_split': args.min_samples_split,
+            'max_features': args.max_features
+        }
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train one forest as independently trained, merged shards')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan = commands.add_parser('plan', help='Split the dataset and fit the shared scaler')
+    plan.add_argument('--shard-dir', default=SHARD_DIR)
+    _add_plan_arguments(plan)
+
+    train = commands.add_parser('train', help='Train shards of an existing plan (one call per node)')
+    train.add_argument('--shard-dir', default=SHARD_DIR)
+    train.add_argument('--shard', type=int, nargs='+', required=True)
+    train.add_argument('--jobs', type=int, default=None, help='Tree-building threads (default: the plan\'s n_jobs)')
+
+    merge = commands.add_parser('merge', help='Merge trained shards into one model artifact')
+    merge.add_argument('--shard-dir', default=SHARD_DIR)
+    merge.add_argument('--output', default=MODEL_FILE)
+    merge.add_argument('--record-latency', action='store_true')
+
+    run = commands.add_parser('run', help='plan, train and merge locally with a process pool')
+    run.add_argument('--shard-dir', default=SHARD_DIR)
+    run.add_argument('--output', default=MODEL_FILE)
+    run.add_argument('--workers', type=int, default=None, help='Parallel shard processes (default: CPU count)')
+    _add_plan_arguments(run)
+
+    args = parser.parse_args(argv)
+    warnings.filterwarnings('ignore')
+
+    print("🧩 Sharded Forest Training")
+    print("=" * 60)
+    if args.command == 'plan':
+        plan_shards(args.shard_dir, **_plan_options(args))
+    elif args.command == 'train':
+        for shard in args.shard:
+            train_shard(args.shard_dir, shard, args.jobs)
+    elif args.command == 'merge':
+        merge_shards(args.shard_dir, args.output, record_latency=args.record_latency)
+    else:
+        run_local(args.shard_dir, args.workers, output=args.output, **_plan_options(args))
+
+if __name__ == '__main__':
+    main()
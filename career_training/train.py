@@ -0,0 +1,353 @@
+"""
+Model Training
+Forest construction and the split/scale/fit/evaluate step that produces the
+model_data artifact
+"""
+
+import contextlib
+import io
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.model_selection import train_test_split
+
+from cascade import train_first_stage, calibrate_cascade
+from model_utils import select_active_features, save_artifact, measure_latency, top_k_accuracy
+from career_similarity import compute_similarity
+from hierarchical_model import HierarchicalCareerModel, family_index
+from career_training.data import (
+    core_careers, subjects, interest_mapping, create_comprehensive_features, create_synthetic_catalog
+)
+from career_training.cache import DATASET_CACHE_DIR, load_training_data
+from career_training.bitset_trees import fit_bitset_forest
+
+# Hand-picked parameters for 38 careers
+FOREST_PARAMS = {
+    'n_estimators': 100,
+    'max_depth': 12,
+    'min_samples_split': 8,
+    'min_samples_leaf': 4,
+    'max_features': 'sqrt',
+    'random_state': 42,
+    'n_jobs': -1
+}
+
+# Tree builders for flat forests: sklearn's (default), or the experimental bitset trainer, which
+# is only faster beyond about a million training rows (see bitset_trees)
+BACKENDS = ('sklearn', 'bitset')
+
+# Trees fitted between progress reports when training reports progress
+PROGRESS_TREE_CHUNK = 10
+
+def build_forest(**overrides):
+    """Random forest with the hand-picked parameters, optionally overridden"""
+    return RandomForestClassifier(**{**FOREST_PARAMS, **overrides})
+
+def print_test_prediction(model_data, subjects_input, interests_input):
+    """Print the top 5 careers a saved model gives for one profile"""
+
+    features, _ = create_comprehensive_features(subjects_input, interests_input)
+    features_scaled = model_data['scaler'].transform(select_active_features(model_data, features))
+    probabilities = model_data['model'].predict_proba(features_scaled)[0]
+
+    top_indices = np.argsort(probabilities)[-5:][::-1]
+
+    print("   Top 5 recommendations:")
+    for i, idx in enumerate(top_indices, 1):
+        career_name = model_data['label_encoder'].inverse_transform([idx])[0]
+        confidence = probabilities[idx]
+        print(f"      {i}. {career_name} - {confidence*100:.1f}% confidence")
+
+# Defaults for growing a forest until its out-of-bag accuracy plateaus
+EARLY_STOPPING = {
+    'chunk': 10,        # trees added per step
+    'max_trees': 300,
+    'patience': 2,      # steps without enough gain before stopping
+    'min_gain': 0.002,  # OOB top-k accuracy gain that counts as progress
+    'k': 5
+}
+
+def fit_forest_in_chunks(X_train, y_train, forest_params=None, progress=None, chunk=PROGRESS_TREE_CHUNK):
+    """Fit a flat forest a few trees at a time with warm_start, calling progress(fraction) after each chunk
+
+    Gives the same trees as a single fit: warm_start draws the seeds of new
+    trees from the same random_state sequence.
+    """
+
+    forest = build_forest(**(forest_params or {}))
+    total = forest.n_estimators
+    forest.set_params(warm_start=True)
+    for trees in range(min(chunk, total), total + chunk, chunk):
+        forest.n_estimators = min(trees, total)
+        forest.fit(X_train, y_train)
+        if progress:
+            progress(forest.n_estimators / total)
+        if forest.n_estimators == total:
+            break
+    forest.warm_start = False
+    return forest
+
+def grow_forest_oob(X_train, y_train, forest_params=None, early_stopping=None):
+    """Grow a forest chunk by chunk with warm_start until OOB top-k accuracy plateaus
+
+    Returns the forest trimmed to the tree count where the plateau began and
+    the OOB curve. Rows that no tree has left out yet are ignored.
+    """
+
+    settings = {**EARLY_STOPPING, **(early_stopping or {})}
+    forest = build_forest(**{
+        **(forest_params or {}), 'n_estimators': settings['chunk'], 'warm_start': True, 'oob_score': True
+    })
+
+    curve = []
+    best_trees, best_score, stale = 0, -1.0, 0
+    while True:
+        forest.fit(X_train, y_train)
+        oob = np.nan_to_num(forest.oob_decision_function_)
+        seen = oob.sum(axis=1) > 0
+        point = {
+            'trees': forest.n_estimators,
+            'oob_top_1': top_k_accuracy(oob[seen], y_train[seen], 1),
+            'oob_top_k': top_k_accuracy(oob[seen], y_train[seen], settings['k'])
+        }
+        curve.append(point)
+
+        if point['oob_top_k'] > best_score + settings['min_gain']:
+            best_trees, best_score, stale = point['trees'], point['oob_top_k'], 0
+        else:
+            stale += 1
+        if stale >= settings['patience'] or forest.n_estimators >= settings['max_trees']:
+            break
+        forest.n_estimators += settings['chunk']
+
+    # The OOB attributes describe the untrimmed forest, so drop them
+    forest.estimators_ = forest.estimators_[:best_trees]
+    forest.n_estimators = best_trees
+    forest.warm_start = False
+    forest.oob_score = False
+    for attribute in ('oob_score_', 'oob_decision_function_'):
+        if hasattr(forest, attribute):
+            delattr(forest, attribute)
+    return forest, {'trees': best_trees, 'settings': settings, 'curve': curve}
+
+def split_and_scale(X, y, split_seed=42):
+    """Encode labels, hold out a stratified 25% and scale: the data every trainer sees
+
+    Returns (label_encoder, scaler, X_train_scaled, X_test_scaled, y_train, y_test).
+    """
+
+    # Encode labels
+    label_encoder = LabelEncoder()
+    y_encoded = label_encoder.fit_transform(y)
+
+    # Split data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y_encoded, test_size=0.25, random_state=split_seed, stratify=y_encoded
+    )
+
+    # Scale features
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+    return label_encoder, scaler, X_train_scaled, X_test_scaled, y_train, y_test
+
+def serving_costs(model, X_test_scaled):
+    """Serialized size, unpickle time and predict_proba latency of a fitted model"""
+
+    serialized = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    started = time.perf_counter()
+    pickle.loads(serialized)
+    load_ms = (time.perf_counter() - started) * 1000
+    return {
+        'size_mb': len(serialized) / (1024*1024),
+        'load_ms': load_ms,
+        **measure_latency(model, X_test_scaled)
+    }
+
+def assemble_model_data(model, label_encoder, scaler, X_train_scaled, y_train, X_test_scaled, y_test,
+                        feature_names, model_version, forest_params, training_samples, backend='sklearn',
+                        record_latency=False, career_families=None):
+    """Evaluate a fitted model, train its cascade and build the model_data artifact
+
+    Shared by fit_model_data and the shard merge step; forest_params are
+    recorded as given.
+    """
+
+    # Evaluate
+    train_score = model.score(X_train_scaled, y_train)
+    test_score = model.score(X_test_scaled, y_test)
+
+    print(f"✅ Training completed!")
+    print(f"📊 Train accuracy: {train_score:.3f} ({train_score*100:.1f}%)")
+    print(f"📊 Test accuracy: {test_score:.3f} ({test_score*100:.1f}%)")
+
+    overfitting = train_score - test_score
+    print(f"📊 Overfitting gap: {overfitting:.3f}")
+
+    # Train the cheap first-stage model for the optional cascade
+    print("⚡ Training cascade first stage...")
+    first_stage = train_first_stage(X_train_scaled, y_train)
+    cascade_data = calibrate_cascade(first_stage, model, X_test_scaled)
+    calibration = cascade_data['calibration']
+    print(f"📊 Cascade threshold: {cascade_data['threshold']:.3f}")
+    print(f"📊 Cascade escalation rate: {calibration['escalation_rate']:.1%}")
+    if calibration['agreement_rate'] is not None:
+        print(f"📊 Cascade agreement rate: {calibration['agreement_rate']:.1%}")
+
+    # Assemble improved model
+    model_data = {
+        'model': model,
+        'scaler': scaler,
+        'label_encoder': label_encoder,
+        'subjects': subjects,
+        'interest_mapping': interest_mapping,
+        'feature_names': feature_names,
+        'career_names': list(label_encoder.classes_),
+        'is_trained': True,
+        'training_date': datetime.now().isoformat(),
+        'model_version': model_version,
+        'cascade': cascade_data,
+        'performance': {
+            'train_accuracy': train_score,
+            'test_accuracy': test_score,
+            'overfitting': overfitting,
+            'career_count': len(label_encoder.classes_),
+            'feature_count': len(feature_names),
+            'training_samples': training_samples,
+            'forest_params': dict(forest_params),
+            'backend': backend
+        }
+    }
+
+    if record_latency:
+        print("⏱️ Measuring serving costs...")
+        model_data['performance']['latency'] = serving_costs(model, X_test_scaled)
+
+    if career_families:
+        model_data['career_families'] = {c: career_families[c] for c in label_encoder.classes_}
+    else:
+        # Ship the career similarity matrix so serving doesn't recompute it
+        model_data['career_similarity'] = compute_similarity(model_data)
+
+    return model_data
+
+def fit_model_data(X, y, feature_names, model_version='4.0_improved_quick', career_families=None,
+                   forest_params=None, split_seed=42, record_latency=False, early_stopping=None,
+                   backend='sklearn', progress=None):
+    """Split, scale and train the forest plus cascade, returning the model_data artifact
+
+    With career_families ({career: family}) a HierarchicalCareerModel is
+    trained instead of one flat forest. forest_params override FOREST_PARAMS.
+    record_latency stores serving_costs in performance['latency'].
+    early_stopping (EARLY_STOPPING overrides, or {} for the defaults) grows
+    the flat forest with grow_forest_oob instead of a fixed tree count.
+    backend 'bitset' trains the flat forest with fit_bitset_forest.
+    progress(fraction) is called as the flat sklearn forest's trees are fitted.
+    """
+
+    forest_params = forest_params or {}
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    if backend != 'sklearn' and (career_families or early_stopping is not None):
+        raise ValueError('Hierarchical models and early stopping need the sklearn backend')
+    label_encoder, scaler, X_train_scaled, X_test_scaled, y_train, y_test = split_and_scale(X, y, split_seed)
+
+    # Train model with optimal parameters for 38 careers
+    print("🤖 Training improved model...")
+    if career_families:
+        family_of, family_names = family_index(label_encoder.classes_, career_families)
+        model = HierarchicalCareerModel(family_of, family_names, build_forest(**forest_params).get_params())
+        print(f"🌳 Hierarchical: {len(family_names)} families, top {model.top_families} consulted per profile")
+        model.fit(X_train_scaled, y_train)
+    elif early_stopping is not None:
+        model, oob_growth = grow_forest_oob(X_train_scaled, y_train, forest_params, early_stopping)
+        kept = next(point for point in oob_growth['curve'] if point['trees'] == oob_growth['trees'])
+        print(f"🌲 Out-of-bag plateau at {oob_growth['trees']} trees "
+              f"(OOB top-{oob_growth['settings']['k']} {kept['oob_top_k']:.1%}, "
+              f"grown to {oob_growth['curve'][-1]['trees']})")
+    elif backend == 'bitset':
+        print("🧮 Bitset tree backend (experimental; slower than sklearn below ~1M training rows)")
+        model = fit_bitset_forest(X_train_scaled, y_train, build_forest(**forest_params).get_params())
+    elif progress:
+        model = fit_forest_in_chunks(X_train_scaled, y_train, forest_params, progress)
+    else:
+        model = build_forest(**forest_params)
+        model.fit(X_train_scaled, y_train)
+
+    model_data = assemble_model_data(
+        model, label_encoder, scaler, X_train_scaled, y_train, X_test_scaled, y_test, feature_names,
+        model_version, {**FOREST_PARAMS, **forest_params}, len(X), backend, record_latency, career_families
+    )
+    if early_stopping is not None and not career_families:
+        model_data['performance']['forest_params']['n_estimators'] = oob_growth['trees']
+        model_data['performance']['oob_early_stopping'] = oob_growth
+    return model_data
+
+def train_config(config, progress=None):
+    """Generate data, train and save one configuration, returning its summary
+
+    config keys: output, careers, samples_per_career, seed, hierarchical,
+    forest (FOREST_PARAMS overrides), cache_dir (None skips the dataset
+    cache), record_latency, early_stopping, backend and quiet (silence the
+    training log). progress(fraction) reports how much of a flat sklearn
+    forest has been fitted.
+    """
+
+    started = datetime.now()
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log) if config.get('quiet') else contextlib.nullcontext():
+        catalog = create_synthetic_catalog(config.get('careers', len(core_careers)))
+        X, y, feature_names = load_training_data(
+            catalog, config.get('samples_per_career', 30), config.get('seed'),
+            config.get('cache_dir', DATASET_CACHE_DIR)
+        )
+        print(f"✅ {len(X)} training samples for {len(catalog)} careers")
+
+        forest_params = dict(config.get('forest', {}))
+        if config.get('seed') is not None:
+            forest_params.setdefault('random_state', config['seed'])
+
+        if config.get('hierarchical'):
+            families = {career: spec['family'] for career, spec in catalog.items()}
+            model_data = fit_model_data(X, y, feature_names, '4.1_hierarchical', families, forest_params,
+                                        record_latency=config.get('record_latency', False))
+        else:
+            model_data = fit_model_data(X, y, feature_names, forest_params=forest_params,
+                                        record_latency=config.get('record_latency', False),
+                                        early_stopping=config.get('early_stopping'),
+                                        backend=config.get('backend', 'sklearn'), progress=progress)
+
+        size_mb = save_artifact(model_data, config['output'])
+
+    performance = model_data['performance']
+    return {
+        'output': config['output'],
+        'seed': config.get('seed'),
+        'careers': len(model_data['career_names']),
+        'training_samples': performance['training_samples'],
+        'forest_params': performance['forest_params'],
+        'hierarchical': bool(config.get('hierarchical')),
+        'backend': performance['backend'],
+        'train_accuracy': performance['train_accuracy'],
+        'test_accuracy': performance['test_accuracy'],
+        'size_mb': size_mb,
+        'latency': performance.get('latency'),
+        'seconds': (datetime.now() - started).total_seconds()
+    }
+
+def run_configs(configs, workers=None):
+    """Train several configurations, in parallel worker processes when workers > 1"""
+
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    if workers <= 1:
+        return [train_config(config) for config in configs]
+
+    # One core per worker; a forest's own thread pool would oversubscribe the machine
+    configs = [{**config, 'forest': {**config.get('forest', {}), 'n_jobs': 1}} for config in configs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(train_config, configs))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Cheap-Model Cascade
+A small linear model answers "obvious" profiles directly and escalates the
+rest to the random forest
+"""
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+# Share of accepted (non-escalated) answers that must match the forest's top career
+DEFAULT_TARGET_AGREEMENT = 0.97
+
+def train_first_stage(X_train_scaled, y_train):
+    """Train the cheap first-stage model on the same scaled features as the forest"""
+    first_stage = LogisticRegression(max_iter=2000, C=0.5)
+    first_stage.fit(X_train_scaled, y_train)
+    return first_stage
+
+def prediction_margin(probabilities):
+    """Gap between the best and second best class probability for each row"""
+    probabilities = np.atleast_2d(probabilities)
+    top_two = np.partition(probabilities, -2, axis=1)[:, -2:]
+    return top_two[:, 1] - top_two[:, 0]
+
+def calibrate_cascade(first_stage, forest, X_calibration, target_agreement=DEFAULT_TARGET_AGREEMENT):
+    """Pick the smallest margin threshold whose accepted answers agree with the forest at the target rate"""
+
+    cheap_probabilities = first_stage.predict_proba(X_calibration)
+    forest_probabilities = forest.predict_proba(X_calibration)
+
+    margins = prediction_margin(cheap_probabilities)
+    agrees = cheap_probabilities.argmax(axis=1) == forest_probabilities.argmax(axis=1)
+
+    # Accept the most confident rows first and keep the longest prefix that stays on target
+    order = np.argsort(-margins)
+    prefix_agreement = np.cumsum(agrees[order]) / np.arange(1, len(order) + 1)
+    on_target = np.nonzero(prefix_agreement >= target_agreement)[0]
+
+    if on_target.size == 0:
+        threshold = float('inf')
+        accepted = np.zeros(len(margins), dtype=bool)
+    else:
+        threshold = float(margins[order[on_target[-1]]])
+        accepted = margins >= threshold
+
+    return {
+        'model': first_stage,
+        'threshold': threshold,
+        'target_agreement': target_agreement,
+        'calibration': {
+            'samples': int(len(margins)),
+            'escalation_rate': float(1 - accepted.mean()),
+            'agreement_rate': float(agrees[accepted].mean()) if accepted.any() else None,
+            'overall_agreement': float(agrees.mean())
+        }
+    }
+
+def new_stats():
+    """Fresh per-process cascade counters"""
+    return {'requests': 0, 'escalated': 0, 'audited': 0, 'audit_agreements': 0}
+
+def cascade_predict(cascade, forest, features_scaled, stats, audit_rate=0.0):
+    """Score one scaled row, returning (probabilities, tier)
+
+    Answers that clear the margin threshold are occasionally re-scored by the
+    forest (audit_rate) so the live agreement rate can be reported.
+    """
+
+    cheap_probabilities = cascade['model'].predict_proba(features_scaled)[0]
+    stats['requests'] += 1
+
+    if prediction_margin(cheap_probabilities)[0] < cascade['threshold']:
+        stats['escalated'] += 1
+        return forest.predict_proba(features_scaled)[0], 'forest'
+
+    if audit_rate > 0 and np.random.random() < audit_rate:
+        forest_probabilities = forest.predict_proba(features_scaled)[0]
+        stats['audited'] += 1
+        stats['audit_agreements'] += int(forest_probabilities.argmax() == cheap_probabilities.argmax())
+
+    return cheap_probabilities, 'cheap'
+
+def cascade_metrics(cascade, stats):
+    """Escalation and agreement rates for the health/metrics endpoints"""
+
+    requests = stats['requests']
+    return {
+        'threshold': cascade['threshold'],
+        'target_agreement': cascade['target_agreement'],
+        'requests': requests,
+        'escalation_rate': stats['escalated'] / requests if requests else None,
+        'audited': stats['audited'],
+        'agreement_rate': stats['audit_agreements'] / stats['audited'] if stats['audited'] else None,
+        'calibration': cascade['calibration']
+    }
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Model Distillation
+Trains a small student forest on the production forest's soft labels and
+records the accuracy/latency/size trade-off of each candidate
+"""
+
+import argparse
+import numpy as np
+from datetime import datetime
+from sklearn.ensemble import RandomForestClassifier
+
+from career_training import generate_training_data
+from model_utils import (
+    MODEL_FILE, load_artifact, save_artifact, serialized_size_mb, measure_latency, select_active_features,
+    top_1_agreement, top_k_agreement
+)
+
+DISTILLED_MODEL_FILE = 'distilled_career_model.pkl'
+
+# Teacher probabilities below this are dropped from the soft-label expansion
+MIN_SOFT_LABEL = 0.005
+
+def soft_label_rows(X_scaled, teacher_probabilities, n_classes, min_probability=MIN_SOFT_LABEL):
+    """Expand each profile into one weighted row per plausible class
+
+    Fitting a forest on (x, class) rows weighted by the teacher probability
+    makes every leaf estimate the average teacher distribution of its
+    profiles, which is the soft-label objective.
+    """
+
+    rows, classes = np.nonzero(teacher_probabilities >= min_probability)
+    X_rows = X_scaled[rows]
+    y_rows = classes
+    weights = teacher_probabilities[rows, classes]
+
+    # Keep every class present so the student's probability columns line up
+    missing = np.setdiff1d(np.arange(n_classes), y_rows)
+    if missing.size:
+        X_rows = np.vstack([X_rows, X_scaled[:missing.size]])
+        y_rows = np.concatenate([y_rows, missing])
+        weights = np.concatenate([weights, np.full(missing.size, 1e-6)])
+
+    return X_rows, y_rows, weights
+
+def train_student(X_scaled, teacher_probabilities, n_estimators, max_depth, seed=42):
+    """Fit one student forest on the teacher's soft labels"""
+
+    X_rows, y_rows, weights = soft_label_rows(X_scaled, teacher_probabilities, teacher_probabilities.shape[1])
+    student = RandomForestClassifier(
+        n_estimators=n_estimators,
+        max_depth=max_depth,
+        min_samples_leaf=10,
+        max_features='sqrt',
+        random_state=seed,
+        n_jobs=-1
+    )
+    student.fit(X_rows, y_rows, sample_weight=weights)
+
+    # Small forests answer single rows faster without the thread pool
+    student.n_jobs = 1
+    return student
+
+def evaluate_candidate(model, X_eval_scaled, y_eval, teacher_probabilities):
+    """Agreement with the teacher, accuracy on the generating career, latency and size"""
+
+    probabilities = model.predict_proba(X_eval_scaled)
+    return {
+        'top1_agreement': top_1_agreement(teacher_probabilities, probabilities),
+        'top5_agreement': top_k_agreement(teacher_probabilities, probabilities, k=5),
+        'accuracy': float((probabilities.argmax(axis=1) == y_eval).mean()),
+        'size_mb': serialized_size_mb(model),
+        **measure_latency(model, X_eval_scaled)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Distill the career forest into a smaller student model')
+    parser.add_argument('--teacher', default=MODEL_FILE, help='Teacher model artifact')
+    parser.add_argument('--output', default=DISTILLED_MODEL_FILE, help='Where to write the chosen student')
+    parser.add_argument('--transfer-samples', type=int, default=300, help='Synthetic profiles per career for soft labels')
+    parser.add_argument('--eval-samples', type=int, default=50, help='Held-out synthetic profiles per career')
+    parser.add_argument('--trees', type=int, nargs='+', default=[10, 20, 40], help='Student tree counts to try')
+    parser.add_argument('--depths', type=int, nargs='+', default=[6, 8, 12], help='Student depths to try')
+    parser.add_argument('--max-accuracy-drop', type=float, default=0.02,
+                        help='Largest accepted drop in held-out accuracy versus the teacher')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("🚀 Career Model Distillation")
+    print("=" * 60)
+
+    teacher_data = load_artifact(args.teacher)
+    teacher = teacher_data['model']
+    scaler = teacher_data['scaler']
+    label_encoder = teacher_data['label_encoder']
+    careers = list(label_encoder.classes_)
+    print(f"✅ Teacher: {args.teacher} ({len(teacher.estimators_)} trees, {len(careers)} careers)")
+
+    np.random.seed(args.seed)
+    print(f"📊 Generating transfer set ({args.transfer_samples} per career)...")
+    X_transfer, _, _ = generate_training_data(careers, args.transfer_samples, verbose=False)
+    X_transfer_scaled = scaler.transform(select_active_features(teacher_data, X_transfer))
+    transfer_probabilities = teacher.predict_proba(X_transfer_scaled)
+
+    print(f"📊 Generating held-out set ({args.eval_samples} per career)...")
+    X_eval, y_eval, _ = generate_training_data(careers, args.eval_samples, verbose=False)
+    X_eval_scaled = scaler.transform(select_active_features(teacher_data, X_eval))
+    y_eval = label_encoder.transform(y_eval)
+    eval_probabilities = teacher.predict_proba(X_eval_scaled)
+
+    teacher_metrics = evaluate_candidate(teacher, X_eval_scaled, y_eval, eval_probabilities)
+    print(f"📊 Teacher: accuracy {teacher_metrics['accuracy']:.1%}, "
+          f"{teacher_metrics['single_row_ms']:.2f}ms/row, {teacher_metrics['size_mb']:.1f}MB")
+
+    candidates = []
+    for n_estimators in args.trees:
+        for max_depth in args.depths:
+            student = train_student(X_transfer_scaled, transfer_probabilities, n_estimators, max_depth, args.seed)
+            metrics = evaluate_candidate(student, X_eval_scaled, y_eval, eval_probabilities)
+            metrics.update({'n_estimators': n_estimators, 'max_depth': max_depth})
+            candidates.append((metrics, student))
+            print(f"   🌲 {n_estimators:3d} trees, depth {max_depth:2d}: "
+                  f"top-1 {metrics['top1_agreement']:.1%}, top-5 {metrics['top5_agreement']:.1%}, "
+                  f"accuracy {metrics['accuracy']:.1%}, {metrics['single_row_ms']:.2f}ms/row, "
+                  f"{metrics['size_mb']:.2f}MB")
+
+    # Fastest student within the accuracy budget, else the most faithful one
+    accuracy_floor = teacher_metrics['accuracy'] - args.max_accuracy_drop
+    qualifying = [c for c in candidates if c[0]['accuracy'] >= accuracy_floor]
+    if qualifying:
+        chosen_metrics, chosen = min(qualifying, key=lambda c: (c[0]['single_row_ms'], c[0]['size_mb']))
+    else:
+        print(f"⚠️ No student stayed within {args.max_accuracy_drop:.0%} of the teacher - keeping the most faithful")
+        chosen_metrics, chosen = max(candidates, key=lambda c: c[0]['top1_agreement'])
+
+    student_data = {key: value for key, value in teacher_data.items() if key != 'cascade'}
+    student_data.update({
+        'model': chosen,
+        'training_date': datetime.now().isoformat(),
+        'model_version': f"{teacher_data.get('model_version', 'unknown')}_distilled",
+        'performance': {
+            **teacher_data['performance'],
+            'test_accuracy': chosen_metrics['accuracy'],
+            'distillation': {
+                'teacher': args.teacher,
+                'teacher_metrics': teacher_metrics,
+                'chosen': chosen_metrics,
+                'candidates': [metrics for metrics, _ in candidates],
+                'transfer_samples_per_career': args.transfer_samples,
+                'eval_samples_per_career': args.eval_samples,
+                'seed': args.seed
+            }
+        }
+    })
+
+    file_size = save_artifact(student_data, args.output)
+    print(f"💾 Student saved: {args.output} ({file_size:.2f}MB)")
+    print(f"📊 Chosen: {chosen_metrics['n_estimators']} trees, depth {chosen_metrics['max_depth']} - "
+          f"top-1 agreement {chosen_metrics['top1_agreement']:.1%}, "
+          f"{teacher_metrics['single_row_ms'] / chosen_metrics['single_row_ms']:.1f}x faster per row")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Top-k Evaluation
+Scores a large held-out synthetic dataset through the batched inference path
+in parallel worker processes and reports top-1/3/5 accuracy, MRR, per-career
+recall and the confusion matrix as JSON (plus an optional markdown table for
+MODEL_EVALUATION_REPORT.md)
+
+    python evaluate_model.py --samples-per-career 30000 --workers 8
+"""
+
+import argparse
+import json
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+
+from career_training import create_synthetic_catalog
+from career_training.cache import DATASET_CACHE_DIR, dataset_key, cached_dataset, unpack_bits
+from model_utils import (
+    MODEL_FILE, MODEL_REGISTRY_DIR, load_artifact, serving_artifact, score_profile_bits, model_features,
+    measure_latency, rank_of_truth
+)
+
+EVALUATION_REPORT_FILE = 'evaluation_report.json'
+
+# Training uses seed 42; the evaluation set is drawn with its own seed so it is held out
+EVAL_SEED = 2024
+
+# Rows scored per batched call; bounds each worker's feature and probability buffers
+EVAL_CHUNK_ROWS = 50_000
+
+TOP_K = (1, 3, 5)
+
+# Per-process state for pool workers
+_worker = {}
+
+def _init_worker(model_path, n_careers, samples_per_career, seed, cache_dir):
+    """Load the model and memory-map the dataset once per worker process"""
+
+    warnings.filterwarnings('ignore')
+    model_data = load_artifact(model_path)
+
+    # One core per worker; a forest's own thread pool would oversubscribe the machine
+    if hasattr(model_data['model'], 'n_jobs'):
+        model_data['model'].n_jobs = 1
+
+    catalog = create_synthetic_catalog(n_careers)
+    packed, labels, _, _ = cached_dataset(catalog, samples_per_career, seed, cache_dir)
+    career_index = {career: i for i, career in enumerate(model_data['career_names'])}
+
+    _worker.update({
+        'model_data': model_data,
+        'packed': packed,
+        'labels': labels,
+        # Dataset label -> model class; careers the model lacks never match (-1)
+        'label_to_class': np.array([career_index.get(career, -1) for career in catalog], dtype=np.intp)
+    })
+
+def predicted_class(probabilities, y, ranks):
+    """Top-1 prediction under rank_of_truth's tie policy
+
+    The true class only when it ranks first; when it ties for the top, one
+    of the classes it ties with, so the confusion matrix's diagonal matches
+    top-1 accuracy.
+    """
+
+    rows = np.arange(len(y))
+    others = probabilities.copy()
+    others[rows[y >= 0], y[y >= 0]] = -np.inf
+    return np.where(ranks == 0, y, others.argmax(axis=1))
+
+def evaluate_rows(row_range):
+    """Partial sums for one contiguous row range: a rank histogram and the confusion counts"""
+
+    start, stop = row_range
+    model_data, label_to_class = _worker['model_data'], _worker['label_to_class']
+    n_labels, n_classes = len(label_to_class), len(model_data['career_names'])
+
+    rank_counts = np.zeros((n_labels, n_classes + 1), dtype=np.int64)
+    confusion = np.zeros((n_labels, n_classes), dtype=np.int64)
+    for chunk_start in range(start, stop, EVAL_CHUNK_ROWS):
+        chunk_stop = min(chunk_start + EVAL_CHUNK_ROWS, stop)
+        labels = np.asarray(_worker['labels'][chunk_start:chunk_stop], dtype=np.intp)
+        probabilities = score_profile_bits(model_data, unpack_bits(_worker['packed'][chunk_start:chunk_stop]))
+
+        classes = label_to_class[labels]
+        ranks = rank_of_truth(probabilities, classes)
+        np.add.at(rank_counts, (labels, ranks), 1)
+        np.add.at(confusion, (labels, predicted_class(probabilities, classes, ranks)), 1)
+    return rank_counts, confusion
+
+def summarize(rank_counts, confusion, catalog_careers, model_careers):
+    """Overall and per-career metrics from the summed rank histogram and confusion matrix"""
+
+    support = rank_counts.sum(axis=1)
+    total = int(support.sum())
+    cumulative = rank_counts.cumsum(axis=1)
+    reciprocal = 1.0 / np.arange(1, rank_counts.shape[1] + 1)
+    reciprocal[-1] = 0.0  # unknown careers contribute nothing to MRR
+
+    metrics = {f'top_{k}': float(cumulative[:, k - 1].sum() / total) for k in TOP_K}
+    metrics['mrr'] = float((rank_counts * reciprocal).sum() / total)
+
+    per_career = []
+    for i, career in enumerate(catalog_careers):
+        row = confusion[i].copy()
+        if career in model_careers:
+            row[model_careers.index(career)] = 0
+        per_career.append({
+            'career': career,
+            'support': int(support[i]),
+            'recall': float(cumulative[i, 0] / max(support[i], 1)),
+            **{f'top_{k}_recall': float(cumulative[i, k - 1] / max(support[i], 1)) for k in TOP_K[1:]},
+            'most_confused_with': model_careers[int(row.argmax())] if row.any() else None
+        })
+    return metrics, per_career
+
+def markdown_summary(report):
+    """Metric table in the style of MODEL_EVALUATION_REPORT.md"""
+
+    metrics, model = report['metrics'], report['model']
+    worst = sorted(report['per_career'], key=lambda c: c['recall'])[:5]
+    lines = [
+        f"## 📊 **Evaluation: {model['version']}**",
+        '',
+        f"{report['dataset']['rows']:,} held-out synthetic profiles (seed {report['dataset']['seed']}), "
+        f"generated {report['generated'][:10]}",
+        '',
+        '| Metric | Value |',
+        '|--------|-------|',
+        *[f"| **Top-{k} Accuracy** | {metrics[f'top_{k}']:.1%} |" for k in TOP_K],
+        f"| **Mean Reciprocal Rank** | {metrics['mrr']:.3f} |",
+        f"| **Careers Supported** | {model['careers']} |",
+        f"| **Features** | {model['features']} |",
+        f"| **Model Size** | {model['size_mb']:.1f}MB |",
+        f"| **Single-row Latency** | {report['timing']['single_row_ms']:.1f}ms |",
+        '',
+        '| Lowest-recall Career | Recall | Top-5 Recall | Most Confused With |',
+        '|----------------------|--------|--------------|--------------------|',
+        *[f"| {c['career']} | {c['recall']:.1%} | {c['top_5_recall']:.1%} | {c['most_confused_with']} |"
+          for c in worst]
+    ]
+    return '\n'.join(lines) + '\n'
+
+def evaluate(model_path, samples_per_career=30_000, seed=EVAL_SEED, workers=None, cache_dir=DATASET_CACHE_DIR,
+             n_careers=None):
+    """Score the held-out dataset in parallel and return the report dictionary
+
+    The dataset is the cached synthetic catalog of the model's size (or
+    n_careers), so the same arguments always evaluate the same rows.
+    """
+
+    model_data = load_artifact(model_path)
+    model_careers = [str(c) for c in model_data['career_names']]
+    catalog = create_synthetic_catalog(n_careers or len(model_careers))
+    catalog_careers = list(catalog)
+
+    started = time.perf_counter()
+    packed, _, _, hit = cached_dataset(catalog, samples_per_career, seed, cache_dir)
+    generation_seconds = time.perf_counter() - started
+    n_rows = len(packed)
+    print(f"📦 {n_rows:,} profiles for {len(catalog)} careers ({'cached' if hit else 'generated'} "
+          f"in {generation_seconds:.1f}s)")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, -(-n_rows // EVAL_CHUNK_ROWS)))
+    bounds = np.linspace(0, n_rows, workers * 4 + 1, dtype=np.int64)
+    ranges = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    print(f"⚙️ Scoring with {workers} workers...")
+    started = time.perf_counter()
+    init_args = (model_path, len(catalog), samples_per_career, seed, cache_dir)
+    rank_counts = np.zeros((len(catalog), len(model_careers) + 1), dtype=np.int64)
+    confusion = np.zeros((len(catalog), len(model_careers)), dtype=np.int64)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+        for partial_ranks, partial_confusion in pool.map(evaluate_rows, ranges):
+            rank_counts += partial_ranks
+            confusion += partial_confusion
+    scoring_seconds = time.perf_counter() - started
+
+    metrics, per_career = summarize(rank_counts, confusion, catalog_careers, model_careers)
+
+    # What the same evaluation would cost one predict_proba call per profile
+    sample = unpack_bits(packed[:1000])
+    X_sample = model_data['scaler'].transform(model_features(model_data, sample))
+    latency = measure_latency(model_data['model'], X_sample)
+
+    return {
+        'generated': datetime.now().isoformat(),
+        'model': {
+            'path': model_path,
+            'version': model_data.get('model_version', 'unknown'),
+            'training_date': model_data.get('training_date'),
+            'careers': len(model_careers),
+            'features': model_data['performance'].get('feature_count', model_data['scaler'].n_features_in_),
+            'size_mb': os.path.getsize(model_path) / (1024*1024)
+        },
+        'dataset': {
+            'careers': len(catalog),
+            'samples_per_career': samples_per_career,
+            'seed': seed,
+            'rows': n_rows,
+            'key': dataset_key(catalog, samples_per_career, seed)
+        },
+        'metrics': metrics,
+        'per_career': per_career,
+        'confusion_matrix': {
+            'true_labels': catalog_careers,
+            'predicted_labels': model_careers,
+            'counts': confusion.tolist()
+        },
+        'timing': {
+            'workers': workers,
+            'generation_seconds': generation_seconds,
+            'scoring_seconds': scoring_seconds,
+            'rows_per_second': n_rows / scoring_seconds,
+            'single_row_ms': latency['single_row_ms'],
+            'per_row_estimate_seconds': latency['single_row_ms'] * n_rows / 1000
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Top-k evaluation of a model artifact on held-out synthetic profiles')
+    parser.add_argument('--model', default=None, help='Artifact to evaluate (default: the one being served)')
+    parser.add_argument('--samples-per-career', type=int, default=30_000)
+    parser.add_argument('--seed', type=int, default=EVAL_SEED, help='Dataset seed; keep it apart from training seeds')
+    parser.add_argument('--careers', type=int, default=None, help='Catalog size (default: the model\'s)')
+    parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: CPU count)')
+    parser.add_argument('--cache-dir', default=DATASET_CACHE_DIR)
+    parser.add_argument('--output', default=EVALUATION_REPORT_FILE, help='Machine-readable JSON report')
+    parser.add_argument('--markdown', default=None, help='Optional markdown metric table for the evaluation report')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    print("🎯 Top-k Evaluation")
+    print("=" * 60)
+
+    model_path = args.model or serving_artifact(MODEL_REGISTRY_DIR, MODEL_FILE) or MODEL_FILE
+    report = evaluate(model_path, args.samples_per_career, args.seed, args.workers, args.cache_dir, args.careers)
+
+    metrics, timing = report['metrics'], report['timing']
+    print(f"\n📊 {report['model']['version']} on {report['dataset']['rows']:,} profiles:")
+    print(f"   Top-1 {metrics['top_1']:.1%}  Top-3 {metrics['top_3']:.1%}  Top-5 {metrics['top_5']:.1%}  "
+          f"MRR {metrics['mrr']:.3f}")
+    print(f"   Scored in {timing['scoring_seconds']:.1f}s ({timing['rows_per_second']:,.0f} rows/s); "
+          f"per-row calls would take ~{timing['per_row_estimate_seconds'] / 60:.0f} min")
+    for career in sorted(report['per_career'], key=lambda c: c['recall'])[:5]:
+        print(f"   ⚠️ {career['career']}: recall {career['recall']:.1%}, "
+              f"top-5 {career['top_5_recall']:.1%}, confused with {career['most_confused_with']}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Report saved: {args.output}")
+
+    if args.markdown:
+        with open(args.markdown, 'w') as f:
+            f.write(markdown_summary(report))
+        print(f"💾 Markdown summary saved: {args.markdown}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Prediction Explanations
+Path decomposition of the forest: every node stores how much it moved the
+class distribution away from its parent, so one walk per tree attributes a
+prediction to the features split on along the way. Contributions are then
+grouped back to the 32 subjects and 30 interest questions
+"""
+
+import numpy as np
+
+from whatif import build_forest_arrays
+from profile_features import (
+    SUBJECTS, INTERACTIONS, INTEREST_CATEGORIES, INTEREST_QUESTIONS,
+    QUESTION_CATEGORY_MATRIX, FEATURE_NAMES, N_SUBJECTS, N_INPUTS, input_labels
+)
+
+def build_explainer(forest):
+    """Tree arrays plus each node's distribution delta from its parent and the feature that split it"""
+
+    trees = build_forest_arrays(forest)
+    for tree in trees:
+        parent = np.full(len(tree['left']), -1)
+        internal = np.nonzero(tree['left'] != -1)[0]
+        parent[tree['left'][internal]] = internal
+        parent[tree['right'][internal]] = internal
+
+        delta = np.zeros_like(tree['value'], dtype=np.float32)
+        delta[1:] = tree['value'][1:] - tree['value'][parent[1:]]
+        tree['delta'] = delta
+        tree['split_feature'] = np.where(parent >= 0, tree['feature'][np.maximum(parent, 0)], -1)
+        tree['bias'] = tree['value'][0]
+    return trees
+
+def attribution_matrix(active_features=None):
+    """How each engineered column's contribution is shared among the 62 raw inputs (columns x 62)
+
+    Subjects map to themselves. An interest category is split over the
+    questions that feed it, in proportion to their tags. An interaction is
+    split evenly between its subject half and its interest half.
+    """
+
+    n_interests = len(INTEREST_CATEGORIES)
+    matrix = np.zeros((len(FEATURE_NAMES), N_INPUTS))
+    matrix[:N_SUBJECTS, :N_SUBJECTS] = np.eye(N_SUBJECTS)
+
+    question_share = QUESTION_CATEGORY_MATRIX / QUESTION_CATEGORY_MATRIX.sum(axis=0)
+    matrix[N_SUBJECTS:N_SUBJECTS + n_interests, N_SUBJECTS:] = question_share.T
+
+    for j, (_, subjects, interest) in enumerate(INTERACTIONS):
+        row = matrix[N_SUBJECTS + n_interests + j]
+        for subject in subjects:
+            row[SUBJECTS.index(subject)] = 0.5 / len(subjects)
+        row[N_SUBJECTS:] = 0.5 * question_share[:, INTEREST_CATEGORIES.index(interest)]
+
+    return matrix if active_features is None else matrix[list(active_features)]
+
+def decompose(trees, features_scaled, n_columns):
+    """Forest bias and per-column contributions (columns x classes); together they sum to predict_proba"""
+
+    x = np.asarray(features_scaled, dtype=np.float32).ravel()
+    bias = np.zeros(trees[0]['value'].shape[1])
+    contributions = np.zeros((n_columns, len(bias)))
+
+    for tree in trees:
+        left, right, feature, threshold = tree['left'], tree['right'], tree['feature'], tree['threshold']
+        node = 0
+        while left[node] != -1:
+            node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+            contributions[tree['split_feature'][node]] += tree['delta'][node]
+        bias += tree['bias']
+
+    return bias / len(trees), contributions / len(trees)
+
+def explain(trees, attribution, features_scaled, bits, class_indices, max_inputs=8):
+    """Per-input contributions to each requested class, largest first"""
+
+    bias, contributions = decompose(trees, features_scaled, attribution.shape[0])
+    by_input = attribution.T @ contributions
+    labels = input_labels()
+
+    explanations = []
+    for class_index in class_indices:
+        values = by_input[:, class_index]
+        order = np.argsort(-np.abs(values), kind='stable')[:max_inputs]
+        inputs = []
+        for i in order:
+            if values[i] == 0:
+                break
+            label = dict(labels[i])
+            if label['type'] == 'question':
+                label['text'] = INTEREST_QUESTIONS[label['id']]
+            label['selected'] = bool(bits[i])
+            label['contribution'] = float(values[i])
+            inputs.append(label)
+
+        explanations.append({
+            'class_index': int(class_index),
+            'probability': float(bias[class_index] + values.sum()),
+            'base_rate': float(bias[class_index]),
+            'inputs': inputs
+        })
+    return explanations
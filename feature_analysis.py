@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Feature Usage Analysis
+Reports how the forest uses each engineered feature, flags constant or
+unused columns and can retrain a model without them
+"""
+
+import argparse
+import numpy as np
+
+from career_training import generate_training_data, fit_model_data
+from model_utils import MODEL_FILE, load_artifact, save_artifact
+
+FEATURE_PRUNED_MODEL_FILE = 'feature_pruned_career_model.pkl'
+
+def split_counts(forest, n_features):
+    """Number of internal nodes splitting on each feature across all trees"""
+    counts = np.zeros(n_features, dtype=int)
+    for tree in forest.estimators_:
+        split_features = tree.tree_.feature
+        counts += np.bincount(split_features[split_features >= 0], minlength=n_features)
+    return counts
+
+def interest_mapping_gaps(interest_mapping, feature_names):
+    """Mapping tags that never reach a feature and categories no question feeds"""
+
+    categories = {name[len('interest_'):] for name in feature_names if name.startswith('interest_')}
+    tags = {tag for value in interest_mapping.values() for tag in value.split(',')}
+    return {
+        'unmapped_tags': sorted(tags - categories),
+        'unreachable_categories': sorted(categories - tags)
+    }
+
+def analyze_features(model_data, min_importance=0.0):
+    """Per-feature split counts and importance, plus the columns worth dropping"""
+
+    forest = model_data['model']
+    feature_names = model_data['feature_names']
+    counts = split_counts(forest, len(feature_names))
+    importances = forest.feature_importances_
+    constant = model_data['scaler'].var_ == 0
+
+    features = []
+    for i, name in enumerate(feature_names):
+        reasons = []
+        if constant[i]:
+            reasons.append('constant')
+        if counts[i] == 0:
+            reasons.append('unused')
+        elif importances[i] < min_importance:
+            reasons.append('low_importance')
+        features.append({
+            'name': name,
+            'splits': int(counts[i]),
+            'importance': float(importances[i]),
+            'flags': reasons
+        })
+
+    gaps = interest_mapping_gaps(model_data.get('interest_mapping', {}), feature_names)
+    # Categories no question feeds can only ever be zero, whatever the training data
+    for feature in features:
+        if feature['name'][len('interest_'):] in gaps['unreachable_categories'] and 'constant' not in feature['flags']:
+            feature['flags'].append('constant')
+
+    return {
+        'features': features,
+        'flagged': [f['name'] for f in features if f['flags']],
+        **gaps
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyse feature usage and prune dead features')
+    parser.add_argument('--model', default=MODEL_FILE, help='Model artifact to analyse')
+    parser.add_argument('--min-importance', type=float, default=0.0,
+                        help='Also flag features used below this importance')
+    parser.add_argument('--retrain', action='store_true', help='Retrain without the flagged features')
+    parser.add_argument('--samples', type=int, default=30, help='Training profiles per career when retraining')
+    parser.add_argument('--output', default=FEATURE_PRUNED_MODEL_FILE, help='Where to write the retrained artifact')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("🔍 Feature Usage Analysis")
+    print("=" * 60)
+
+    model_data = load_artifact(args.model)
+    if model_data.get('active_features') is not None:
+        print("⚠️ Model is already feature-pruned - analysing its remaining columns")
+    report = analyze_features(model_data, args.min_importance)
+
+    print(f"{'Feature':40s} {'Splits':>8s} {'Importance':>11s}  Flags")
+    for feature in sorted(report['features'], key=lambda f: f['importance']):
+        print(f"{feature['name']:40s} {feature['splits']:8d} {feature['importance']:11.4f}  {', '.join(feature['flags'])}")
+
+    print(f"\n📊 Mapping tags without a feature: {', '.join(report['unmapped_tags']) or 'none'}")
+    print(f"📊 Categories no question feeds: {', '.join(report['unreachable_categories']) or 'none'}")
+    print(f"🚩 Flagged features: {len(report['flagged'])}/{len(report['features'])}")
+
+    if not args.retrain:
+        return
+    if not report['flagged']:
+        print("✅ Nothing to prune")
+        return
+
+    # Column indices are relative to the full featurizer output
+    all_features = list(model_data['feature_names'])
+    active = model_data.get('active_features')
+    full_index = list(range(len(all_features))) if active is None else list(active)
+    keep = [full_index[i] for i, name in enumerate(all_features) if name not in report['flagged']]
+
+    print(f"\n🤖 Retraining on {len(keep)} features...")
+    np.random.seed(args.seed)
+    X, y, full_feature_names = generate_training_data(list(model_data['career_names']), args.samples, verbose=False)
+    pruned_data = fit_model_data(
+        X[:, keep], y, [full_feature_names[i] for i in keep],
+        model_version=f"{model_data.get('model_version', 'unknown')}_features{len(keep)}"
+    )
+    pruned_data['active_features'] = keep
+    pruned_data['performance']['feature_pruning'] = {
+        'source': args.model,
+        'removed': report['flagged'],
+        'source_test_accuracy': model_data['performance']['test_accuracy'],
+        'seed': args.seed
+    }
+
+    file_size = save_artifact(pruned_data, args.output)
+    print(f"💾 Feature-pruned model saved: {args.output} ({file_size:.2f}MB)")
+
+if __name__ == '__main__':
+    main()
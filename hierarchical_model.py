@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Hierarchical Career Model
+Predicts a career family first, then scores careers only inside the most
+likely families with one small forest per family, so node storage and
+serving cost follow family size instead of catalog size
+"""
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+# Families whose career models are consulted for each profile
+TOP_FAMILIES = 2
+
+class HierarchicalCareerModel:
+    """Family forest followed by per-family career forests, usable wherever predict_proba is"""
+
+    def __init__(self, family_of, family_names, forest_params, top_families=TOP_FAMILIES):
+        # family_of[career_index] is the family index of each encoded career
+        self.family_of = np.asarray(family_of)
+        self.family_names = list(family_names)
+        self.forest_params = dict(forest_params)
+        self.top_families = top_families
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        self.classes_ = np.arange(len(self.family_of))
+        family_y = self.family_of[y]
+
+        self.family_model = RandomForestClassifier(**self.forest_params).fit(X, family_y)
+
+        # (career indices, forest or None when the family has a single career seen in training)
+        self.career_models = {}
+        for family in self.family_model.classes_:
+            rows = family_y == family
+            careers = np.unique(y[rows])
+            model = None
+            if len(careers) > 1:
+                model = RandomForestClassifier(**self.forest_params).fit(X[rows], y[rows])
+            self.career_models[family] = (careers, model)
+
+        # Serving scores a handful of rows per call, where worker dispatch costs more than it saves
+        for forest in self._forests():
+            forest.n_jobs = 1
+        return self
+
+    def _forests(self):
+        return [self.family_model] + [model for _, model in self.career_models.values() if model is not None]
+
+    def predict_proba(self, X):
+        """P(family) x P(career | family) for careers in each row's top families, 0 elsewhere"""
+
+        X = np.asarray(X)
+        family_probabilities = self.family_model.predict_proba(X)
+        top = np.argsort(-family_probabilities, axis=1)[:, :self.top_families]
+        probabilities = np.zeros((len(X), len(self.classes_)))
+
+        for column, family in enumerate(self.family_model.classes_):
+            rows = np.nonzero((top == column).any(axis=1))[0]
+            if not len(rows):
+                continue
+            careers, model = self.career_models[family]
+            within = np.ones((len(rows), 1)) if model is None else model.predict_proba(X[rows])
+            probabilities[rows[:, None], careers] = within * family_probabilities[rows, column][:, None]
+        return probabilities
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y)))
+
+    def node_values(self):
+        """Stored class-distribution entries across all trees (nodes x classes summed)"""
+        return sum(e.tree_.value.size for forest in self._forests() for e in forest.estimators_)
+
+def family_index(career_names, career_families):
+    """Family index per encoded career and the family names, from a {career: family} mapping"""
+    family_names = sorted(set(career_families[c] for c in career_names))
+    lookup = {family: i for i, family in enumerate(family_names)}
+    return np.array([lookup[career_families[c]] for c in career_names]), family_names
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Model Utilities
+Shared helpers for loading, saving and measuring career model artifacts
+"""
+
+import fcntl
+import hashlib
+import os
+import pickle
+import shutil
+import time
+import numpy as np
+
+from profile_features import FEATURE_NAMES, features_from_bits
+
+# Artifact written by improved_quick_model.py (career_training) and preferred by the app
+MODEL_FILE = 'improved_quick_career_model.pkl'
+
+# Versioned artifacts from incremental retraining, plus a pointer to the one to serve
+MODEL_REGISTRY_DIR = os.environ.get('MODEL_REGISTRY_DIR', 'model_versions')
+LATEST_POINTER = 'LATEST'
+
+def load_artifact(path):
+    """Load a pickled model_data dictionary"""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+def save_artifact(model_data, path):
+    """Pickle a model_data dictionary and return its size in MB
+
+    Written under a temporary name and renamed, so a server polling the
+    path never loads a partial artifact.
+    """
+    staging = f"{path}.tmp{os.getpid()}"
+    with open(staging, 'wb') as f:
+        pickle.dump(model_data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(staging, path)
+    return os.path.getsize(path) / (1024*1024)
+
+def latest_artifact(registry_dir=MODEL_REGISTRY_DIR):
+    """Path of the artifact the registry's LATEST pointer names, or None"""
+
+    pointer = os.path.join(registry_dir, LATEST_POINTER)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer) as f:
+        name = f.read().strip()
+    path = os.path.join(registry_dir, name)
+    return path if name and os.path.exists(path) else None
+
+def serving_artifact(registry_dir=MODEL_REGISTRY_DIR, model_file=MODEL_FILE):
+    """The more recently written of the registry's LATEST artifact and model_file, or None
+
+    A command-line retrain that rewrites model_file after the last registry
+    publish is served instead of being shadowed by an older version.
+    """
+
+    candidates = [path for path in (latest_artifact(registry_dir), model_file) if path and os.path.exists(path)]
+    return max(candidates, key=os.path.getmtime, default=None)
+
+def publish_version(model_data, registry_dir=MODEL_REGISTRY_DIR, point_latest=True):
+    """Save model_data as the next numbered artifact and (optionally) point LATEST at it
+
+    Both files are written under temporary names and renamed, so a reader
+    never sees a partial artifact or pointer. Publishers hold an exclusive
+    lock on the registry, so two updates never take the same version number
+    or move LATEST out of order. Returns (path, size in MB).
+    """
+
+    os.makedirs(registry_dir, exist_ok=True)
+    with open(os.path.join(registry_dir, '.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        versions = [int(name[len('career_model_v'):-len('.pkl')]) for name in os.listdir(registry_dir)
+                    if name.startswith('career_model_v') and name.endswith('.pkl')]
+        name = f"career_model_v{max(versions, default=0) + 1:04d}.pkl"
+        path = os.path.join(registry_dir, name)
+
+        size_mb = save_artifact(model_data, path)
+        if point_latest:
+            point_latest_at(path, registry_dir)
+    return path, size_mb
+
+def point_latest_at(path, registry_dir=MODEL_REGISTRY_DIR):
+    """Atomically make LATEST name an artifact inside the registry"""
+
+    pointer = os.path.join(registry_dir, LATEST_POINTER)
+    with open(f"{pointer}.tmp{os.getpid()}", 'w') as f:
+        f.write(os.path.basename(path) + '\n')
+    os.replace(f"{pointer}.tmp{os.getpid()}", pointer)
+
+def select_active_features(model_data, features):
+    """Keep only the featurizer columns a (feature-pruned) model was trained on"""
+    features = np.atleast_2d(np.asarray(features, dtype=float))
+    active = model_data.get('active_features')
+    return features if active is None else features[:, active]
+
+def uses_profile_features(model_data):
+    """Whether the model's columns are profile_features' engineered features (or a selection of them)
+
+    Older artifacts such as final_career_model.pkl were trained on another
+    feature layout; indexes that read columns by position can't be built
+    for them.
+    """
+    active = model_data.get('active_features')
+    expected = len(FEATURE_NAMES) if active is None else len(active)
+    return getattr(model_data['scaler'], 'n_features_in_', None) == expected
+
+def model_features(model_data, bits):
+    """Unscaled model input for a matrix of 62-bit profiles
+
+    A feature-pruned model's dropped columns are never computed.
+    """
+    return features_from_bits(bits, model_data.get('active_features'))
+
+def score_profile_bits(model_data, bits):
+    """Class probabilities for a matrix of 62-bit profiles in one batched call"""
+    return model_data['model'].predict_proba(model_data['scaler'].transform(model_features(model_data, bits)))
+
+_BYTE_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(values):
+    """Set bits per element of an unsigned integer array (np.bitwise_count needs numpy 2)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return _table_popcount(values)
+
+def _table_popcount(values):
+    values = np.ascontiguousarray(values)
+    return _BYTE_POPCOUNT[values.view(np.uint8)].reshape(values.shape + (-1,)).sum(axis=-1, dtype=np.uint8)
+
+def model_fingerprint(model_data):
+    """Identifier that changes whenever a different model is trained or loaded"""
+    identity = '|'.join([
+        str(model_data.get('model_version', 'unknown')),
+        str(model_data.get('training_date', '')),
+        ','.join(str(c) for c in model_data['career_names'])
+    ])
+    return hashlib.sha1(identity.encode()).hexdigest()[:16]
+
+def model_dir(parent, model_data):
+    """Directory for files derived from one model (subject table, profile index)"""
+    return os.path.join(parent, model_fingerprint(model_data))
+
+def publish_dir(staging, path):
+    """Rename a fully written staging directory into place
+
+    Files under an existing path are never rewritten, so workers that have
+    them memory-mapped keep valid data. If another process published the
+    same path meanwhile, its copy is kept.
+    """
+
+    try:
+        os.rename(staging, path)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        os.utime(path)  # counts as just published for prune_dirs
+
+def prune_dirs(parent, keep):
+    """Remove all but the keep most recently published subdirectories
+
+    Workers still mapping a removed directory's files keep reading them
+    until they reload.
+    """
+
+    published = sorted(
+        (entry for entry in os.scandir(parent) if entry.is_dir() and '.tmp' not in entry.name),
+        key=lambda entry: entry.stat().st_mtime, reverse=True
+    )
+    for entry in published[keep:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+def serialized_size_mb(obj):
+    """Size of an object once pickled, in MB"""
+    return len(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)) / (1024*1024)
+
+def measure_latency(model, X_scaled, single_row_repeats=200, batch_size=1000):
+    """Median single-row and per-row batch predict_proba latency in milliseconds"""
+
+    X_scaled = np.asarray(X_scaled)
+    model.predict_proba(X_scaled[:1])  # warm up
+
+    timings = []
+    for i in range(single_row_repeats):
+        row = X_scaled[i % len(X_scaled)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+
+    batch = X_scaled[:batch_size]
+    start = time.perf_counter()
+    model.predict_proba(batch)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'single_row_ms': float(np.median(timings) * 1000),
+        'batch_per_row_ms': float(batch_seconds * 1000 / len(batch)),
+        'batch_size': int(len(batch))
+    }
+
+def top_k_indices(probabilities, k):
+    """Indices of the k most probable classes per row (unordered)"""
+    k = min(k, probabilities.shape[1])
+    return np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+
+def top_k_agreement(reference_probabilities, probabilities, k=5):
+    """Mean overlap between the top-k career sets of two models"""
+
+    reference = top_k_indices(reference_probabilities, k)
+    candidate = top_k_indices(probabilities, k)
+    k = reference.shape[1]
+
+    overlap = (reference[:, :, None] == candidate[:, None, :]).any(axis=2).sum(axis=1)
+    return float(overlap.mean() / k)
+
+def top_1_agreement(reference_probabilities, probabilities):
+    """Share of rows where both models rank the same career first"""
+    return float((reference_probabilities.argmax(axis=1) == probabilities.argmax(axis=1)).mean())
+
+def rank_of_truth(probabilities, y):
+    """0-based rank of each row's true class, with ties counted against it
+
+    A true class tied with others is ranked below all of them, so a flat
+    or degenerate probability row never counts as a hit. Rows whose class
+    is unknown (y < 0) get rank n_classes.
+    """
+
+    y = np.asarray(y)
+    known = y >= 0
+    truth = probabilities[np.arange(len(y)), np.where(known, y, 0)]
+    ranks = (probabilities >= truth[:, None]).sum(axis=1) - 1
+    return np.where(known, ranks, probabilities.shape[1])
+
+def top_k_accuracy(probabilities, y, k=5):
+    """Share of rows whose true class is among the k most probable (ties count against it)"""
+    return float((rank_of_truth(probabilities, y) < k).mean())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Career Goal Optimizer
+Beam search over added GCE subjects that most raise one target career's
+probability, scoring each frontier in a single batched forest call
+"""
+
+import time
+import numpy as np
+
+from profile_features import N_SUBJECTS, SUBJECTS
+
+def _key(bits):
+    return np.packbits(bits).tobytes()
+
+def optimize_subjects(score_bits, base_bits, target_index, max_additions=3,
+                      beam_width=8, max_plans=5, time_budget_ms=500):
+    """Best subject additions for the target career found within the time budget
+
+    score_bits maps a (rows x 62) boolean matrix to class probabilities. Every
+    profile is scored at most once per search; if the budget runs out the
+    best plans found so far are returned.
+    """
+
+    started = time.perf_counter()
+    deadline = started + time_budget_ms / 1000
+    memo = {}
+
+    def score(rows):
+        missing = [row for row in rows if _key(row) not in memo]
+        if missing:
+            probabilities = score_bits(np.array(missing))[:, target_index]
+            for row, probability in zip(missing, probabilities):
+                memo[_key(row)] = float(probability)
+        return [memo[_key(row)] for row in rows]
+
+    base_bits = np.asarray(base_bits, dtype=bool)
+    base_probability = score([base_bits])[0]
+    frontier = [base_bits]
+    plans = {}
+    depth = 0
+    timed_out = False
+
+    while depth < max_additions and frontier:
+        if time.perf_counter() > deadline:
+            timed_out = True
+            break
+
+        # Expand every beam member by each subject it doesn't have yet
+        candidates = {}
+        for bits in frontier:
+            for subject_index in np.nonzero(~bits[:N_SUBJECTS])[0]:
+                child = bits.copy()
+                child[subject_index] = True
+                candidates.setdefault(_key(child), child)
+        if not candidates:
+            break
+
+        children = list(candidates.values())
+        probabilities = score(children)
+        depth += 1
+
+        for child, probability in zip(children, probabilities):
+            added = tuple(SUBJECTS[i] for i in np.nonzero(child[:N_SUBJECTS] & ~base_bits[:N_SUBJECTS])[0])
+            plans[added] = probability
+
+        ranked = np.argsort(probabilities)[::-1][:beam_width]
+        frontier = [children[i] for i in ranked]
+
+    # Prefer shorter plans and drop ones that only pad a better subset with extra subjects
+    best = []
+    for added, probability in sorted(plans.items(), key=lambda item: (-item[1], len(item[0]))):
+        if any(set(kept).issubset(added) and kept_probability >= probability for kept, kept_probability in best):
+            continue
+        best.append((added, probability))
+        if len(best) == max_plans:
+            break
+
+    return {
+        'base_probability': base_probability,
+        'plans': [
+            {
+                'add_subjects': list(added),
+                'probability': probability,
+                'gain': probability - base_probability
+            }
+            for added, probability in best
+        ],
+        'depth_reached': depth,
+        'profiles_scored': len(memo),
+        'timed_out': timed_out,
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
@@ -0,0 +1,76 @@
+"""
+Outcome Log
+Append-only JSON-lines record of real (profile, chosen career) outcomes.
+Profiles are stored as their 62 input bits in hex; readers stream the log
+in chunks from a byte offset, so retraining resumes where it stopped
+"""
+
+import json
+import os
+from datetime import datetime
+import numpy as np
+
+from profile_features import N_INPUTS
+
+OUTCOME_LOG = os.environ.get('OUTCOME_LOG', 'outcomes.jsonl')
+
+PROFILE_BYTES = (N_INPUTS + 7) // 8
+
+# Outcomes per retraining chunk
+OUTCOME_CHUNK_ROWS = 50_000
+
+def append_outcome(bits, career, path=OUTCOME_LOG):
+    """Append one outcome as a single line
+
+    One write() in append mode per record keeps lines whole when several
+    server workers log to the same file.
+    """
+
+    line = json.dumps({
+        'time': datetime.now().isoformat(),
+        'profile': np.packbits(np.asarray(bits, dtype=bool)).tobytes().hex(),
+        'career': str(career)
+    })
+    with open(path, 'a') as f:
+        f.write(line + '\n')
+
+def read_outcome_chunks(path=OUTCOME_LOG, offset=0, chunk_rows=OUTCOME_CHUNK_ROWS):
+    """Yield (bits, careers, end offset) for up to chunk_rows outcomes at a time
+
+    bits is a boolean (rows, 62) array and careers a string array. end
+    offset is the byte position after the chunk's last complete line; a
+    trailing line still being written is left for the next read. Lines
+    that don't parse are skipped.
+    """
+
+    if not os.path.exists(path):
+        return
+    if os.path.getsize(path) < offset:
+        raise ValueError(f"{path} is shorter than the consumed offset {offset}; was it truncated or replaced?")
+
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        profiles, careers = [], []
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            offset += len(line)
+            try:
+                record = json.loads(line)
+                profile = bytes.fromhex(record['profile'])
+                career = str(record['career'])
+            except (ValueError, KeyError, TypeError):
+                continue
+            if len(profile) != PROFILE_BYTES:
+                continue
+            profiles.append(profile)
+            careers.append(career)
+            if len(profiles) == chunk_rows:
+                yield _unpack(profiles), np.array(careers), offset
+                profiles, careers = [], []
+        if profiles:
+            yield _unpack(profiles), np.array(careers), offset
+
+def _unpack(profiles):
+    packed = np.frombuffer(b''.join(profiles), dtype=np.uint8).reshape(len(profiles), PROFILE_BYTES)
+    return np.unpackbits(packed, axis=1, count=N_INPUTS).astype(bool)
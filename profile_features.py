@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Profile Features
+The single definition of the subjects, interest questions and engineered
+features: a reference one-profile featurizer and its vectorized version
+working on the 62 raw boolean inputs (32 GCE subjects followed by 30
+interest answers)
+"""
+
+import numpy as np
+
+# All 32 Cameroon GCE subjects
+SUBJECTS = [
+    "English", "French", "General Paper", "Religious Studies",
+    "Philosophy", "Logic", "Mathematics", "Further Mathematics",
+    "Physics", "Chemistry", "Biology", "Computer Science",
+    "Ict", "Geology", "Technical Drawing", "Food Science",
+    "Nutrition", "Agricultural Science", "Physical Education", "Environmental Management",
+    "History", "Geography", "Literature", "Education",
+    "Art", "Music", "Economics", "Accounting",
+    "Business Mathematics", "Management", "Law", "Commerce"
+]
+
+# Interest categories that become features
+INTEREST_CATEGORIES = [
+    'analytical_thinking', 'problem_solving', 'helping_others', 'healthcare',
+    'teaching', 'mentoring', 'communication', 'business', 'entrepreneurship',
+    'leadership', 'technical_skills', 'engineering', 'creative_arts', 'design',
+    'writing', 'literature', 'travel', 'law', 'justice', 'social_impact',
+    'finance', 'outdoor_work', 'nature', 'management', 'organization',
+    'biology', 'science', 'research', 'discovery', 'economics', 'trade',
+    'technology', 'programming', 'media', 'entertainment', 'security'
+]
+
+# All 30 interest questions
+INTEREST_MAPPING = {
+    1: "analytical_thinking,problem_solving",
+    2: "helping_others,healthcare",
+    3: "teaching,mentoring,communication",
+    4: "business,entrepreneurship,leadership",
+    5: "technical_skills,engineering",
+    6: "creative_arts,design",
+    7: "writing,communication,literature",
+    8: "travel,cultural_awareness",
+    9: "law,justice,social_impact",
+    10: "finance,analytical_thinking",
+    11: "outdoor_work,nature",
+    12: "social_impact,community_service",
+    13: "management,leadership,organization",
+    14: "healthcare,biology,science",
+    15: "engineering,construction,design",
+    16: "security,law_enforcement",
+    17: "technology,programming",
+    18: "research,science,discovery",
+    19: "economics,business,trade",
+    20: "digital_media,content_creation",
+    21: "animal_care,veterinary",
+    22: "fashion,beauty,personal_care",
+    23: "counseling,psychology,helping_others",
+    24: "mathematics,analytical_thinking",
+    25: "media,entertainment",
+    26: "environmental_science,sustainability",
+    27: "electronics,technology",
+    28: "child_education,teaching",
+    29: "aerospace,aviation,exploration",
+    30: "artificial_intelligence,robotics"
+}
+
+# Wording of the interest questions as shown on /test
+INTEREST_QUESTIONS = {
+    1: "Do you enjoy solving complex mathematical problems?",
+    2: "Are you interested in helping people with their health problems?",
+    3: "Do you like teaching or explaining concepts to others?",
+    4: "Are you interested in starting your own business?",
+    5: "Do you enjoy working with machines and technical equipment?",
+    6: "Are you drawn to creative arts like painting, music, or design?",
+    7: "Do you enjoy writing stories, articles, or reports?",
+    8: "Are you interested in traveling and learning about different cultures?",
+    9: "Are you interested in law, justice, and legal matters?",
+    10: "Do you enjoy working with numbers and financial data?",
+    11: "Do you prefer working outdoors in nature?",
+    12: "Are you passionate about making a positive impact on society?",
+    13: "Do you enjoy leading teams and managing projects?",
+    14: "Are you interested in biology and how the human body works?",
+    15: "Do you like building or constructing things?",
+    16: "Are you interested in security and protecting others?",
+    17: "Do you enjoy programming and working with computers?",
+    18: "Are you curious about scientific research and discoveries?",
+    19: "Are you interested in economics and how markets work?",
+    20: "Do you enjoy creating digital content like videos or websites?",
+    21: "Do you love working with animals?",
+    22: "Are you interested in fashion, beauty, or personal styling?",
+    23: "Do you enjoy counseling and helping people with personal problems?",
+    24: "Are you passionate about mathematics and logical thinking?",
+    25: "Are you interested in media, entertainment, or journalism?",
+    26: "Are you concerned about environmental issues and sustainability?",
+    27: "Do you enjoy working with electronic devices and circuits?",
+    28: "Do you like working with children and education?",
+    29: "Are you fascinated by space, aviation, or aerospace?",
+    30: "Are you interested in artificial intelligence and robotics?"
+}
+
+N_SUBJECTS = len(SUBJECTS)
+N_QUESTIONS = len(INTEREST_MAPPING)
+N_INPUTS = N_SUBJECTS + N_QUESTIONS
+
+# Advanced interaction features: (name, subjects summed, interest multiplied)
+INTERACTIONS = [
+    ('stem_analytical', ['Mathematics', 'Physics', 'Chemistry'], 'analytical_thinking'),
+    ('tech_programming', ['Computer Science', 'Ict'], 'technology'),
+    ('health_helping', ['Biology', 'Chemistry'], 'helping_others'),
+    ('business_leadership', ['Economics', 'Management'], 'business'),
+]
+
+FEATURE_NAMES = (
+    [f'subject_{subject.lower().replace(" ", "_")}' for subject in SUBJECTS] +
+    [f'interest_{interest}' for interest in INTEREST_CATEGORIES] +
+    [name for name, _, _ in INTERACTIONS]
+)
+
+# How many of each question's tags land on each category (30 x 36)
+QUESTION_CATEGORY_MATRIX = np.zeros((N_QUESTIONS, len(INTEREST_CATEGORIES)))
+for _q_id, _tags in INTEREST_MAPPING.items():
+    for _tag in _tags.split(','):
+        if _tag in INTEREST_CATEGORIES:
+            QUESTION_CATEGORY_MATRIX[_q_id - 1, INTEREST_CATEGORIES.index(_tag)] += 1
+
+_SUBJECT_INDEX = {subject: i for i, subject in enumerate(SUBJECTS)}
+_INTERACTION_SUBJECTS = np.zeros((N_SUBJECTS, len(INTERACTIONS)))
+_INTERACTION_INTERESTS = []
+for _j, (_name, _subjects, _interest) in enumerate(INTERACTIONS):
+    for _subject in _subjects:
+        _INTERACTION_SUBJECTS[_SUBJECT_INDEX[_subject], _j] = 1
+    _INTERACTION_INTERESTS.append(INTEREST_CATEGORIES.index(_interest))
+
+def profile_bits(subjects, interests):
+    """62 boolean inputs for one profile (unknown subjects are ignored, like create_profile_features)"""
+
+    bits = np.zeros(N_INPUTS, dtype=bool)
+    for subject in subjects:
+        if subject in _SUBJECT_INDEX:
+            bits[_SUBJECT_INDEX[subject]] = True
+    for q_id, answer in interests.items():
+        if answer and int(q_id) in INTEREST_MAPPING:
+            bits[N_SUBJECTS + int(q_id) - 1] = True
+    return bits
+
+def bits_to_profile(bits):
+    """Subjects list and interest answers for one row of boolean inputs"""
+
+    subjects = [SUBJECTS[i] for i in np.nonzero(bits[:N_SUBJECTS])[0]]
+    interests = {str(q + 1): bool(bits[N_SUBJECTS + q]) for q in range(N_QUESTIONS)}
+    return subjects, interests
+
+def input_labels():
+    """Description of each of the 62 inputs, in bit order"""
+    return (
+        [{'type': 'subject', 'name': subject} for subject in SUBJECTS] +
+        [{'type': 'question', 'id': q_id} for q_id in sorted(INTEREST_MAPPING)]
+    )
+
+def create_profile_features(student_subjects, interest_answers):
+    """Reference one-profile featurizer: (feature values, feature names)
+
+    Written out feature by feature; features_from_bits must give the same
+    values for the same profile.
+    """
+
+    features = {}
+
+    # Subject features (32 features)
+    for subject in SUBJECTS:
+        features[f'subject_{subject.lower().replace(" ", "_")}'] = 1 if subject in student_subjects else 0
+
+    # Calculate interest scores
+    interest_scores = {category: 0 for category in INTEREST_CATEGORIES}
+    for q_id, answer in interest_answers.items():
+        if answer and int(q_id) in INTEREST_MAPPING:
+            for interest in INTEREST_MAPPING[int(q_id)].split(','):
+                if interest in interest_scores:
+                    interest_scores[interest] += 1
+
+    # Normalize and add interest features
+    max_score = max(interest_scores.values()) if max(interest_scores.values()) > 0 else 1
+    for interest in INTEREST_CATEGORIES:
+        features[f'interest_{interest}'] = interest_scores[interest] / max_score
+
+    # Advanced interaction features (key for accuracy)
+    features['stem_analytical'] = (
+        features['subject_mathematics'] + features['subject_physics'] + features['subject_chemistry']
+    ) * features['interest_analytical_thinking']
+
+    features['tech_programming'] = (
+        features['subject_computer_science'] + features['subject_ict']
+    ) * features['interest_technology']
+
+    features['health_helping'] = (
+        features['subject_biology'] + features['subject_chemistry']
+    ) * features['interest_helping_others']
+
+    features['business_leadership'] = (
+        features['subject_economics'] + features['subject_management']
+    ) * features['interest_business']
+
+    return list(features.values()), list(features.keys())
+
+_FIRST_INTERACTION = N_SUBJECTS + len(INTEREST_CATEGORIES)
+
+def features_from_bits(bits, columns=None):
+    """Engineered feature matrix (rows x 72) for a matrix of boolean inputs
+
+    With columns (indices into FEATURE_NAMES, e.g. a feature-pruned model's
+    active_features) only those columns are computed, in that order.
+    """
+
+    bits = np.atleast_2d(bits)
+    if columns is not None:
+        return _selected_features(bits, np.asarray(columns, dtype=np.intp))
+    subject_bits = bits[:, :N_SUBJECTS].astype(np.float64)
+    interest_bits = bits[:, N_SUBJECTS:].astype(np.float64)
+
+    # Interest scores normalised by each row's highest score
+    scores = interest_bits @ QUESTION_CATEGORY_MATRIX
+    max_score = scores.max(axis=1, keepdims=True)
+    interest_features = scores / np.where(max_score > 0, max_score, 1)
+
+    interactions = (subject_bits @ _INTERACTION_SUBJECTS) * interest_features[:, _INTERACTION_INTERESTS]
+
+    return np.hstack([subject_bits, interest_features, interactions])
+
+def _selected_features(bits, columns):
+    is_interest = (columns >= N_SUBJECTS) & (columns < _FIRST_INTERACTION)
+    is_interaction = columns >= _FIRST_INTERACTION
+    features = np.empty((len(bits), len(columns)))
+    features[:, columns < N_SUBJECTS] = bits[:, columns[columns < N_SUBJECTS]]
+    if not (is_interest | is_interaction).any():
+        return features
+
+    # Every category score is needed for the row maximum, but only kept columns are divided out
+    scores = bits[:, N_SUBJECTS:].astype(np.float64) @ QUESTION_CATEGORY_MATRIX
+    max_score = scores.max(axis=1, keepdims=True)
+    max_score = np.where(max_score > 0, max_score, 1)
+    features[:, is_interest] = scores[:, columns[is_interest] - N_SUBJECTS] / max_score
+
+    interactions = columns[is_interaction] - _FIRST_INTERACTION
+    if len(interactions):
+        subject_counts = bits[:, :N_SUBJECTS].astype(np.float64) @ _INTERACTION_SUBJECTS[:, interactions]
+        categories = np.asarray(_INTERACTION_INTERESTS)[interactions]
+        features[:, is_interaction] = subject_counts * (scores[:, categories] / max_score)
+    return features
+
+def single_toggle_variants(bits):
+    """The profile followed by its 62 single-input toggles (63 x 62)"""
+    bits = np.asarray(bits, dtype=bool)
+    return np.vstack([bits, bits[None, :] ^ np.eye(N_INPUTS, dtype=bool)])
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Students-Like-You Index
+Stores profiles as one uint64 per student (62 input bits) and finds the
+nearest ones by Hamming distance with vectorized XOR + popcount. Each
+model's index is a directory named by its fingerprint and is never
+rewritten once published
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+import numpy as np
+
+from model_utils import (
+    MODEL_FILE, load_artifact, model_fingerprint, model_dir, publish_dir, prune_dirs, popcount, score_profile_bits
+)
+from profile_features import N_INPUTS
+
+INDEX_DIR = os.environ.get('PROFILE_INDEX_DIR', 'profile_index')
+# Profiles compared per step, bounding query memory on very large indexes
+QUERY_CHUNK = 1 << 20
+LABEL_BATCH = 50000
+
+# Indexes for older models kept next to the newest one
+KEEP_INDEXES = 3
+
+PROFILES_PER_CAREER = 2000
+
+_BIT_WEIGHTS = np.left_shift(np.uint64(1), np.arange(N_INPUTS, dtype=np.uint64))
+
+def pack_profiles(bits):
+    """One uint64 per row of 62 boolean inputs (input i is bit i)"""
+    bits = np.atleast_2d(bits).astype(bool)
+    return np.bitwise_or.reduce(np.where(bits, _BIT_WEIGHTS, np.uint64(0)), axis=1)
+
+def unpack_profiles(packed):
+    """Boolean input rows back from packed uint64 profiles"""
+    return (np.atleast_1d(packed)[:, None] & _BIT_WEIGHTS) != 0
+
+def nearest(index, bits, k=10):
+    """Positions and Hamming distances of the k stored profiles closest to one profile"""
+
+    query = pack_profiles(bits)[0]
+    profiles = index['profiles']
+    best_positions = np.empty(0, dtype=np.int64)
+    best_distances = np.empty(0, dtype=np.uint8)
+
+    for start in range(0, len(profiles), QUERY_CHUNK):
+        distances = popcount(profiles[start:start + QUERY_CHUNK] ^ query).astype(np.uint8)
+        take = min(k, len(distances))
+        local = np.argpartition(distances, take - 1)[:take]
+        best_positions = np.concatenate([best_positions, local + start])
+        best_distances = np.concatenate([best_distances, distances[local]])
+
+        if len(best_distances) > k:
+            keep = np.argpartition(best_distances, k - 1)[:k]
+            best_positions, best_distances = best_positions[keep], best_distances[keep]
+
+    order = np.lexsort((best_positions, best_distances))
+    return best_positions[order], best_distances[order]
+
+def build_index(model_data, bits, output_dir=INDEX_DIR, source='synthetic'):
+    """Pack profiles, label them with the model's top career and publish the index
+
+    Written to a staging directory and renamed to output_dir/<fingerprint>,
+    so rebuilding never touches files a running worker has mapped.
+    """
+
+    path = model_dir(output_dir, model_data)
+    staging = f"{path}.tmp{os.getpid()}"
+    os.makedirs(staging, exist_ok=True)
+    profiles = pack_profiles(bits)
+    careers = np.empty(len(bits), dtype=np.uint16)
+    for start in range(0, len(bits), LABEL_BATCH):
+        careers[start:start + LABEL_BATCH] = score_profile_bits(model_data, bits[start:start + LABEL_BATCH]).argmax(axis=1)
+
+    np.save(os.path.join(staging, 'profiles.npy'), profiles)
+    np.save(os.path.join(staging, 'careers.npy'), careers)
+
+    meta = {
+        'fingerprint': model_fingerprint(model_data),
+        'model_version': model_data.get('model_version', 'unknown'),
+        'profiles': int(len(profiles)),
+        'source': source,
+        'created': datetime.now().isoformat()
+    }
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    publish_dir(staging, path)
+    prune_dirs(output_dir, KEEP_INDEXES)
+    return meta
+
+def load_index(model_data, index_dir=INDEX_DIR):
+    """Memory-map the index if its career labels came from this model, else return None"""
+
+    path = model_dir(index_dir, model_data)
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['fingerprint'] != model_fingerprint(model_data):
+        return None
+
+    return {
+        'meta': meta,
+        'profiles': np.load(os.path.join(path, 'profiles.npy'), mmap_mode='r'),
+        'careers': np.load(os.path.join(path, 'careers.npy'), mmap_mode='r')
+    }
+
+def rebuild_index(model_data, index_dir=INDEX_DIR, profiles_per_career=PROFILES_PER_CAREER, seed=11):
+    """Publish model_data's index, relabelling the newest published index's profiles
+
+    Falls back to fresh synthetic students when no index exists yet.
+    Returns the new index's meta.
+    """
+
+    published = []
+    if os.path.isdir(index_dir):
+        published = [entry for entry in os.scandir(index_dir) if entry.is_dir() and '.tmp' not in entry.name]
+    for entry in sorted(published, key=lambda entry: entry.stat().st_mtime, reverse=True):
+        try:
+            with open(os.path.join(entry.path, 'meta.json')) as f:
+                source = json.load(f)['source']
+            profiles = np.load(os.path.join(entry.path, 'profiles.npy'))
+        except (OSError, ValueError, KeyError):
+            continue  # pruned or unreadable meanwhile
+        return build_index(model_data, unpack_profiles(profiles), index_dir, source)
+
+    bits = synthetic_profile_bits(list(model_data['career_names']), profiles_per_career, seed)
+    return build_index(model_data, bits, index_dir)
+
+def synthetic_profile_bits(careers, profiles_per_career, seed=None):
+    """Boolean inputs for synthetic students, drawn in vectorized chunks by iter_profile_bits
+
+    Careers come from the synthetic catalog of the same size; any other
+    career name uses the same template fallback as create_realistic_profile.
+    """
+
+    # Only index builds need the training package; the server imports this module for queries
+    from career_training.data import (
+        CAREER_SUBJECTS, CAREER_INTERESTS, DEFAULT_SUBJECTS, DEFAULT_INTERESTS, create_synthetic_catalog,
+        iter_profile_bits
+    )
+
+    synthetic = create_synthetic_catalog(len(careers))
+    catalog = {
+        career: synthetic.get(career) or {
+            'subjects': CAREER_SUBJECTS.get(career, DEFAULT_SUBJECTS),
+            'interests': CAREER_INTERESTS.get(career, DEFAULT_INTERESTS)
+        }
+        for career in careers
+    }
+    bits = np.empty((len(careers) * profiles_per_career, N_INPUTS), dtype=bool)
+    row = 0
+    for chunk, _ in iter_profile_bits(catalog, profiles_per_career, seed):
+        bits[row:row + len(chunk)] = chunk
+        row += len(chunk)
+    return bits
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the students-like-you profile index')
+    parser.add_argument('--model', default=MODEL_FILE, help='Model artifact used to label profiles')
+    parser.add_argument('--output', default=INDEX_DIR, help='Index directory')
+    parser.add_argument('--profiles-per-career', type=int, default=PROFILES_PER_CAREER, help='Synthetic students per career')
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    print("👥 Building students-like-you index")
+    print("=" * 60)
+
+    model_data = load_artifact(args.model)
+    started = datetime.now()
+    bits = synthetic_profile_bits(list(model_data['career_names']), args.profiles_per_career, args.seed)
+    meta = build_index(model_data, bits, args.output)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print(f"✅ {meta['profiles']} profiles indexed in {elapsed:.1f}s "
+          f"({meta['profiles'] * 8 / (1024*1024):.1f}MB packed)")
+
+if __name__ == '__main__':
+    main()
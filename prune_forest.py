@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Ensemble Pruning
+Greedily orders the forest's trees and keeps the smallest prefix whose
+top-k rankings stay within the agreement target of the full forest
+"""
+
+import argparse
+import copy
+import numpy as np
+from datetime import datetime
+
+from career_training import generate_training_data
+from model_utils import (
+    MODEL_FILE, load_artifact, save_artifact, serialized_size_mb, measure_latency, select_active_features,
+    top_1_agreement, top_k_agreement
+)
+
+PRUNED_MODEL_FILE = 'pruned_career_model.pkl'
+
+def per_tree_probabilities(forest, X_scaled):
+    """Class probabilities of every tree, shaped (trees, rows, classes)"""
+    return np.stack([tree.predict_proba(X_scaled) for tree in forest.estimators_])
+
+def greedy_tree_order(tree_probabilities):
+    """Order trees so every prefix's average stays closest to the full forest
+
+    Each step adds the tree that minimises the squared distance between the
+    running average and the full forest's probabilities, evaluated for all
+    remaining trees at once.
+    """
+
+    n_trees = len(tree_probabilities)
+    full = tree_probabilities.mean(axis=0)
+    running_sum = np.zeros_like(full)
+    remaining = list(range(n_trees))
+    order = []
+
+    for size in range(1, n_trees + 1):
+        candidates = tree_probabilities[remaining]
+        averages = (running_sum[None] + candidates) / size
+        distances = ((averages - full[None]) ** 2).sum(axis=(1, 2))
+        best = remaining.pop(int(np.argmin(distances)))
+        running_sum += tree_probabilities[best]
+        order.append(best)
+
+    return order
+
+def agreement_curve(tree_probabilities, order, k):
+    """Top-k and top-1 agreement with the full forest for every prefix of the order"""
+
+    full = tree_probabilities.mean(axis=0)
+    running_sum = np.zeros_like(full)
+    curve = []
+
+    for size, tree_index in enumerate(order, 1):
+        running_sum += tree_probabilities[tree_index]
+        prefix = running_sum / size
+        curve.append({
+            'n_trees': size,
+            'top_k_agreement': top_k_agreement(full, prefix, k),
+            'top1_agreement': top_1_agreement(full, prefix)
+        })
+
+    return curve
+
+def prune_forest(forest, tree_indices):
+    """Copy of the forest that keeps only the given trees"""
+    pruned = copy.deepcopy(forest)
+    pruned.estimators_ = [pruned.estimators_[i] for i in tree_indices]
+    pruned.n_estimators = len(pruned.estimators_)
+    return pruned
+
+def main():
+    parser = argparse.ArgumentParser(description='Prune the career forest to the trees that preserve its rankings')
+    parser.add_argument('--model', default=MODEL_FILE, help='Model artifact to prune')
+    parser.add_argument('--output', default=PRUNED_MODEL_FILE, help='Where to write the pruned artifact')
+    parser.add_argument('--samples', type=int, default=100, help='Held-out synthetic profiles per career')
+    parser.add_argument('--top-k', type=int, default=5, help='Ranking depth that must be preserved')
+    parser.add_argument('--target', type=float, default=0.99, help='Required top-k agreement with the full forest')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print("🚀 Career Forest Pruning")
+    print("=" * 60)
+
+    model_data = load_artifact(args.model)
+    forest = model_data['model']
+    scaler = model_data['scaler']
+    label_encoder = model_data['label_encoder']
+    print(f"✅ Model: {args.model} ({len(forest.estimators_)} trees)")
+
+    np.random.seed(args.seed)
+    X_eval, y_eval, _ = generate_training_data(list(label_encoder.classes_), args.samples, verbose=False)
+    X_eval_scaled = scaler.transform(select_active_features(model_data, X_eval))
+    y_eval = label_encoder.transform(y_eval)
+    print(f"📊 Held-out profiles: {len(X_eval)}")
+
+    # Order trees on one half of the profiles and report the curve on the other
+    tree_probabilities = per_tree_probabilities(forest, X_eval_scaled)
+    selection = np.arange(len(X_eval_scaled)) % 2 == 0
+    order = greedy_tree_order(tree_probabilities[:, selection])
+    curve = agreement_curve(tree_probabilities[:, ~selection], order, args.top_k)
+
+    print(f"📈 Top-{args.top_k} agreement vs tree count:")
+    for point in curve:
+        if point['n_trees'] in (1, 5) or point['n_trees'] % 10 == 0:
+            print(f"   {point['n_trees']:4d} trees: top-{args.top_k} {point['top_k_agreement']:.1%}, "
+                  f"top-1 {point['top1_agreement']:.1%}")
+
+    chosen_size = next(
+        (point['n_trees'] for point in curve if point['top_k_agreement'] >= args.target),
+        len(order)
+    )
+    kept = sorted(order[:chosen_size])
+    pruned = prune_forest(forest, kept)
+
+    full_latency = measure_latency(forest, X_eval_scaled)
+    pruned_latency = measure_latency(pruned, X_eval_scaled)
+    full_size = serialized_size_mb(forest)
+    pruned_size = serialized_size_mb(pruned)
+    pruned_accuracy = float((pruned.predict_proba(X_eval_scaled).argmax(axis=1) == y_eval).mean())
+
+    print(f"✂️ Keeping {chosen_size}/{len(order)} trees "
+          f"(top-{args.top_k} agreement {curve[chosen_size - 1]['top_k_agreement']:.1%})")
+    print(f"📊 Latency: {full_latency['single_row_ms']:.2f}ms → {pruned_latency['single_row_ms']:.2f}ms per row")
+    print(f"📊 Size: {full_size:.2f}MB → {pruned_size:.2f}MB")
+
+    pruned_data = dict(model_data)
+    pruned_data.update({
+        'model': pruned,
+        'training_date': datetime.now().isoformat(),
+        'model_version': f"{model_data.get('model_version', 'unknown')}_pruned{chosen_size}",
+        'performance': {
+            **model_data['performance'],
+            'test_accuracy': pruned_accuracy,
+            'pruning': {
+                'source': args.model,
+                'top_k': args.top_k,
+                'target_agreement': args.target,
+                'kept_trees': kept,
+                'curve': curve,
+                'latency_before': full_latency,
+                'latency_after': pruned_latency,
+                'size_mb_before': full_size,
+                'size_mb_after': pruned_size,
+                'eval_samples_per_career': args.samples,
+                'seed': args.seed
+            }
+        }
+    })
+
+    file_size = save_artifact(pruned_data, args.output)
+    print(f"💾 Pruned model saved: {args.output} ({file_size:.2f}MB)")
+
+if __name__ == '__main__':
+    main()
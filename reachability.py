@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Career Reachability
+Walks the forest once to record, for every leaf, which subjects it needs and
+whether some interest answers can land in it. A query then bounds each
+career's achievable probability for fixed subjects without searching the
+2^30 interest combinations
+"""
+
+import numpy as np
+
+from profile_features import SUBJECTS, INTEREST_CATEGORIES, INTERACTIONS, N_SUBJECTS, FEATURE_NAMES
+
+_SUBJECT_WEIGHTS = np.left_shift(np.uint64(1), np.arange(N_SUBJECTS, dtype=np.uint64))
+_INTERACTION_SUBJECTS = [[SUBJECTS.index(s) for s in subjects] for _, subjects, _ in INTERACTIONS]
+_INTERACTION_CATEGORY = [INTEREST_CATEGORIES.index(interest) for _, _, interest in INTERACTIONS]
+_FIRST_INTEREST = N_SUBJECTS
+_FIRST_INTERACTION = N_SUBJECTS + len(INTEREST_CATEGORIES)
+
+def leaf_boxes(tree, n_columns):
+    """Per-leaf (low, high] bounds on every model column in scaled space, plus leaf ids"""
+
+    lows, highs, leaves = [], [], []
+    stack = [(0, np.full(n_columns, -np.inf), np.full(n_columns, np.inf))]
+    while stack:
+        node, low, high = stack.pop()
+        if tree.children_left[node] == -1:
+            lows.append(low)
+            highs.append(high)
+            leaves.append(node)
+            continue
+
+        column, threshold = tree.feature[node], tree.threshold[node]
+        left_high = high.copy()
+        left_high[column] = min(high[column], threshold)
+        right_low = low.copy()
+        right_low[column] = max(low[column], threshold)
+        stack.append((tree.children_left[node], low, left_high))
+        stack.append((tree.children_right[node], right_low, high))
+
+    return np.array(lows), np.array(highs), np.array(leaves)
+
+def build_index(model_data):
+    """Leaf requirements and class distributions for the whole forest
+
+    Subject columns become must-have / must-not-have bit masks. Interest
+    columns are relaxed to independent values in [0, 1] and each interaction
+    to its interest value times the (fixed) subject count, so the bounds
+    computed from the index never underestimate what a student can reach.
+    """
+
+    forest = model_data['model']
+    scaler = model_data['scaler']
+    active = model_data.get('active_features')
+    active = list(range(len(FEATURE_NAMES))) if active is None else list(active)
+    if scaler.n_features_in_ != len(active):
+        raise ValueError(f"Model has {scaler.n_features_in_} columns; the profile featurizer gives {len(active)}")
+    column_of = {full: column for column, full in enumerate(active)}
+
+    blocks = {'low': [], 'high': [], 'value': []}
+    tree_starts = []
+    n_leaves = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        low, high, leaves = leaf_boxes(tree, len(active))
+        value = tree.value[leaves, 0, :]
+        blocks['low'].append(low)
+        blocks['high'].append(high)
+        blocks['value'].append(value / np.maximum(value.sum(axis=1, keepdims=True), 1e-12))
+        tree_starts.append(n_leaves)
+        n_leaves += len(leaves)
+
+    low = np.vstack(blocks['low'])
+    high = np.vstack(blocks['high'])
+    feasible = np.ones(n_leaves, dtype=bool)
+    must_one = np.zeros(n_leaves, dtype=np.uint64)
+    must_zero = np.zeros(n_leaves, dtype=np.uint64)
+
+    # Subjects: which of the two scaled values (as the trees see them, float32) fit the box
+    for subject in range(N_SUBJECTS):
+        if subject not in column_of:
+            continue
+        column = column_of[subject]
+        zero, one = (np.float32((value - scaler.mean_[column]) / scaler.scale_[column]) for value in (0.0, 1.0))
+        allows_zero = (low[:, column] < zero) & (zero <= high[:, column])
+        allows_one = (low[:, column] < one) & (one <= high[:, column])
+        feasible &= allows_zero | allows_one
+        must_one[~allows_zero] |= _SUBJECT_WEIGHTS[subject]
+        must_zero[~allows_one] |= _SUBJECT_WEIGHTS[subject]
+
+    # Continuous columns are checked in raw units
+    raw_low = low * scaler.scale_ + scaler.mean_
+    raw_high = high * scaler.scale_ + scaler.mean_
+    unbounded = (np.full(n_leaves, -np.inf), np.full(n_leaves, np.inf))
+
+    def raw_bounds(full_column):
+        if full_column not in column_of:
+            return unbounded
+        return raw_low[:, column_of[full_column]], raw_high[:, column_of[full_column]]
+
+    for category in range(len(INTEREST_CATEGORIES)):
+        category_low, category_high = raw_bounds(_FIRST_INTEREST + category)
+        feasible &= (category_low < 1) & (category_high >= 0)
+
+    # One feasibility column per possible subject count of each interaction
+    interaction_ok = []
+    for j, subjects in enumerate(_INTERACTION_SUBJECTS):
+        category_low, category_high = raw_bounds(_FIRST_INTEREST + _INTERACTION_CATEGORY[j])
+        interaction_low, interaction_high = raw_bounds(_FIRST_INTERACTION + j)
+        ok = np.zeros((n_leaves, len(subjects) + 1), dtype=bool)
+        ok[:, 0] = (interaction_low < 0) & (interaction_high >= 0)
+        for count in range(1, len(subjects) + 1):
+            lower = np.maximum(category_low, interaction_low / count)
+            upper = np.minimum(np.minimum(category_high, interaction_high / count), 1.0)
+            ok[:, count] = (upper >= 0) & (upper > lower)
+        interaction_ok.append(ok)
+
+    return {
+        'feasible': feasible,
+        'must_one': must_one,
+        'must_zero': must_zero,
+        'interaction_ok': interaction_ok,
+        'value': np.vstack(blocks['value']).astype(np.float32),
+        'tree_starts': np.array(tree_starts)
+    }
+
+def reachable_probabilities(index, subject_bits):
+    """Upper bound on each career's probability over all interest answers for fixed subjects"""
+
+    subject_bits = np.asarray(subject_bits[:N_SUBJECTS], dtype=bool)
+    packed = np.bitwise_or.reduce(np.where(subject_bits, _SUBJECT_WEIGHTS, np.uint64(0)))
+
+    ok = index['feasible'] & ((index['must_one'] & ~packed) == 0) & ((index['must_zero'] & packed) == 0)
+    for subjects, interaction_ok in zip(_INTERACTION_SUBJECTS, index['interaction_ok']):
+        ok &= interaction_ok[:, int(subject_bits[subjects].sum())]
+
+    # Best reachable leaf of each tree, averaged like predict_proba
+    per_tree = np.maximum.reduceat(np.where(ok[:, None], index['value'], 0), index['tree_starts'], axis=0)
+    return per_tree.mean(axis=0)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Sparse Leaf Forest
+Serving copy of a fitted random forest that keeps only split nodes and the
+non-zero class probabilities of each leaf. sklearn stores a full
+careers-wide distribution at every node, which grows linearly with the
+catalog; here memory and scoring cost follow what the leaves actually hold
+"""
+
+import argparse
+import numpy as np
+
+from model_utils import MODEL_FILE, load_artifact, save_artifact, serialized_size_mb
+
+SPARSE_MODEL_FILE = 'sparse_career_model.pkl'
+
+class SparseLeafForest:
+    """All trees in one node array, walked together; leaves in CSR form (classes, probabilities)"""
+
+    def __init__(self, forest):
+        lefts, rights, features, thresholds = [], [], [], []
+        leaf_pointer, leaf_classes, leaf_probabilities = [0], [], []
+        roots = []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+
+            # Leaves point to themselves so finished rows stay put while others descend
+            own = np.arange(tree.node_count) + offset
+            lefts.append(np.where(is_leaf, own, tree.children_left + offset))
+            rights.append(np.where(is_leaf, own, tree.children_right + offset))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+
+            value = tree.value[:, 0, :]
+            for node in range(tree.node_count):
+                if is_leaf[node]:
+                    distribution = value[node] / max(value[node].sum(), 1e-12)
+                    classes = np.nonzero(distribution)[0]
+                    leaf_classes.append(classes)
+                    leaf_probabilities.append(distribution[classes])
+                    leaf_pointer.append(leaf_pointer[-1] + len(classes))
+                else:
+                    leaf_pointer.append(leaf_pointer[-1])
+            offset += tree.node_count
+
+        self.left = np.concatenate(lefts).astype(np.int32)
+        self.right = np.concatenate(rights).astype(np.int32)
+        self.feature = np.concatenate(features).astype(np.int32)
+        self.threshold = np.concatenate(thresholds)
+        self.roots = np.array(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.leaf_pointer = np.array(leaf_pointer, dtype=np.int64)
+        self.leaf_classes = np.concatenate(leaf_classes).astype(np.uint16 if len(forest.classes_) < 65536 else np.int32)
+        self.leaf_probabilities = np.concatenate(leaf_probabilities).astype(np.float32)
+        self.classes_ = forest.classes_
+        self.n_features_in_ = forest.n_features_in_
+
+    def apply(self, X):
+        """Leaf node of every row in every tree (rows x trees)"""
+
+        # Trees compare float32 copies of the features, as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        starts = self.leaf_pointer[leaves].ravel()
+        counts = self.leaf_pointer[leaves + 1].ravel() - starts
+
+        # Expand each reached leaf's stored (class, probability) pairs and add them per row
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        rows = np.repeat(np.repeat(np.arange(len(leaves)), leaves.shape[1]), counts)
+        n_classes = len(self.classes_)
+        totals = np.bincount(
+            rows * n_classes + self.leaf_classes[positions],
+            weights=self.leaf_probabilities[positions],
+            minlength=len(leaves) * n_classes
+        )
+        return totals.reshape(len(leaves), n_classes) / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def score(self, X, y):
+        return float(np.mean(self.predict(X) == np.asarray(y)))
+
+    def stored_values(self):
+        """Leaf (class, probability) pairs kept, comparable to sklearn's nodes x classes"""
+        return int(len(self.leaf_probabilities))
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a model artifact to sparse leaf storage for serving')
+    parser.add_argument('--model', default=MODEL_FILE, help='Artifact with a fitted random forest')
+    parser.add_argument('--output', default=SPARSE_MODEL_FILE, help='Converted artifact')
+    args = parser.parse_args()
+
+    print("🗜️ Converting forest to sparse leaf storage")
+    print("=" * 60)
+
+    # Build through the importable module so the pickle doesn't reference __main__
+    import sparse_forest
+
+    model_data = load_artifact(args.model)
+    forest = model_data['model']
+    sparse = sparse_forest.SparseLeafForest(forest)
+
+    dense_values = sum(e.tree_.value.size for e in forest.estimators_)
+    print(f"📊 Stored class values: {dense_values:,} -> {sparse.stored_values():,}")
+    print(f"📊 Model size: {serialized_size_mb(forest):.1f}MB -> {serialized_size_mb(sparse):.1f}MB")
+
+    # Scoring is unchanged, so the subject table and similarity matrix stay valid
+    model_data['model'] = sparse
+    model_data['performance']['sparse_leaves'] = {
+        'dense_values': int(dense_values),
+        'sparse_values': sparse.stored_values()
+    }
+    size_mb = save_artifact(model_data, args.output)
+    print(f"💾 Sparse model saved: {args.output} ({size_mb:.1f}MB)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Subject-Only Recommendation Table
+Precomputes the top careers for every combination of up to 5 GCE subjects
+with no interest answers, stored as memory-mapped arrays indexed by
+combinatorial rank. Each model's table is a directory named by its
+fingerprint and is never rewritten once published
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+from itertools import combinations
+from math import comb
+import numpy as np
+
+from model_utils import (
+    MODEL_FILE, load_artifact, model_fingerprint, model_dir, publish_dir, prune_dirs, score_profile_bits,
+    top_k_indices
+)
+from profile_features import N_SUBJECTS, N_INPUTS
+
+TABLE_DIR = os.environ.get('SUBJECT_TABLE_DIR', 'subject_table')
+MAX_SUBJECTS = 5
+TOP_K = 5
+BATCH_SIZE = 20000
+
+# Tables for older models kept next to the newest one
+KEEP_TABLES = 3
+
+# First row of each combination size, and C(n, k) for colex ranking
+SIZE_OFFSETS = np.cumsum([0] + [comb(N_SUBJECTS, size) for size in range(MAX_SUBJECTS + 1)])
+BINOMIALS = np.array([[comb(n, k) for k in range(MAX_SUBJECTS + 1)] for n in range(N_SUBJECTS)], dtype=np.int64)
+
+def combination_rank(subject_indices):
+    """Table row for a set of distinct subject indices (O(k), k <= 5)"""
+    ordered = sorted(subject_indices)
+    return int(SIZE_OFFSETS[len(ordered)]) + sum(int(BINOMIALS[c, i + 1]) for i, c in enumerate(ordered))
+
+def _combination_ranks(combos):
+    """Vectorized combination_rank for an array of sorted combinations of one size"""
+    size = combos.shape[1]
+    ranks = np.full(len(combos), SIZE_OFFSETS[size], dtype=np.int64)
+    for i in range(size):
+        ranks += BINOMIALS[combos[:, i], i + 1]
+    return ranks
+
+def build_table(model_data, output_dir=TABLE_DIR, verbose=True):
+    """Score every subject combination and publish the memory-mapped table
+
+    The table is written to a staging directory and renamed to
+    output_dir/<fingerprint>, so rebuilding never touches files a running
+    worker has mapped.
+    """
+
+    n_rows = int(SIZE_OFFSETS[-1])
+    path = model_dir(output_dir, model_data)
+    staging = f"{path}.tmp{os.getpid()}"
+    os.makedirs(staging, exist_ok=True)
+    index_dtype = np.uint8 if len(model_data['career_names']) <= 256 else np.uint16
+    indices = np.lib.format.open_memmap(
+        os.path.join(staging, 'topk_index.npy'), mode='w+', dtype=index_dtype, shape=(n_rows, TOP_K)
+    )
+    probabilities = np.lib.format.open_memmap(
+        os.path.join(staging, 'topk_prob.npy'), mode='w+', dtype=np.float32, shape=(n_rows, TOP_K)
+    )
+
+    for size in range(MAX_SUBJECTS + 1):
+        combos = np.array(list(combinations(range(N_SUBJECTS), size)), dtype=np.int64).reshape(comb(N_SUBJECTS, size), size)
+        ranks = _combination_ranks(combos)
+
+        for start in range(0, len(combos), BATCH_SIZE):
+            batch = combos[start:start + BATCH_SIZE]
+            bits = np.zeros((len(batch), N_INPUTS), dtype=bool)
+            if size:
+                bits[np.arange(len(batch))[:, None], batch] = True
+
+            scores = score_profile_bits(model_data, bits)
+            top = top_k_indices(scores, TOP_K)
+            top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+            indices[ranks[start:start + BATCH_SIZE]] = top
+            probabilities[ranks[start:start + BATCH_SIZE]] = np.take_along_axis(scores, top, axis=1)
+
+        if verbose:
+            print(f"   {size} subjects: {len(combos)} combinations")
+
+    indices.flush()
+    probabilities.flush()
+    del indices, probabilities
+
+    meta = {
+        'fingerprint': model_fingerprint(model_data),
+        'model_version': model_data.get('model_version', 'unknown'),
+        'max_subjects': MAX_SUBJECTS,
+        'top_k': TOP_K,
+        'rows': n_rows,
+        'created': datetime.now().isoformat()
+    }
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    publish_dir(staging, path)
+    prune_dirs(output_dir, KEEP_TABLES)
+    return meta
+
+def load_table(model_data, table_dir=TABLE_DIR):
+    """Memory-map the table if it was built for this model, else return None"""
+
+    path = model_dir(table_dir, model_data)
+    meta_path = os.path.join(path, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta['fingerprint'] != model_fingerprint(model_data):
+        return None
+
+    return {
+        'meta': meta,
+        'indices': np.load(os.path.join(path, 'topk_index.npy'), mmap_mode='r'),
+        'probabilities': np.load(os.path.join(path, 'topk_prob.npy'), mmap_mode='r')
+    }
+
+def lookup(table, bits, fingerprint=None):
+    """Top careers and probabilities for a subject-only profile, or None if not covered
+
+    With fingerprint (of the model being served), a table built for any
+    other model is never used.
+    """
+
+    if fingerprint is not None and table['meta']['fingerprint'] != fingerprint:
+        return None
+    if bits[N_SUBJECTS:].any():
+        return None
+    subject_indices = np.nonzero(bits[:N_SUBJECTS])[0]
+    if len(subject_indices) > table['meta']['max_subjects']:
+        return None
+
+    row = combination_rank(subject_indices)
+    return table['indices'][row], table['probabilities'][row]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the subject-only recommendation table')
+    parser.add_argument('--model', default=MODEL_FILE, help='Model artifact to score with')
+    parser.add_argument('--output', default=TABLE_DIR, help='Table directory')
+    args = parser.parse_args()
+
+    print("📋 Building subject-only recommendation table")
+    print("=" * 60)
+
+    model_data = load_artifact(args.model)
+    started = datetime.now()
+    meta = build_table(model_data, args.output)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print(f"✅ {meta['rows']} combinations scored in {elapsed:.1f}s")
+    print(f"💾 Table saved: {args.output}/{meta['fingerprint']}/ (model {meta['model_version']})")
+
+if __name__ == '__main__':
+    main()
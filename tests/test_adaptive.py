@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+import adaptive
+from profile_features import N_INPUTS, N_SUBJECTS
+
+def uniform_scores(rows):
+    return np.full((len(rows), 4), 0.25)
+
+@pytest.mark.parametrize('question', ['0', '31', '-1'])
+def test_rejects_unknown_question_ids(question):
+    with pytest.raises(ValueError, match='Unknown question'):
+        adaptive.next_question(uniform_scores, np.zeros(N_INPUTS, dtype=bool), {question: True}, adaptive.new_cache())
+
+def test_answered_questions_are_not_asked_again():
+    bits = np.zeros(N_INPUTS, dtype=bool)
+    bits[:N_SUBJECTS:7] = True
+    result = adaptive.next_question(uniform_scores, bits, {'1': True, '30': False}, adaptive.new_cache())
+    assert result['answered'] == 2
+    assert {c['id'] for c in result['candidates']}.isdisjoint({1, 30})
@@ -0,0 +1,67 @@
+import pickle
+import numpy as np
+import pytest
+
+from career_training.bitset_trees import FeatureLayout, fit_bitset_forest
+from model_utils import _table_popcount, popcount
+from profile_features import N_INPUTS, features_from_bits
+
+FOREST_PARAMS = {'n_estimators': 6, 'max_depth': 8, 'min_samples_split': 4, 'min_samples_leaf': 2,
+                 'max_features': 'sqrt', 'random_state': 0, 'n_jobs': 1}
+
+def training_set(rows=800, n_classes=5, wide_column=False, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.integers(0, n_classes, size=rows)
+    # Class-dependent inputs so the trees have real splits to find
+    bits = rng.random((rows, N_INPUTS)) < 0.1 + 0.15 * (np.arange(N_INPUTS) % n_classes == y[:, None])
+    X = features_from_bits(bits)
+    if wide_column:
+        X = np.hstack([X, rng.normal(y, 1.0)[:, None]])
+    return X, y
+
+@pytest.mark.parametrize('wide_column', [False, True])
+def test_predict_proba_rows_sum_to_one(wide_column):
+    X, y = training_set(wide_column=wide_column)
+    forest = fit_bitset_forest(X, y, FOREST_PARAMS)
+
+    probabilities = forest.predict_proba(X)
+    assert probabilities.shape == (len(X), 5)
+    np.testing.assert_allclose(probabilities.sum(axis=1), 1.0)
+    assert (forest.predict(X) == y).mean() > 0.5
+
+def test_pickle_round_trip():
+    X, y = training_set()
+    forest = fit_bitset_forest(X, y, FOREST_PARAMS)
+    restored = pickle.loads(pickle.dumps(forest, protocol=pickle.HIGHEST_PROTOCOL))
+    np.testing.assert_array_equal(restored.predict_proba(X), forest.predict_proba(X))
+
+@pytest.mark.parametrize('wide_column', [False, True])
+def test_codes_agree_with_thresholds(wide_column):
+    X, y = training_set(wide_column=wide_column)
+    layout = FeatureLayout(X, y, 5)
+    for column, cuts in layout.cuts.items():
+        codes = layout.codes[column, layout.slot_of_row]
+        x = X[:, column].astype(np.float32)
+        for i, cut in enumerate(cuts):
+            np.testing.assert_array_equal(codes <= i, x <= cut)
+
+@pytest.mark.parametrize('wide_column', [False, True])
+def test_leaf_values_match_rows_routed_by_thresholds(wide_column):
+    """Without bootstrap each leaf holds exactly the training rows sklearn routes to it"""
+
+    X, y = training_set(wide_column=wide_column)
+    forest = fit_bitset_forest(X, y, {**FOREST_PARAMS, 'bootstrap': False})
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        leaves = estimator.apply(X.astype(np.float32))
+        for leaf in np.unique(leaves):
+            counts = np.bincount(y[leaves == leaf], minlength=5)
+            assert tree.n_node_samples[leaf] == counts.sum()
+            np.testing.assert_allclose(tree.value[leaf, 0] / tree.value[leaf, 0].sum(), counts / counts.sum())
+
+def test_table_popcount_matches_bit_counts():
+    values = np.random.default_rng(0).integers(0, 2**63, size=(3, 50), dtype=np.uint64)
+    expected = np.array([[bin(int(v)).count('1') for v in row] for row in values])
+    np.testing.assert_array_equal(_table_popcount(values), expected)
+    np.testing.assert_array_equal(popcount(values), expected)
+    np.testing.assert_array_equal(_table_popcount(values[:, ::2]), expected[:, ::2])
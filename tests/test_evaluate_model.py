@@ -0,0 +1,33 @@
+import numpy as np
+
+from evaluate_model import rank_of_truth, predicted_class
+from model_utils import top_k_accuracy
+
+def test_rank_of_truth_counts_ties_against_the_truth():
+    probabilities = np.array([
+        [0.5, 0.3, 0.2],
+        [0.2, 0.5, 0.3],
+        [0.4, 0.4, 0.2],
+        [1/3, 1/3, 1/3]
+    ])
+    y = np.array([0, 2, 0, 1])
+    assert rank_of_truth(probabilities, y).tolist() == [0, 1, 1, 2]
+
+def test_rank_of_truth_unknown_career_ranks_last():
+    probabilities = np.array([[0.6, 0.4]])
+    assert rank_of_truth(probabilities, np.array([-1])).tolist() == [2]
+
+def test_accuracy_ranks_and_confusion_share_one_tie_policy():
+    probabilities = np.array([
+        [0.4, 0.4, 0.2],
+        [0.2, 0.4, 0.4],
+        [0.6, 0.3, 0.1],
+        [0.25, 0.25, 0.5]
+    ])
+    y = np.array([0, 2, 0, 1])
+    ranks = rank_of_truth(probabilities, y)
+    predicted = predicted_class(probabilities, y, ranks)
+
+    assert top_k_accuracy(probabilities, y, 1) == (ranks == 0).mean() == (predicted == y).mean() == 0.25
+    assert top_k_accuracy(probabilities, y, 2) == (ranks < 2).mean()
+    assert predicted.tolist() == [1, 1, 0, 2]
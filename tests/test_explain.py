@@ -0,0 +1,35 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import explain
+from profile_features import FEATURE_NAMES, N_INPUTS, features_from_bits
+
+def fitted_model():
+    rng = np.random.default_rng(0)
+    bits = rng.random((800, N_INPUTS)) < 0.25
+    scaler = StandardScaler().fit(features_from_bits(bits))
+    forest = RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0, n_jobs=1)
+    forest.fit(scaler.transform(features_from_bits(bits)), rng.integers(0, 6, size=len(bits)))
+    return forest, scaler
+
+def test_contributions_sum_to_predict_proba():
+    forest, scaler = fitted_model()
+    trees = explain.build_explainer(forest)
+    bits = np.random.default_rng(1).random((50, N_INPUTS)) < 0.3
+    X = scaler.transform(features_from_bits(bits))
+
+    for row, expected in zip(X, forest.predict_proba(X)):
+        bias, contributions = explain.decompose(trees, row, len(FEATURE_NAMES))
+        np.testing.assert_allclose(bias + contributions.sum(axis=0), expected, atol=1e-6)
+
+def test_explained_probability_matches_predict_proba():
+    forest, scaler = fitted_model()
+    trees = explain.build_explainer(forest)
+    attribution = explain.attribution_matrix()
+    bits = np.random.default_rng(2).random(N_INPUTS) < 0.3
+    x = scaler.transform(features_from_bits(bits))[0]
+    expected = forest.predict_proba([x])[0]
+
+    for explanation in explain.explain(trees, attribution, x, bits, range(len(expected)), max_inputs=N_INPUTS):
+        assert abs(explanation['probability'] - expected[explanation['class_index']]) < 1e-6
@@ -0,0 +1,45 @@
+import numpy as np
+
+from profile_features import (
+    SUBJECTS, INTEREST_MAPPING, FEATURE_NAMES, N_INPUTS, create_profile_features, features_from_bits,
+    profile_bits, bits_to_profile
+)
+
+def random_bits(rows, seed=0):
+    return np.random.default_rng(seed).random((rows, N_INPUTS)) < 0.2
+
+def test_vectorized_features_match_reference():
+    bits = random_bits(500)
+    bits[0] = False  # no subjects and no interests
+    bits[1] = True
+
+    vectorized = features_from_bits(bits)
+    for row, expected in zip(bits, vectorized):
+        values, names = create_profile_features(*bits_to_profile(row))
+        assert names == FEATURE_NAMES
+        np.testing.assert_allclose(values, expected)
+
+def test_profile_bits_round_trip():
+    for row in random_bits(50, seed=1):
+        assert np.array_equal(profile_bits(*bits_to_profile(row)), row)
+
+def test_profile_bits_ignores_unknown_inputs():
+    bits = profile_bits(['Mathematics', 'Astrology'], {'1': True, '31': True, '2': False})
+    assert bits.sum() == 2
+    assert bits[SUBJECTS.index('Mathematics')]
+    assert bits[len(SUBJECTS)]
+
+def test_training_and_serving_share_definitions():
+    from career_training import data
+
+    assert data.subjects is SUBJECTS
+    assert data.interest_mapping is INTEREST_MAPPING
+    assert data.create_comprehensive_features is create_profile_features
+
+def test_selected_columns_match_full_features():
+    bits = random_bits(300, seed=2)
+    bits[0] = False
+    full = features_from_bits(bits)
+    rng = np.random.default_rng(3)
+    for columns in ([], list(range(32)), [40, 3, 70, 68, 35], sorted(rng.choice(len(FEATURE_NAMES), 50, replace=False))):
+        np.testing.assert_array_equal(features_from_bits(bits, columns), full[:, columns])
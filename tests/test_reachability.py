@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import reachability
+from model_utils import model_features, score_profile_bits
+from profile_features import N_INPUTS, N_SUBJECTS, features_from_bits
+
+def small_model_data(active_features=None):
+    rng = np.random.default_rng(0)
+    bits = rng.random((800, N_INPUTS)) < 0.25
+    X = features_from_bits(bits, active_features)
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0, n_jobs=1)
+    forest.fit(scaler.transform(X), rng.integers(0, 6, size=len(bits)))
+    return {'model': forest, 'scaler': scaler, 'active_features': active_features}
+
+@pytest.mark.parametrize('active_features', [None, [0, 5, 8, 9, 10, 33, 40, 47, 60, 68, 69, 70, 71]])
+def test_bound_never_below_any_reachable_probability(active_features):
+    model_data = small_model_data(active_features)
+    index = reachability.build_index(model_data)
+    rng = np.random.default_rng(1)
+
+    for _ in range(40):
+        subjects = rng.random(N_SUBJECTS) < rng.uniform(0.05, 0.4)
+        bound = reachability.reachable_probabilities(index, subjects)
+
+        # Random answers plus the all-no and all-yes extremes, for the same subjects
+        answers = rng.random((50, N_INPUTS - N_SUBJECTS)) < rng.uniform(0.1, 0.9)
+        answers[0], answers[1] = False, True
+        bits = np.hstack([np.broadcast_to(subjects, (len(answers), N_SUBJECTS)), answers])
+        probabilities = score_profile_bits(model_data, bits)
+        assert (probabilities <= bound + 1e-6).all()
+
+def test_rejects_models_with_another_feature_layout():
+    model_data = small_model_data()
+    X = model_features(model_data, np.zeros((4, N_INPUTS), dtype=bool))[:, :20]
+    model_data['scaler'] = StandardScaler().fit(X)
+    with pytest.raises(ValueError):
+        reachability.build_index(model_data)
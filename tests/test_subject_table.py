@@ -0,0 +1,67 @@
+import os
+from itertools import combinations
+from math import comb
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+import subject_table
+from model_utils import model_fingerprint, score_profile_bits
+from profile_features import N_INPUTS, N_SUBJECTS, SUBJECTS, features_from_bits, profile_bits
+
+def small_model_data(seed):
+    rng = np.random.default_rng(seed)
+    bits = rng.random((400, N_INPUTS)) < 0.2
+    X = features_from_bits(bits)
+    scaler = StandardScaler().fit(X)
+    forest = RandomForestClassifier(n_estimators=5, max_depth=6, random_state=seed, n_jobs=1)
+    forest.fit(scaler.transform(X), rng.integers(0, 7, size=len(bits)))
+    return {
+        'model': forest,
+        'scaler': scaler,
+        'career_names': [f'Career {i}' for i in range(7)],
+        'model_version': f'test_{seed}',
+        'training_date': str(seed)
+    }
+
+def test_combination_rank_is_a_bijection():
+    ranks = []
+    for size in range(subject_table.MAX_SUBJECTS + 1):
+        combos = np.array(list(combinations(range(N_SUBJECTS), size)), dtype=np.int64).reshape(comb(N_SUBJECTS, size), size)
+        vectorized = subject_table._combination_ranks(combos)
+        assert list(vectorized[:50]) == [subject_table.combination_rank(c) for c in combos[:50]]
+        ranks.append(vectorized)
+    ranks = np.concatenate(ranks)
+    assert np.array_equal(np.sort(ranks), np.arange(int(subject_table.SIZE_OFFSETS[-1])))
+
+def test_combination_rank_ignores_order():
+    assert subject_table.combination_rank([9, 2, 30]) == subject_table.combination_rank([2, 30, 9])
+
+def test_build_load_and_lookup(tmp_path):
+    model_data = small_model_data(0)
+    subject_table.build_table(model_data, str(tmp_path), verbose=False)
+    table = subject_table.load_table(model_data, str(tmp_path))
+    fingerprint = model_fingerprint(model_data)
+
+    subjects = ['Mathematics', 'Physics', 'Biology']
+    bits = profile_bits(subjects, {})
+    indices, probabilities = subject_table.lookup(table, bits, fingerprint)
+    expected = score_profile_bits(model_data, bits[None, :])[0]
+    assert indices[0] == expected.argmax()
+    np.testing.assert_allclose(probabilities, expected[indices], rtol=1e-6)
+
+    assert subject_table.lookup(table, profile_bits(subjects, {'1': True}), fingerprint) is None
+    assert subject_table.lookup(table, profile_bits(SUBJECTS[:6], {}), fingerprint) is None
+    assert subject_table.lookup(table, bits, 'another model') is None
+
+def test_rebuild_for_another_model_leaves_published_table_alone(tmp_path):
+    first, second = small_model_data(0), small_model_data(1)
+    subject_table.build_table(first, str(tmp_path), verbose=False)
+    path = os.path.join(str(tmp_path), model_fingerprint(first), 'topk_index.npy')
+    before = os.stat(path)
+
+    subject_table.build_table(second, str(tmp_path), verbose=False)
+    after = os.stat(path)
+    assert (before.st_ino, before.st_mtime_ns) == (after.st_ino, after.st_mtime_ns)
+    assert subject_table.load_table(first, str(tmp_path)) is not None
+    assert subject_table.load_table(second, str(tmp_path)) is not None
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+import whatif
+from profile_features import N_INPUTS, SUBJECTS, features_from_bits, profile_bits
+
+def featurize(subjects, interests):
+    return features_from_bits(profile_bits(subjects, interests))[0]
+
+def fitted_forest():
+    rng = np.random.default_rng(0)
+    bits = rng.random((600, N_INPUTS)) < 0.25
+    y = rng.integers(0, 6, size=len(bits))
+    return RandomForestClassifier(n_estimators=15, max_depth=8, random_state=0).fit(features_from_bits(bits), y)
+
+def test_toggles_match_full_predict_proba():
+    forest = fitted_forest()
+    trees = whatif.build_forest_arrays(forest)
+    sessions = whatif.new_session_store()
+
+    subjects, interests = ['Mathematics', 'Physics'], {'1': True, '17': True}
+    session_id, probabilities = whatif.start_session(sessions, trees, featurize, subjects, interests)
+    np.testing.assert_allclose(probabilities, forest.predict_proba([featurize(subjects, interests)])[0], atol=1e-12)
+
+    steps = [{'subject': 'Biology'}, {'question': 2}, {'subject': 'Mathematics'}, {'question': 1},
+             {'subject': 'Computer Science'}, {'question': 30}, {'subject': 'Biology'}]
+    for step in steps:
+        probabilities, rewalked = whatif.toggle(sessions, trees, featurize, session_id, **step)
+        session = sessions[session_id]
+        expected = forest.predict_proba([featurize(sorted(session['subjects']), session['interests'])])[0]
+        np.testing.assert_allclose(probabilities, expected, atol=1e-12)
+        assert 0 <= rewalked <= len(trees)
+
+def test_unknown_session_without_profile_raises():
+    forest = fitted_forest()
+    trees = whatif.build_forest_arrays(forest)
+    with pytest.raises(whatif.SessionNotFound):
+        whatif.toggle(whatif.new_session_store(), trees, featurize, 'missing', subject=SUBJECTS[0])
+
+def test_toggle_with_profile_rebuilds_session_in_another_worker():
+    forest = fitted_forest()
+    trees = whatif.build_forest_arrays(forest)
+    subjects, interests = ['Chemistry'], {'14': True}
+    session_id, _ = whatif.start_session(whatif.new_session_store(), trees, featurize, subjects, interests)
+
+    other_worker = whatif.new_session_store()
+    probabilities, _ = whatif.toggle(other_worker, trees, featurize, session_id, subject='Biology',
+                                     profile=(subjects, interests))
+    expected = forest.predict_proba([featurize(['Biology', 'Chemistry'], interests)])[0]
+    np.testing.assert_allclose(probabilities, expected, atol=1e-12)
+
+def test_toggle_with_profile_replaces_stale_session():
+    forest = fitted_forest()
+    trees = whatif.build_forest_arrays(forest)
+    sessions = whatif.new_session_store()
+    session_id, _ = whatif.start_session(sessions, trees, featurize, ['Physics'], {})
+
+    # Another worker served a toggle in between: the client now has Mathematics too
+    probabilities, _ = whatif.toggle(sessions, trees, featurize, session_id, question=1,
+                                     profile=(['Mathematics', 'Physics'], {}))
+    expected = forest.predict_proba([featurize(['Mathematics', 'Physics'], {'1': True})])[0]
+    np.testing.assert_allclose(probabilities, expected, atol=1e-12)
+    assert sessions[session_id]['subjects'] == {'Mathematics', 'Physics'}
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+What-If Sessions
+Keeps each counselor session's feature vector and per-tree leaves so a
+single toggle only re-walks the trees whose path tested a changed feature
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+import numpy as np
+
+MAX_SESSIONS = 1000
+SESSION_TTL_SECONDS = 30 * 60
+
+def build_forest_arrays(forest):
+    """Flatten every tree into plain arrays for fast single-row walks"""
+
+    trees = []
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :]
+        totals = value.sum(axis=1, keepdims=True)
+        trees.append({
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'feature': tree.feature,
+            'threshold': tree.threshold,
+            'value': value / np.where(totals == 0, 1, totals)
+        })
+    return trees
+
+def walk_tree(tree, x):
+    """Leaf reached by one row and the features tested on the way"""
+
+    node = 0
+    tested = []
+    left, right, feature, threshold = tree['left'], tree['right'], tree['feature'], tree['threshold']
+    while left[node] != -1:
+        tested.append(feature[node])
+        node = left[node] if x[feature[node]] <= threshold[node] else right[node]
+    return node, tested
+
+def _walk_into(session, trees, tree_index):
+    """Walk one tree for the session's current features and record its leaf and path"""
+
+    leaf, tested = walk_tree(trees[tree_index], session['features'])
+    session['leaves'][tree_index] = leaf
+    session['path_mask'][tree_index] = False
+    session['path_mask'][tree_index, tested] = True
+    session['prob_sum'] += trees[tree_index]['value'][leaf]
+
+def _as_tree_input(features_scaled):
+    # Trees compare float32 copies of the features, as sklearn does
+    return np.asarray(features_scaled, dtype=np.float32).ravel()
+
+def _expire(sessions):
+    cutoff = time.time() - SESSION_TTL_SECONDS
+    while sessions and next(iter(sessions.values()))['touched'] < cutoff:
+        sessions.popitem(last=False)
+    while len(sessions) > MAX_SESSIONS:
+        sessions.popitem(last=False)
+
+class SessionNotFound(KeyError):
+    """Unknown or expired session, and no profile to rebuild it from"""
+
+def new_session_store():
+    """Least-recently-used session store
+
+    Sessions live in the worker that created them; toggles that carry the
+    client's current profile rebuild them in any other worker.
+    """
+    return OrderedDict()
+
+def _new_session(trees, featurize, subjects, interests):
+    features = _as_tree_input(featurize(subjects, interests))
+    n_classes = trees[0]['value'].shape[1]
+    session = {
+        'subjects': set(subjects),
+        'interests': {str(q): bool(a) for q, a in interests.items()},
+        'features': features,
+        'leaves': np.zeros(len(trees), dtype=np.intp),
+        'path_mask': np.zeros((len(trees), len(features)), dtype=bool),
+        'prob_sum': np.zeros(n_classes),
+        'touched': time.time()
+    }
+    for tree_index in range(len(trees)):
+        _walk_into(session, trees, tree_index)
+    return session
+
+def _same_profile(session, subjects, interests):
+    answered = {str(q) for q, a in interests.items() if a}
+    return session['subjects'] == set(subjects) and answered == {q for q, a in session['interests'].items() if a}
+
+def start_session(sessions, trees, featurize, subjects, interests):
+    """Score a profile with a full walk and keep its state for later toggles"""
+
+    session_id = uuid.uuid4().hex
+    session = _new_session(trees, featurize, subjects, interests)
+    sessions[session_id] = session
+    _expire(sessions)
+    return session_id, session['prob_sum'] / len(trees)
+
+def toggle(sessions, trees, featurize, session_id, subject=None, question=None, profile=None):
+    """Flip one subject or interest answer and re-score incrementally
+
+    profile is the client's (subjects, interests) before the toggle. When
+    this worker doesn't hold the session, or holds a different profile for
+    it (another worker served the last toggle), the session is rebuilt from
+    it first. Returns (probabilities, trees_rewalked); raises
+    SessionNotFound for unknown or expired sessions without a profile.
+    """
+
+    _expire(sessions)
+    if profile is not None and (session_id not in sessions or not _same_profile(sessions[session_id], *profile)):
+        sessions[session_id] = _new_session(trees, featurize, *profile)
+        _expire(sessions)
+    if session_id not in sessions:
+        raise SessionNotFound(session_id)
+    session = sessions[session_id]
+    sessions.move_to_end(session_id)
+    session['touched'] = time.time()
+
+    if subject is not None:
+        session['subjects'] ^= {subject}
+    if question is not None:
+        key = str(question)
+        session['interests'][key] = not session['interests'].get(key, False)
+
+    features = _as_tree_input(featurize(sorted(session['subjects']), session['interests']))
+    changed = np.nonzero(features != session['features'])[0]
+    session['features'] = features
+
+    affected = np.nonzero(session['path_mask'][:, changed].any(axis=1))[0]
+    for tree_index in affected:
+        session['prob_sum'] -= trees[tree_index]['value'][session['leaves'][tree_index]]
+        _walk_into(session, trees, tree_index)
+
+    return session['prob_sum'] / len(trees), len(affected)